@@ -0,0 +1,139 @@
+"""
+checkpoint.py
+Checkpoint / resume support for the security test suites.
+
+A suite keeps one Checkpoint per report directory. It tracks which probe functions have
+finished, the position reached inside payload loops, the fixture values a run generated
+(unique names, created ids) and the results collected so far, and writes them to
+<report_dir>/checkpoint.json every few seconds and on exit.
+
+Running a suite with --resume reloads that file: finished probes are skipped, payload loops
+continue from their cursor, fixtures keep their original values and results recorded after
+the last commit point are dropped so nothing is reported twice.
+
+Given a profiler (see profiling.py), every probe run goes through it.
+
+rerun() runs a probe again from its first payload (watch mode calls probes repeatedly in one
+process); reset() forgets a probe's completion and the cursors of the loops it ran.
+in_memory() stops all writes for such callers, so a watcher never leaves a checkpoint.json
+that a later --resume would trust.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import atexit
+
+SAVE_INTERVAL = 5.0
+
+def resume_requested(argv=None):
+    return "--resume" in (sys.argv if argv is None else argv)
+
+class Checkpoint:
+    def __init__(self, report_dir, resume=False, interval=SAVE_INTERVAL, profiler=None):
+        self.path = os.path.join(report_dir, "checkpoint.json")
+        self.interval = interval
+        self.last_save = 0.0
+        self.state = {"completed": [], "cursors": {}, "owners": {}, "fixtures": {}, "committed": 0, "results": None}
+        self.resumed = False
+        self.running = None
+        self.profiler = profiler
+        if resume and os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.state = json.load(f)
+            self.resumed = True
+            print(f"Resuming from {self.path}: {len(self.state['completed'])} probes already done")
+        atexit.register(self.save)
+
+    # -------------------------
+    # Run state
+    # -------------------------
+    def results(self, fresh):
+        """Returns the results dict to record into: the saved one on resume, otherwise `fresh`."""
+        saved = self.state.get("results")
+        if self.resumed and saved is not None:
+            # anything recorded after the last commit point is re-done on resume
+            del saved["tests"][self.state["committed"]:]
+            saved["meta"].setdefault("resumed_at", []).append(time.strftime("%Y-%m-%d %H:%M:%S"))
+            return saved
+        self.state["results"] = fresh
+        return fresh
+
+    def fixture(self, key, factory):
+        """Value generated once per run (e.g. a unique test name) and reused on resume."""
+        if key not in self.state["fixtures"]:
+            self.state["fixtures"][key] = factory()
+        return self.state["fixtures"][key]
+
+    def run(self, probe):
+        """Runs a probe function unless a previous attempt already completed it."""
+        probe_id = probe.__name__
+        if probe_id in self.state["completed"]:
+            print(f"Skipping {probe_id} (completed in checkpoint)")
+            return
+        self.running = probe_id
+        try:
+            if self.profiler is None:
+                probe()
+            else:
+                self.profiler.run(probe)
+        finally:
+            self.running = None
+        self.state["completed"].append(probe_id)
+        self.commit()
+
+    def reset(self, probe_id):
+        """Forgets that a probe completed and where its payload loops stopped."""
+        if probe_id in self.state["completed"]:
+            self.state["completed"].remove(probe_id)
+        owners = self.state.setdefault("owners", {})
+        for key in [k for k, owner in owners.items() if owner == probe_id]:
+            self.state["cursors"].pop(key, None)
+            del owners[key]
+
+    def rerun(self, probe):
+        """Runs a probe from the start even if it already completed in this run."""
+        self.reset(probe.__name__)
+        self.run(probe)
+
+    def iterate(self, key, items):
+        """Yields (index, item) from the saved cursor onwards, advancing after each item is handled."""
+        items = list(items)
+        if self.running:
+            # cursor keys are chosen by the probe (e.g. nosql/login), so remember whose they are
+            self.state.setdefault("owners", {})[key] = self.running
+        for i in range(self.state["cursors"].get(key, 0), len(items)):
+            yield i, items[i]
+            self.state["cursors"][key] = i + 1
+            self.commit()
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def commit(self):
+        results = self.state.get("results")
+        self.state["committed"] = len(results["tests"]) if results else 0
+        if time.monotonic() - self.last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        if self.state.get("results") is None:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, default=str)
+        os.replace(tmp, self.path)
+        self.last_save = time.monotonic()
+
+    def in_memory(self):
+        """Keeps the state in this process only: no periodic saves and nothing written at exit."""
+        self.interval = math.inf
+        atexit.unregister(self.save)
+
+    def finish(self):
+        """Run completed: drop the checkpoint so the next run starts fresh."""
+        atexit.unregister(self.save)
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,120 @@
+"""
+combinatorial.py
+t-wise covering arrays for probe matrices.
+
+plan(dimensions, strength=2) takes an ordered dict of dimension name -> list of values
+(routes, auth states, payloads, encodings, ...) and returns (rows, coverage). Each row is
+a dict with one value per dimension. With strength t, every combination of values from any
+t dimensions appears in at least one row. For pairwise that is roughly
+|largest dimension| x |second largest| rows instead of the full cartesian product.
+full=True returns the full product instead.
+
+excluded(partial_row) -> bool marks rows that must never be sent (e.g. a valid token on a
+route that would change real data). It is called on partial rows while a row is being
+built, so it must only return True once every value it looks at is present. Interactions
+that can only occur in excluded rows are reported as unreachable, not silently dropped.
+
+The construction is the greedy AETG scheme. Each new row starts from an uncovered
+interaction, and the remaining dimensions are filled in random order with the value that
+covers the most still-uncovered interactions. The best of CANDIDATES rows is kept. The
+generator is seeded, so the same dimensions always give the same plan.
+"""
+
+import random
+from math import prod
+from itertools import combinations, product
+
+CANDIDATES = 10
+
+def interactions(sizes, strength):
+    """Every t-way interaction as a tuple of (dimension index, value index) pairs."""
+    out = set()
+    for dims in combinations(range(len(sizes)), strength):
+        for values in product(*(range(sizes[d]) for d in dims)):
+            out.add(tuple(zip(dims, values)))
+    return out
+
+def covered_by(row, strength):
+    return {tuple((d, row[d]) for d in dims) for dims in combinations(range(len(row)), strength)}
+
+def _build_row(sizes, uncovered, strength, start, rng, allowed):
+    row = [None] * len(sizes)
+    for d, v in start:
+        row[d] = v
+    if not allowed(row):
+        return None
+    rest = [d for d in range(len(sizes)) if row[d] is None]
+    rng.shuffle(rest)
+    for d in rest:
+        fixed = [e for e in range(len(sizes)) if row[e] is not None]
+        values = list(range(sizes[d]))
+        rng.shuffle(values)
+        best, best_gain = None, -1
+        for v in values:
+            row[d] = v
+            if not allowed(row):
+                continue
+            gain = sum(
+                tuple(sorted([(e, row[e]) for e in others] + [(d, v)])) in uncovered
+                for others in combinations(fixed, strength - 1)
+            )
+            if gain > best_gain:
+                best, best_gain = v, gain
+        if best is None:
+            return None
+        row[d] = best
+    return row
+
+def plan(dimensions, strength=2, full=False, excluded=None, seed=0):
+    names = list(dimensions)
+    sizes = [len(dimensions[n]) for n in names]
+    strength = max(1, min(strength, len(names)))
+    rng = random.Random(seed)
+
+    def allowed(row):
+        if excluded is None:
+            return True
+        return not excluded({names[d]: dimensions[names[d]][v] for d, v in enumerate(row) if v is not None})
+
+    required = interactions(sizes, strength)
+    unreachable = set()
+    if full:
+        rows = [list(r) for r in product(*(range(s) for s in sizes)) if allowed(list(r))]
+        covered = set().union(*(covered_by(r, strength) for r in rows)) if rows else set()
+        unreachable = required - covered
+    else:
+        rows = []
+        uncovered = set(required)
+        while uncovered:
+            start = min(uncovered)
+            best_row, best_new = None, set()
+            for _ in range(CANDIDATES):
+                row = _build_row(sizes, uncovered, strength, start, rng, allowed)
+                if row is None:
+                    continue
+                new = covered_by(row, strength) & uncovered
+                if len(new) > len(best_new):
+                    best_row, best_new = row, new
+            if best_row is None:
+                uncovered.discard(start)
+                unreachable.add(start)
+                continue
+            rows.append(best_row)
+            uncovered -= best_new
+
+    full_size = prod(sizes)
+    coverage = {
+        "strength": strength,
+        "dimensions": dict(zip(names, sizes)),
+        "rows": len(rows),
+        "full_product": full_size,
+        "reduction": round(1 - len(rows) / full_size, 4) if full_size else 0.0,
+        "interactions": len(required),
+        "covered": len(required) - len(unreachable),
+        "unreachable": len(unreachable),
+        "unreachable_examples": [
+            {names[d]: str(dimensions[names[d]][v])[:80] for d, v in t} for t in sorted(unreachable)[:20]
+        ],
+        "coverage": round((len(required) - len(unreachable)) / len(required), 4) if required else 1.0,
+    }
+    return [{names[d]: dimensions[names[d]][v] for d, v in enumerate(r)} for r in rows], coverage
@@ -0,0 +1,263 @@
+"""
+harness_config.py
+Shared configuration for the security and performance test scripts.
+
+Values are resolved once per run, later sources overriding earlier ones:
+  1. DEFAULTS below
+  2. a JSON file: --config <path>, else $HARNESS_CONFIG, else ./harness.json if present
+  3. environment variables: HARNESS_<KEY> (e.g. HARNESS_BASE, HARNESS_POOL_SIZE);
+     MONGO_URL / MONGO_DB are also honoured for the database settings
+  4. command line flags: --<key> with dashes (e.g. --base http://staging:3000 --pool-size 100)
+
+Unknown command line flags (such as --resume) are left for the script itself, so the same
+script can be pointed at several deployments in parallel without editing code; give each run
+its own --report-root to keep their reports apart.
+See harness.example.json for a config file template.
+"""
+
+import os
+import sys
+import json
+import argparse
+import requests
+from requests.adapters import HTTPAdapter
+from harness_http import CachingSession, PACER
+from profiling import Profiler
+
+DEFAULTS = {
+    "base": "http://localhost:3000",
+    "timeout": 10,
+    "long_timeout": 120,
+    "report_root": ".",
+    "admin_email": "brendansoh@gmail.com",
+    "admin_password": "Password",
+    "user_email": "brendansoh1@gmail.com",
+    "user_password": "Password",
+    # Concurrency / connection pool
+    "concurrency": 50,
+    "pool_size": 50,
+    # Request starts per second across all threads of a process (harness_http.PACER); app.js
+    # shares one 20 req/s limiter per client IP across /auth, /category and /product. 0 = unpaced
+    "request_rate": 15.0,
+    # Read-through cache + single-flight for idempotent GETs (see harness_http.py)
+    "response_cache": False,
+    # Sweep sizes
+    "burst_requests": 50,
+    "bench_scales": [1000, 10000, 100000, 1000000],
+    "bench_samples": 5,
+    "pagination_max_items": 100,
+    "race_stock": 3,
+    # buyers per race round; each sends 2 requests into one 20 req/s limiter window, so stay <= 10
+    "race_concurrency_levels": [2, 5, 10],
+    "race_rounds": 3,
+    "timing_samples": 2000,
+    "timing_concurrency": 4,
+    "timing_budget": 55.0,
+    "timing_bootstrap": 2000,
+    # Combinatorial planner: t-wise strength, or the full product of all dimensions
+    "combinatorial_strength": 2,
+    "combinatorial_full": False,
+    # Distributed mode (work_queue.py): SQLite queue file, local worker processes to start,
+    # units one worker holds at a time, seconds before an unfinished lease is handed out again,
+    # and the run a --worker joins (empty = the newest run on the queue)
+    "queue_path": "",
+    "queue_workers": 0,
+    "queue_batch": 50,
+    "queue_lease": 60.0,
+    "queue_run": "",
+    # JSON body probe: steps for nesting depth, key count and body size
+    "json_depths": [10, 100, 1000, 10000, 100000],
+    "json_key_counts": [10, 100, 1000, 5000, 50000],
+    "json_sizes_kb": [1, 10, 90, 110, 1000, 10000],
+    "json_samples": 3,
+    "json_cost_factor": 5.0,
+    # A/B comparison: the same workload alternated between two builds (ab_base_a empty = base)
+    "ab_base_a": "",
+    "ab_base_b": "",
+    "ab_rounds": 30,
+    "ab_burst": 15,
+    "ab_burst_rounds": 5,
+    "ab_bootstrap": 2000,
+    "ab_regression_pct": 10.0,
+    # Traffic recorder (traffic.py) and replay (replay_traffic.py)
+    "record_traffic": False,
+    "record_body_limit": 65536,
+    "replay_archive": "",
+    "replay_speed": 1.0,
+    "replay_concurrency": 1,
+    "replay_base": "",
+    "replay_filter": "",
+    # Frontend origin app.js allows (corsOption.origin); every other origin must be refused
+    "cors_allowed_origin": "http://localhost:3000",
+    # Live metrics (metrics.py): serve /metrics on metrics_port and/or rewrite metrics_file (0 / "" = off)
+    "metrics_host": "127.0.0.1",
+    "metrics_port": 0,
+    "metrics_file": "",
+    "metrics_interval": 5.0,
+    # Per-probe cProfile / tracemalloc hooks (see profiling.py)
+    "profile_probes": False,
+    "profile_top": 20,
+    # Watch mode (watch_probes.py): poll server_dir every watch_interval seconds; after a change give
+    # nodemon watch_restart_grace seconds to restart the server and wait up to watch_ready_timeout for it
+    "watch_interval": 0.2,
+    "watch_restart_grace": 1.0,
+    "watch_ready_timeout": 15.0,
+    # Fixture ids; empty means "look up once per run"
+    "category_id": "",
+    "category_slug": "",
+    # Local database for server-side probes
+    "mongo_url": "mongodb://127.0.0.1:27017",
+    "mongo_db": "testdb",
+    "bench_allow_remote": False,
+    # Cold-start benchmark: starts `node server.js` from server_dir on cold_start_port,
+    # against mongo_url ("local") or a throwaway mongodb-memory-server ("memory")
+    "server_dir": "..",
+    "cold_start_port": 6061,
+    "cold_start_db": "local",
+    "cold_start_runs": 3,
+    "cold_start_budget": 15.0,
+    "warmup_requests": 30,
+    # Soak test (perf_tests_soak.py): soak_rate req/s for soak_duration seconds, sampling the server
+    # process (soak_pid, 0 = find `node server.js`) every soak_sample_interval seconds; trends are
+    # fitted after soak_warmup seconds and flagged from soak_growth_limit (0.2 = +20%) over the run
+    "soak_duration": 7200.0,
+    "soak_rate": 5.0,
+    "soak_sample_interval": 10.0,
+    "soak_warmup": 300.0,
+    "soak_pid": 0,
+    "soak_growth_limit": 0.2,
+    # Braintree sandbox test nonce used by purchase flows
+    "payment_nonce": "fake-valid-nonce",
+    # Test-data reaper: also delete through MongoDB directly (users have no delete API)
+    "reaper_direct_db": False,
+    "reaper_dry_run": False,
+}
+
+ENV_ALIASES = {
+    "mongo_url": "MONGO_URL",
+    "mongo_db": "MONGO_DB",
+}
+
+# -------------------------
+# Loading
+# -------------------------
+def _coerce(key, value):
+    default = DEFAULTS[key]
+    if isinstance(value, str):
+        if isinstance(default, bool):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        if isinstance(default, int):
+            # int defaults also take fractions where they make sense (--timeout 2.5)
+            number = float(value)
+            return int(number) if number.is_integer() else number
+        if isinstance(default, float):
+            return float(value)
+        if isinstance(default, list):
+            return [int(v) for v in value.split(",") if v.strip()]
+    return value
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--config")
+    for key in DEFAULTS:
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key)
+    known, _ = parser.parse_known_args(argv)
+    return known
+
+def load_config(argv=None, environ=None):
+    argv = sys.argv[1:] if argv is None else argv
+    environ = os.environ if environ is None else environ
+    args = _parse_args(argv)
+    config = dict(DEFAULTS)
+
+    path = args.config or environ.get("HARNESS_CONFIG")
+    if not path and os.path.exists("harness.json"):
+        path = "harness.json"
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for key, value in json.load(f).items():
+                if key not in DEFAULTS:
+                    raise ValueError(f"Unknown config key {key!r} in {path}")
+                config[key] = _coerce(key, value)
+
+    for key in DEFAULTS:
+        for env_name in (f"HARNESS_{key.upper()}", ENV_ALIASES.get(key)):
+            if env_name and env_name in environ:
+                config[key] = _coerce(key, environ[env_name])
+
+    for key in DEFAULTS:
+        value = getattr(args, key)
+        if value is not None:
+            config[key] = _coerce(key, value)
+
+    config["base"] = config["base"].rstrip("/")
+    return config
+
+CONFIG = load_config()
+
+# -------------------------
+# Derived settings
+# -------------------------
+BASE = CONFIG["base"]
+AUTH_API = f"{BASE}/api/v1/auth"
+CATEGORY_API = f"{BASE}/api/v1/category"
+PRODUCT_API = f"{BASE}/api/v1/product"
+TIMEOUT = CONFIG["timeout"]
+LONG_TIMEOUT = CONFIG["long_timeout"]
+
+ADMIN_EMAIL = CONFIG["admin_email"]
+ADMIN_PASSWORD = CONFIG["admin_password"]
+USER_EMAIL = CONFIG["user_email"]
+USER_PASSWORD = CONFIG["user_password"]
+
+CONCURRENCY = CONFIG["concurrency"]
+POOL_SIZE = CONFIG["pool_size"]
+BURST_REQUESTS = CONFIG["burst_requests"]
+PACER.rate = CONFIG["request_rate"]
+
+MONGO_URL = CONFIG["mongo_url"]
+MONGO_DB = CONFIG["mongo_db"]
+
+def report_dir(suite):
+    """Report directory for a suite, e.g. report_dir("auth") -> ./reports_auth."""
+    return os.path.join(CONFIG["report_root"], f"reports_{suite}")
+
+def make_session(cache=None):
+    """requests.Session whose connection pool is sized for the configured concurrency.
+
+    With cache (default: the response_cache setting) it is a CachingSession.
+    """
+    if cache is None:
+        cache = CONFIG["response_cache"]
+    session = CachingSession() if cache else requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def make_profiler(report_dir):
+    """Profiler for Checkpoint.run when profile_probes is set, else None (probes run unwrapped)."""
+    return Profiler(report_dir, CONFIG["profile_top"]) if CONFIG["profile_probes"] else None
+
+# -------------------------
+# Fixture lookups (once per run)
+# -------------------------
+_resolved = {}
+
+def resolve_category_id():
+    """Category id used by product fixtures: configured value, else looked up from /get-category."""
+    if "category_id" not in _resolved:
+        cid = CONFIG["category_id"] or None
+        if cid is None:
+            try:
+                r = requests.get(f"{CATEGORY_API}/get-category", timeout=TIMEOUT)
+                categories = r.json().get("category", [])
+                wanted = CONFIG["category_slug"]
+                matches = [c for c in categories if not wanted or c.get("slug") == wanted]
+                cid = matches[0]["_id"] if matches else None
+            except Exception as e:
+                print("Category lookup failed:", e)
+        if cid is None:
+            print("Warning: no category id resolved; product fixtures will be rejected")
+        _resolved["category_id"] = cid
+    return _resolved["category_id"]
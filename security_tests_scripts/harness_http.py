@@ -0,0 +1,150 @@
+"""
+harness_http.py
+HTTP helpers shared by the harness scripts.
+
+CachingSession is an opt-in read-through cache for idempotent GETs within one run
+(enable with response_cache / --response-cache true; see harness_config.make_session):
+ - the cache key is method + URL (with query) + the security-relevant request headers, so a
+   request with a different token or Origin never sees another request's response
+ - concurrent identical GETs are coalesced: one goes to the server, the rest wait for it
+ - any POST/PUT/PATCH/DELETE drops the cached entries of the resource it mutates (and of
+   the resources whose responses embed it, e.g. products embed their category)
+ - probes that must reach the server (rate-limit bursts, timing) use make_session(cache=False)
+   or pass cache=False to a CachingSession
+
+PACER spaces request starts across all threads of a process. app.js mounts one 20 req/s
+limiter (per client IP) on all three routers, so sweeps share a single budget: request_with_retry
+waits for a slot before every attempt, and scripts that call a session directly call PACER.wait().
+The rate is the request_rate setting (harness_config applies it).
+"""
+
+import time
+import threading
+from urllib.parse import urlsplit
+import requests
+
+RATE_LIMIT_RETRIES = 3
+
+# Request headers that change what the server may return to the caller
+SECURITY_HEADERS = ("authorization", "origin", "cookie", "accept", "x-forwarded-for")
+CACHEABLE_METHODS = ("GET", "HEAD")
+# A mutation under /api/v1/<resource> invalidates cached responses of these resources
+RESOURCE_DEPENDENTS = {
+    "auth": ("auth",),
+    "category": ("category", "product"),
+    "product": ("product", "auth"),
+}
+
+class Pacer:
+    """Hands out request start slots 1/rate seconds apart across threads (rate <= 0: unpaced)."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            start = max(self._next_start, time.perf_counter())
+            self._next_start = start + 1 / self.rate
+        time.sleep(max(0.0, start - time.perf_counter()))
+
+# shared by every sweep in the process; 15 req/s leaves headroom under the 20 req/s limiter
+PACER = Pacer(15.0)
+
+def request_with_retry(session, method, url, retries=RATE_LIMIT_RETRIES, pacer=PACER, **kw):
+    """Sends a request paced by `pacer` (None: unpaced), waiting out the limiter window on 429
+    up to `retries` times.
+
+    Returns the final response (which may still be a 429) or the exception text if the
+    request could not be sent at all.
+    """
+    for attempt in range(retries + 1):
+        if pacer is not None:
+            pacer.wait()
+        try:
+            r = session.request(method, url, **kw)
+        except Exception as e:
+            return str(e)
+        if r.status_code != 429 or attempt == retries:
+            return r
+        time.sleep(1.0 + attempt * 0.5)
+
+def resource_of(url):
+    """'product' for http://host/api/v1/product/get-product, None outside the API."""
+    parts = urlsplit(url).path.strip("/").split("/")
+    return parts[2] if len(parts) >= 3 and parts[:2] == ["api", "v1"] else None
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+class CachingSession(requests.Session):
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0}
+
+    def _key(self, method, url, params, headers):
+        prepared = requests.Request(method, url, params=params).prepare()
+        merged = {k.lower(): v for k, v in self.headers.items()}
+        merged.update({k.lower(): v for k, v in (headers or {}).items()})
+        return (method, prepared.url, tuple((h, merged.get(h)) for h in SECURITY_HEADERS))
+
+    def invalidate(self, url):
+        resource = resource_of(url)
+        affected = RESOURCE_DEPENDENTS.get(resource, (resource,))
+        with self._lock:
+            stale = [k for k in self._entries if resource is None or resource_of(k[1]) in affected]
+            for k in stale:
+                del self._entries[k]
+            self.stats["invalidations"] += len(stale)
+
+    def request(self, method, url, *args, cache=True, **kw):
+        method = method.upper()
+        if method not in CACHEABLE_METHODS:
+            response = super().request(method, url, *args, **kw)
+            self.invalidate(url)
+            return response
+        if not cache or args or kw.get("stream"):
+            return super().request(method, url, *args, **kw)
+
+        key = self._key(method, url, kw.get("params"), kw.get("headers"))
+        with self._lock:
+            if key in self._entries:
+                self.stats["hits"] += 1
+                return self._entries[key]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _InFlight()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+
+        try:
+            flight.response = super().request(method, url, **kw)
+            # never pin throttling or server errors for the rest of the run
+            if flight.response.status_code != 429 and flight.response.status_code < 500:
+                with self._lock:
+                    self._entries[key] = flight.response
+            return flight.response
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
@@ -0,0 +1,41 @@
+"""
+instrumentation.py
+Run-wide request instrumentation for the harness scripts.
+
+start_instrumentation() installs the traffic recorder (record_traffic, see traffic.py) and the
+live metrics exporter (metrics_port / metrics_file, see metrics.py). Both wrap
+requests.Session.send, and the exporter can bind a port, so scripts call it first thing in
+main() instead of getting it as a side effect of importing harness_config. Requests sent while
+modules are imported (the module-level logins) are therefore neither recorded nor counted.
+"""
+
+import os
+import sys
+import time
+import traffic
+import metrics
+from harness_config import CONFIG, report_dir
+
+_started = {}
+
+def _start_recording():
+    directory = report_dir("traffic")
+    os.makedirs(directory, exist_ok=True)
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0] or "session"
+    # the pid keeps processes started in the same second (queue workers, parallel runs) apart
+    path = os.path.join(directory, f"{script}_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}.jsonl.gz")
+    return traffic.install(path, CONFIG["record_body_limit"])
+
+def start_instrumentation(live_metrics=True):
+    """Installs the configured recorder and exporter once per process; returns (recorder, metrics).
+
+    live_metrics=False leaves the exporter off, e.g. in processes that would share the
+    coordinator's metrics_port / metrics_file.
+    """
+    if not _started:
+        _started["recorder"] = _start_recording() if CONFIG["record_traffic"] else None
+        # installed after the recorder so it wraps it and times the recorded send as well
+        serve = live_metrics and (CONFIG["metrics_port"] or CONFIG["metrics_file"])
+        _started["metrics"] = (metrics.install(CONFIG["metrics_host"], CONFIG["metrics_port"], CONFIG["metrics_file"],
+                                               CONFIG["metrics_interval"]) if serve else None)
+    return _started["recorder"], _started["metrics"]
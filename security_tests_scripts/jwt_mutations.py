@@ -0,0 +1,88 @@
+"""
+jwt_mutations.py
+JWT mutation engine for token-handling probes.
+
+mutate(token, other_token=None) turns one valid token into a list of
+(variant_class, label, mutated_token) tuples. Every variant must be rejected by
+requireSignIn; none of them can carry a valid HS256 signature because the engine never
+knows JWT_SECRET. Variants are built once per run and shared by every probe that needs them.
+
+Variant classes:
+  alg_none       header alg set to none/None/NONE, signature dropped
+  alg_confusion  header alg switched (HS512, RS256) with the original signature
+  segment_swap   header and payload segments swapped / duplicated
+  claim_swap     _id or role replaced (with the other account's claims when given)
+  time_claims    exp in the past, nbf / iat in the future
+  signature      signature truncated, emptied, removed or bit-flipped
+  encoding       base64 padding, standard alphabet, case change
+  legacy         the suffix corruptions used by the original suites ("L", "BAD")
+"""
+
+import json
+import time
+import base64
+
+def b64url_decode(segment):
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def b64url_encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def encode_json(obj):
+    return b64url_encode(json.dumps(obj, separators=(",", ":")).encode())
+
+def split(token):
+    header, payload, signature = token.split(".")
+    return json.loads(b64url_decode(header)), json.loads(b64url_decode(payload)), signature
+
+def mutate(token, other_token=None):
+    if not token or token.count(".") != 2:
+        return []
+    header, payload, signature = split(token)
+    h, p, s = token.split(".")
+    now = int(time.time())
+    variants = []
+
+    def add(cls, label, value):
+        # a re-encoding can be a no-op for some tokens (e.g. nothing to pad); never send the original
+        if value != token:
+            variants.append((cls, label, value))
+
+    for alg in ("none", "None", "NONE"):
+        none_header = encode_json(dict(header, alg=alg))
+        add("alg_none", f"alg={alg}, empty signature", f"{none_header}.{p}.")
+        add("alg_none", f"alg={alg}, original signature", f"{none_header}.{p}.{s}")
+    for alg in ("HS512", "RS256"):
+        add("alg_confusion", f"alg={alg}", f"{encode_json(dict(header, alg=alg))}.{p}.{s}")
+
+    add("segment_swap", "payload.header.signature", f"{p}.{h}.{s}")
+    add("segment_swap", "header.header.signature", f"{h}.{h}.{s}")
+    add("segment_swap", "payload.payload.signature", f"{p}.{p}.{s}")
+
+    other_payload = split(other_token)[1] if other_token and other_token.count(".") == 2 else {}
+    if other_payload.get("_id") and other_payload["_id"] != payload.get("_id"):
+        add("claim_swap", "_id of other account", f"{h}.{encode_json(dict(payload, _id=other_payload['_id']))}.{s}")
+    add("claim_swap", "_id zeroed", f"{h}.{encode_json(dict(payload, _id='000000000000000000000000'))}.{s}")
+    add("claim_swap", "role=1 claim added", f"{h}.{encode_json(dict(payload, role=1))}.{s}")
+    add("claim_swap", "_id as operator object", f"{h}.{encode_json(dict(payload, _id={'$ne': None}))}.{s}")
+
+    add("time_claims", "exp in the past", f"{h}.{encode_json(dict(payload, exp=now - 3600))}.{s}")
+    add("time_claims", "nbf in the future", f"{h}.{encode_json(dict(payload, nbf=now + 3600))}.{s}")
+    add("time_claims", "iat in the future", f"{h}.{encode_json(dict(payload, iat=now + 3600))}.{s}")
+    add("time_claims", "exp removed", f"{h}.{encode_json({k: v for k, v in payload.items() if k != 'exp'})}.{s}")
+
+    add("signature", "last char dropped", token[:-1])
+    add("signature", "half signature", f"{h}.{p}.{s[:len(s) // 2]}")
+    add("signature", "empty signature", f"{h}.{p}.")
+    add("signature", "no signature segment", f"{h}.{p}")
+    flipped = bytearray(b64url_decode(s))
+    flipped[0] ^= 0x01
+    add("signature", "first signature bit flipped", f"{h}.{p}.{b64url_encode(bytes(flipped))}")
+
+    add("encoding", "base64 padding added", ".".join(seg + "=" * (-len(seg) % 4) for seg in (h, p, s)))
+    add("encoding", "standard base64 alphabet", token.replace("-", "+").replace("_", "/"))
+    add("encoding", "upper-cased", token.upper())
+
+    add("legacy", "suffix L", token + "L")
+    add("legacy", "suffix BAD", token + "BAD")
+    return variants
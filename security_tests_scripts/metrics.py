@@ -0,0 +1,181 @@
+"""
+metrics.py
+Live OpenMetrics / Prometheus exporter for a harness run.
+
+With metrics_port or metrics_file set, instrumentation.start_instrumentation() installs the
+exporter when a script's main() starts. Like the traffic recorder it wraps requests.Session.send,
+so every request the script sends from then on is counted while the run is in progress (responses served from CachingSession
+never reach the server and are not counted):
+  harness_requests_total{endpoint,method,status}      status is "error" when nothing came back
+  harness_rate_limited_total{endpoint}                 429 answers from the express-rate-limit guard
+  harness_request_duration_seconds{endpoint}           histogram, time to response headers
+  harness_requests_in_flight                           requests sent and not yet answered
+  harness_probe_results_total{result="pass"|"fail"}    entries recorded so far in the script's
+                                                       results["tests"]
+  harness_start_time_seconds                           when the exporter was installed
+Every series also carries script="<script name>". endpoint is the route_catalog path template
+(/get-product/:slug), so payloads in the URL do not create new series; URLs outside the
+catalog are counted as "other".
+
+metrics_port serves /metrics over HTTP on metrics_host for a Prometheus scrape (OpenMetrics
+when the scraper asks for it, the Prometheus text format otherwise). metrics_file is
+rewritten every metrics_interval seconds and at exit in the text format, for the node_exporter
+textfile collector (give it a .prom name inside the collector directory). Scripts running in
+parallel need their own port or file.
+"""
+
+import os
+import sys
+import time
+import atexit
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from route_catalog import route_for
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value):
+    return str(value).replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n")
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+class Metrics:
+    def __init__(self):
+        self.script = os.path.splitext(os.path.basename(sys.argv[0]))[0] or "session"
+        self.started = time.time()
+        self.in_flight = 0
+        self.requests = defaultdict(int)
+        self.rate_limited = defaultdict(int)
+        self.latency = {}
+        self._lock = threading.Lock()
+
+    def endpoint(self, method, url):
+        route = route_for(method, url)
+        return route["path"] if route else "other"
+
+    def started_request(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def observe(self, method, url, status, seconds):
+        endpoint = self.endpoint(method, url)
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(endpoint, method, status)] += 1
+            if status == 429:
+                self.rate_limited[endpoint] += 1
+            histogram = self.latency.setdefault(endpoint, [0] * len(BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def _probe_results(self):
+        results = getattr(sys.modules.get("__main__"), "results", None)
+        tests = results.get("tests", []) if isinstance(results, dict) else []
+        passed = sum(1 for t in list(tests) if t.get("ok"))
+        return passed, len(tests) - passed
+
+    def render(self, openmetrics=True):
+        """Exposition text; OpenMetrics drops _total from counter family names and ends with # EOF."""
+        script = self.script
+        with self._lock:
+            requests_ = dict(self.requests)
+            rate_limited = dict(self.rate_limited)
+            latency = {k: list(v) for k, v in self.latency.items()}
+            in_flight = self.in_flight
+        passed, failed = self._probe_results()
+        lines = []
+
+        def family(name, kind, help_text):
+            family_name = name[:-len("_total")] if openmetrics and kind == "counter" else name
+            lines.append(f"# TYPE {family_name} {kind}")
+            lines.append(f"# HELP {family_name} {help_text}")
+
+        family("harness_requests_total", "counter", "Requests sent, by endpoint, method and status.")
+        for (endpoint, method, status), n in sorted(requests_.items(), key=str):
+            lines.append(f"harness_requests_total{_labels(script=script, endpoint=endpoint, method=method, status=status)} {n}")
+        family("harness_rate_limited_total", "counter", "429 responses, by endpoint.")
+        for endpoint, n in sorted(rate_limited.items()):
+            lines.append(f"harness_rate_limited_total{_labels(script=script, endpoint=endpoint)} {n}")
+        family("harness_request_duration_seconds", "histogram", "Time to response headers, by endpoint.")
+        for endpoint, histogram in sorted(latency.items()):
+            for bound, n in zip(BUCKETS, histogram):
+                lines.append(f"harness_request_duration_seconds_bucket{_labels(script=script, endpoint=endpoint, le=bound)} {n}")
+            lines.append(f"harness_request_duration_seconds_bucket{_labels(script=script, endpoint=endpoint, le='+Inf')} {histogram[-1]}")
+            lines.append(f"harness_request_duration_seconds_sum{_labels(script=script, endpoint=endpoint)} {histogram[-2]:.6f}")
+            lines.append(f"harness_request_duration_seconds_count{_labels(script=script, endpoint=endpoint)} {histogram[-1]}")
+        family("harness_requests_in_flight", "gauge", "Requests sent and not yet answered.")
+        lines.append(f"harness_requests_in_flight{_labels(script=script)} {in_flight}")
+        family("harness_probe_results_total", "counter", "Checks recorded in results.json so far, by outcome.")
+        lines.append(f"harness_probe_results_total{_labels(script=script, result='pass')} {passed}")
+        lines.append(f"harness_probe_results_total{_labels(script=script, result='fail')} {failed}")
+        family("harness_start_time_seconds", "gauge", "Unix time the run started.")
+        lines.append(f"harness_start_time_seconds{_labels(script=script)} {self.started:.3f}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render(openmetrics=False))
+        os.replace(tmp, path)
+
+def _serve(metrics, host, port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            body = metrics.render(openmetrics).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving metrics on http://{host}:{port}/metrics")
+
+def _write_every(metrics, path, interval):
+    def loop():
+        while True:
+            time.sleep(interval)
+            metrics.write(path)
+    threading.Thread(target=loop, daemon=True).start()
+    atexit.register(metrics.write, path)
+
+def install(host="127.0.0.1", port=0, path="", interval=5.0):
+    """Counts every requests.Session.send; serves on port and/or rewrites path (0 / "" = off)."""
+    metrics = Metrics()
+    inner = requests.Session.send
+
+    def send(session, request, **kw):
+        metrics.started_request()
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = inner(session, request, **kw)
+            status = response.status_code
+            return response
+        finally:
+            metrics.observe(request.method, request.url, status, time.perf_counter() - started)
+
+    requests.Session.send = send
+    if port:
+        _serve(metrics, host, port)
+    if path:
+        _write_every(metrics, path, interval)
+    return metrics
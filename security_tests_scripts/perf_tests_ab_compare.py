@@ -0,0 +1,224 @@
+"""
+perf_tests_ab_compare.py
+A/B performance comparison between two server builds (MERN App)
+
+Runs the same workload against two base URLs, e.g. the current build on :3000 and a build with
+a new index in models/productModel.js on :6062 (ab_base_a, default base, and ab_base_b):
+ - latency: every public GET route plus /product-filters, one request per endpoint per round
+   for ab_rounds rounds. A and B alternate (ABBA order), so drift on the machine (other load,
+   thermal, GC) hits both builds equally
+ - burst rate: ab_burst_rounds bursts of ab_burst concurrent requests per endpoint and build,
+   each started in a fresh limiter window. The rate is ab_burst / time until the last answer,
+   i.e. how fast the build drains a small concurrent burst. It is not sustained throughput:
+   each build's 20 req/s limiter (one for all routers) caps any sustained rate from one client,
+   so a longer run would measure express-rate-limit rather than the build
+Both builds should use the same database contents; path params come from real slugs / ids
+looked up on A once.
+
+Each endpoint is reported with the median latency and the mean burst rate of both builds,
+B - A deltas with bootstrap 95% CIs, and a regression flag. The flag is raised when the CI
+excludes zero and B is more than ab_regression_pct slower, or has that much lower a burst rate.
+Requires numpy.
+Outputs: reports_ab_compare/results.json
+"""
+
+import os
+import json
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from harness_config import BASE, TIMEOUT, CONFIG, report_dir, make_session
+from instrumentation import start_instrumentation
+from route_catalog import ROUTES, concrete_url, fixture_url, label
+from sample_store import SampleStore, ERROR
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("ab_compare")
+SESSION = make_session(cache=False)
+
+BASES = {"A": (CONFIG["ab_base_a"] or BASE).rstrip("/"), "B": CONFIG["ab_base_b"].rstrip("/")}
+ROUNDS = CONFIG["ab_rounds"]
+BURST = CONFIG["ab_burst"]
+BURST_ROUNDS = CONFIG["ab_burst_rounds"]
+BOOTSTRAP = CONFIG["ab_bootstrap"]
+REGRESSION_PCT = CONFIG["ab_regression_pct"]
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base_a": BASES["A"],
+        "base_b": BASES["B"],
+        "rounds": ROUNDS,
+        "burst": BURST,
+        "burst_rounds": BURST_ROUNDS,
+        "burst_rate": "requests answered / seconds for one burst in a fresh limiter window; not sustained throughput"
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Workload
+# -------------------------
+def discover_params():
+    """Real slugs / ids from build A so the workload hits populated documents."""
+    params = {}
+    try:
+        categories = SESSION.get(f"{BASES['A']}/api/v1/category/get-category", timeout=TIMEOUT).json().get("category", [])
+        products = SESSION.get(f"{BASES['A']}/api/v1/product/get-product", timeout=TIMEOUT).json().get("products", [])
+    except Exception:
+        return params
+    if categories:
+        params["category_slug"] = categories[0].get("slug")
+    if products:
+        params.update(slug=products[0].get("slug"), pid=products[0].get("_id"),
+                      cid=(products[0].get("category") or {}).get("_id"))
+    return {k: v for k, v in params.items() if v}
+
+def workload(params):
+    """(label, method, path, json body) for every endpoint of the comparison."""
+    jobs = []
+    for route in ROUTES:
+        if route["auth"] != "public":
+            continue
+        if route["method"] == "GET":
+            jobs.append((label(route), "GET", fixture_url(route, params).replace(BASE, "", 1), None))
+        elif route["path"] == "/product-filters":
+            jobs.append((label(route), "POST", concrete_url(route).replace(BASE, "", 1), {"checked": [], "radio": []}))
+    return jobs
+
+def send(samples, variant, job):
+    name, method, path, body = job
+    return samples.timed(f"{variant}|{name}", SESSION.request, method, BASES[variant] + path, json=body, timeout=TIMEOUT)
+
+def latency_phase(samples, jobs):
+    for i in range(ROUNDS):
+        order = ("A", "B") if i % 2 == 0 else ("B", "A")
+        for job in random.sample(jobs, len(jobs)):
+            for variant in order:
+                send(samples, variant, job)
+                # each build sees well under its 20 req/s limit
+                time.sleep(0.03)
+
+def burst_phase(jobs):
+    """{(variant, label): [requests/s per burst]} counting only non-429 answers."""
+    rates = {}
+    with ThreadPoolExecutor(max_workers=BURST) as ex:
+        for i in range(BURST_ROUNDS):
+            for job in jobs:
+                for variant in (("A", "B") if i % 2 == 0 else ("B", "A")):
+                    burst = SampleStore()
+                    started = time.perf_counter()
+                    list(ex.map(lambda _: send(burst, variant, job), range(BURST)))
+                    elapsed = time.perf_counter() - started
+                    answered = len(burst) - burst.count(429) - burst.count(ERROR)
+                    rates.setdefault((variant, job[0]), []).append(answered / elapsed)
+                    # let the build's limiter window (shared by all of its routers) reset
+                    time.sleep(1.05)
+    return rates
+
+# -------------------------
+# Statistics
+# -------------------------
+def bootstrap_ci(a, b, stat):
+    """95% CI of stat(b) - stat(a) by resampling both sides independently."""
+    rng = np.random.default_rng()
+    boot_a = stat(a[rng.integers(0, len(a), (BOOTSTRAP, len(a)))], axis=1)
+    boot_b = stat(b[rng.integers(0, len(b), (BOOTSTRAP, len(b)))], axis=1)
+    low, high = np.percentile(boot_b - boot_a, [2.5, 97.5])
+    return float(low), float(high)
+
+def compare(name, samples, rates):
+    lat_a, lat_b = samples.latencies(f"A|{name}"), samples.latencies(f"B|{name}")
+    tp_a = np.array(rates.get(("A", name), []), dtype=np.float64)
+    tp_b = np.array(rates.get(("B", name), []), dtype=np.float64)
+    if len(lat_a) < 5 or len(lat_b) < 5:
+        record(f"A/B - {name}", False, summary="Too few answered requests (rate limited or unreachable)",
+               details={"A": samples.status_counts(f"A|{name}"), "B": samples.status_counts(f"B|{name}")}, endpoint=name)
+        return
+
+    med_a, med_b = float(np.median(lat_a)), float(np.median(lat_b))
+    lat_low, lat_high = bootstrap_ci(lat_a, lat_b, np.median)
+    lat_pct = (med_b - med_a) / med_a * 100 if med_a else 0.0
+    slower = lat_low > 0 and lat_pct > REGRESSION_PCT
+
+    details = {
+        "latency_ms": {
+            "A": samples.percentiles(endpoint=f"A|{name}"),
+            "B": samples.percentiles(endpoint=f"B|{name}"),
+            "median_delta_ms": round(med_b - med_a, 3),
+            "median_delta_ci95_ms": [round(lat_low, 3), round(lat_high, 3)],
+            "median_delta_pct": round(lat_pct, 1),
+        },
+        "status_codes": {"A": samples.status_counts(f"A|{name}"), "B": samples.status_counts(f"B|{name}")},
+    }
+    lower_burst_rate = False
+    if len(tp_a) >= 2 and len(tp_b) >= 2:
+        mean_a, mean_b = float(tp_a.mean()), float(tp_b.mean())
+        tp_low, tp_high = bootstrap_ci(tp_a, tp_b, np.mean)
+        tp_pct = (mean_b - mean_a) / mean_a * 100 if mean_a else 0.0
+        lower_burst_rate = tp_high < 0 and -tp_pct > REGRESSION_PCT
+        details["burst_rate_rps"] = {
+            "A": round(mean_a, 2),
+            "B": round(mean_b, 2),
+            "delta_ci95": [round(tp_low, 2), round(tp_high, 2)],
+            "delta_pct": round(tp_pct, 1),
+        }
+
+    record(
+        name=f"A/B - {name}",
+        ok=not slower and not lower_burst_rate,
+        summary=(f"median {med_a:.1f} -> {med_b:.1f} ms ({lat_pct:+.1f}%, CI95 {lat_low:+.2f}..{lat_high:+.2f} ms)"
+                 + (f", burst rate {details['burst_rate_rps']['delta_pct']:+.1f}%" if "burst_rate_rps" in details else "")),
+        details=details,
+        endpoint=name
+    )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if np is None:
+        record("A/B setup", False, summary="numpy is not installed (pip install numpy)")
+    elif not BASES["B"]:
+        record("A/B setup", False, summary="Set ab_base_b (--ab-base-b URL) to the build to compare against")
+    else:
+        jobs = workload(discover_params())
+        samples = SampleStore()
+        latency_phase(samples, jobs)
+        rates = burst_phase(jobs) if BURST_ROUNDS else {}
+        for name, _, _, _ in jobs:
+            compare(name, samples, rates)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ A/B comparison finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+perf_tests_cold_start.py
+Server cold-start and warm-up benchmark (MERN App)
+
+Starts the backend itself (`node server.js` from server_dir, on cold_start_port) and measures:
+ - time to listen: time until the first HTTP response of any status
+ - time to ready: time until the first 200 from /get-category. server.js listens before
+   connectDB() has finished, so this includes the MongoDB connection and Mongoose buffering
+ - warm-up: latency of the first warmup_requests requests to every public GET route and to
+   /login, sent round-robin so no route warms the code another route then reuses. The first
+   request is compared with the steady-state median (second half of the requests)
+This is repeated cold_start_runs times, with a fresh process each time.
+
+cold_start_db = "local" uses mongo_url / mongo_db. "memory" starts a throwaway
+mongodb-memory-server from the app's devDependencies. On an empty memory database /login
+finds no user, so bcrypt only shows up in the warm-up when the admin account exists (local).
+Run it against a port nothing else is using; the server under test for the other scripts
+(base) is left alone.
+Outputs: reports_cold_start/results.json, server_run<N>.log
+"""
+
+import os
+import json
+import time
+import shutil
+import statistics
+import subprocess
+from urllib.parse import urlparse
+import requests
+from harness_config import (
+    BASE, TIMEOUT, LONG_TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, MONGO_URL, MONGO_DB, CONFIG, report_dir,
+)
+from instrumentation import start_instrumentation
+from harness_http import PACER
+from route_catalog import ROUTES, concrete_url, label
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("cold_start")
+SERVER_DIR = os.path.abspath(CONFIG["server_dir"])
+PORT = CONFIG["cold_start_port"]
+LOCAL_BASE = f"http://127.0.0.1:{PORT}"
+DB_MODE = CONFIG["cold_start_db"]
+RUNS = CONFIG["cold_start_runs"]
+BUDGET = CONFIG["cold_start_budget"]
+WARMUP_REQUESTS = CONFIG["warmup_requests"]
+POLL_INTERVAL = 0.01
+
+# Prints the URI of a fresh in-memory MongoDB and keeps it alive until terminated
+MEMORY_DB_SCRIPT = """
+import { MongoMemoryServer } from "mongodb-memory-server";
+const server = await MongoMemoryServer.create();
+console.log(server.getUri(process.argv[1]));
+process.on("SIGTERM", async () => { await server.stop(); process.exit(0); });
+setInterval(() => {}, 1 << 30);
+"""
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "server_dir": SERVER_DIR,
+        "base": LOCAL_BASE,
+        "db": DB_MODE,
+        "runs": RUNS
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def local_url(route):
+    return concrete_url(route).replace(BASE, LOCAL_BASE, 1)
+
+def warmup_routes():
+    """(label, method, url, json body) for every public GET route plus /login."""
+    out = [(label(r), "GET", local_url(r), None) for r in ROUTES if r["method"] == "GET" and r["auth"] == "public"]
+    login = next(r for r in ROUTES if r["path"] == "/login")
+    out.append((label(login), "POST", local_url(login), {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}))
+    return out
+
+def database_url():
+    if urlparse(MONGO_URL).path in ("", "/"):
+        return f"{MONGO_URL.rstrip('/')}/{MONGO_DB}"
+    return MONGO_URL
+
+def start_memory_db():
+    proc = subprocess.Popen(
+        ["node", "--input-type=module", "-e", MEMORY_DB_SCRIPT, MONGO_DB],
+        cwd=SERVER_DIR, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    # first start may download the mongod binary
+    uri = proc.stdout.readline().strip()
+    if not uri.startswith("mongodb://"):
+        stop(proc)
+        raise RuntimeError("mongodb-memory-server did not start (npm install in server_dir?)")
+    return proc, uri
+
+def stop(proc):
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+# -------------------------
+# Measurements
+# -------------------------
+def wait_until_ready(proc, started):
+    """Seconds until the first response and until the first 200 from /get-category (None if never)."""
+    url = f"{LOCAL_BASE}/api/v1/category/get-category"
+    first_response = None
+    while time.perf_counter() - started < LONG_TIMEOUT:
+        if proc.poll() is not None:
+            break
+        try:
+            r = requests.get(url, timeout=TIMEOUT)
+            elapsed = time.perf_counter() - started
+            if first_response is None:
+                first_response = elapsed
+            if r.status_code == 200:
+                return first_response, elapsed
+        except requests.RequestException:
+            pass
+        time.sleep(POLL_INTERVAL)
+    return first_response, None
+
+def warm_up(routes):
+    latencies = {name: [] for name, _, _, _ in routes}
+    statuses = {name: set() for name, _, _, _ in routes}
+    for _ in range(WARMUP_REQUESTS):
+        for name, method, url, body in routes:
+            # the started server has one 20 req/s limiter for all of its routers
+            PACER.wait()
+            started = time.perf_counter()
+            try:
+                r = requests.request(method, url, json=body, timeout=TIMEOUT)
+                statuses[name].add(r.status_code)
+            except Exception as e:
+                statuses[name].add(type(e).__name__)
+            latencies[name].append((time.perf_counter() - started) * 1000)
+    return latencies, statuses
+
+def cold_start_run(n, mongo_url):
+    log_path = os.path.join(REPORT_DIR, f"server_run{n}.log")
+    env = dict(os.environ, PORT=str(PORT), MONGO_URL=mongo_url)
+    with open(log_path, "w") as log:
+        started = time.perf_counter()
+        proc = subprocess.Popen(["node", "server.js"], cwd=SERVER_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+        try:
+            listen_s, ready_s = wait_until_ready(proc, started)
+            # None while the server is still running; an exit code means it crashed on startup
+            exit_code = proc.poll()
+            warm = warm_up(warmup_routes()) if ready_s is not None else None
+        finally:
+            stop(proc)
+    return {"listen_s": listen_s, "ready_s": ready_s, "exit_code": exit_code, "warm": warm, "log": log_path}
+
+def report(runs):
+    ready = [r["ready_s"] for r in runs if r["ready_s"] is not None]
+    listen = [r["listen_s"] for r in runs if r["listen_s"] is not None]
+    record(
+        name="Cold start - time to first 200 from /get-category",
+        ok=bool(ready) and len(ready) == len(runs) and max(ready) <= BUDGET,
+        summary=(f"median {statistics.median(ready):.2f}s, max {max(ready):.2f}s over {len(ready)}/{len(runs)} runs "
+                 f"(budget {BUDGET}s)") if ready else "server never became ready (see server_run<N>.log)",
+        details={
+            "ready_s": [None if r["ready_s"] is None else round(r["ready_s"], 3) for r in runs],
+            "listen_s": [None if r["listen_s"] is None else round(r["listen_s"], 3) for r in runs],
+            "listen_median_s": round(statistics.median(listen), 3) if listen else None,
+            "startup_exit_codes": [r["exit_code"] for r in runs],
+            "logs": [r["log"] for r in runs],
+        },
+        endpoint="/get-category"
+    )
+
+    warm_runs = [r["warm"] for r in runs if r["warm"] is not None]
+    if not warm_runs:
+        return
+    for name in warm_runs[0][0]:
+        firsts = [lat[name][0] for lat, _ in warm_runs]
+        early = [statistics.median(lat[name][:5]) for lat, _ in warm_runs]
+        steady = [statistics.median(lat[name][len(lat[name]) // 2:]) for lat, _ in warm_runs]
+        codes = sorted({str(c) for _, st in warm_runs for c in st[name]})
+        first_ms, steady_ms = statistics.median(firsts), statistics.median(steady)
+        record(
+            name=f"Warm-up - {name}",
+            ok=not any(c.startswith("5") or not c.isdigit() for c in codes),
+            summary=(f"first {first_ms:.1f} ms, first-5 median {statistics.median(early):.1f} ms, "
+                     f"steady median {steady_ms:.1f} ms ({first_ms / steady_ms:.1f}x)"),
+            details={
+                "first_ms": [round(v, 2) for v in firsts],
+                "first5_median_ms": [round(v, 2) for v in early],
+                "steady_median_ms": [round(v, 2) for v in steady],
+                "status_codes": codes,
+            },
+            endpoint=name
+        )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if shutil.which("node") is None:
+        record("Cold start setup", False, summary="node is not installed")
+    elif not os.path.exists(os.path.join(SERVER_DIR, "server.js")):
+        record("Cold start setup", False, summary=f"server.js not found in server_dir {SERVER_DIR}")
+    else:
+        memory_db = None
+        try:
+            if DB_MODE == "memory":
+                memory_db, mongo_url = start_memory_db()
+            else:
+                mongo_url = database_url()
+            report([cold_start_run(n, mongo_url) for n in range(1, RUNS + 1)])
+        except Exception as e:
+            record("Cold start setup", False, summary="Could not start the server or database", details=str(e))
+        finally:
+            if memory_db is not None:
+                stop(memory_db)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Cold-start benchmark finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
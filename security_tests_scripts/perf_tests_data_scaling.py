@@ -0,0 +1,264 @@
+"""
+perf_tests_data_scaling.py
+Data-volume scaling benchmark for public Product endpoints (MERN App)
+
+Bulk-seeds a local MongoDB with synthetic products spread over a handful of categories,
+growing the catalogue step by step (1k, 10k, 100k, 1M by default). At each step the public
+endpoints are timed and their response size measured, so routes whose payload grows with the
+catalogue (no limit / pagination) stand out before they hit production.
+
+Requires pymongo. Point mongo_url / mongo_db in harness_config.py (or MONGO_URL / MONGO_DB) at
+the database the server under test is using; scales and samples come from bench_scales and
+bench_samples. Seeding refuses non-local hosts unless bench_allow_remote is set.
+Synthetic data is removed at the end of the run.
+Outputs: reports_data_scaling/results.json, scaling.csv and scaling.png (if matplotlib is installed)
+"""
+
+import os
+import csv
+import json
+import time
+import statistics
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import requests
+from harness_config import BASE, PRODUCT_API, LONG_TIMEOUT, MONGO_URL, MONGO_DB, CONFIG, report_dir
+from instrumentation import start_instrumentation
+from harness_http import PACER
+
+try:
+    from pymongo import MongoClient
+    from bson import ObjectId
+except ImportError:
+    MongoClient = None
+
+# -------------------------
+# Configuration
+# -------------------------
+TIMEOUT = LONG_TIMEOUT
+REPORT_DIR = report_dir("data_scaling")
+
+ALLOW_REMOTE = CONFIG["bench_allow_remote"]
+SCALES = CONFIG["bench_scales"]
+SAMPLES = CONFIG["bench_samples"]
+BENCH_CATEGORIES = 10
+BATCH_SIZE = 5000
+# One in every KEYWORD_EVERY products carries the search keyword in its description
+SEARCH_KEYWORD = "benchwidget"
+KEYWORD_EVERY = 10
+
+PRODUCT_PREFIX = "bench_prod_"
+CATEGORY_PREFIX = "bench-cat-"
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "api": PRODUCT_API,
+        "scales": SCALES,
+        "samples": SAMPLES
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Seeding
+# -------------------------
+def connect_db():
+    host = urlparse(MONGO_URL).hostname or ""
+    if not ALLOW_REMOTE and host not in ("localhost", "127.0.0.1", "::1"):
+        raise RuntimeError(f"Refusing to bulk-seed non-local host {host!r} (set bench_allow_remote)")
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=3000)
+    client.admin.command("ping")
+    return client.get_default_database(default=MONGO_DB)
+
+def seed_categories(db):
+    categories = []
+    for i in range(BENCH_CATEGORIES):
+        doc = {"name": f"{CATEGORY_PREFIX}{i}", "slug": f"{CATEGORY_PREFIX}{i}"}
+        db["categories"].update_one({"slug": doc["slug"]}, {"$setOnInsert": doc}, upsert=True)
+        categories.append(db["categories"].find_one({"slug": doc["slug"]}))
+    return categories
+
+def synthetic_products(start, stop, categories):
+    now = datetime.now(timezone.utc)
+    for i in range(start, stop):
+        keyword = f" {SEARCH_KEYWORD}" if i % KEYWORD_EVERY == 0 else ""
+        yield {
+            "_id": ObjectId(),
+            "name": f"{PRODUCT_PREFIX}{i}",
+            "slug": f"{PRODUCT_PREFIX}{i}",
+            "description": f"synthetic product {i} for scaling benchmark{keyword}",
+            "price": (i % 500) + 1,
+            "category": categories[i % len(categories)]["_id"],
+            "quantity": 100,
+            "shipping": i % 2 == 0,
+            "createdAt": now,
+            "updatedAt": now,
+            "__v": 0,
+        }
+
+def grow_catalogue(db, current, target, categories):
+    """Insert products [current, target) in batches without materialising them all."""
+    batch = []
+    for doc in synthetic_products(current, target, categories):
+        batch.append(doc)
+        if len(batch) == BATCH_SIZE:
+            db["products"].insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        db["products"].insert_many(batch, ordered=False)
+
+def remove_synthetic_data(db):
+    removed = db["products"].delete_many({"slug": {"$regex": f"^{PRODUCT_PREFIX}"}}).deleted_count
+    db["categories"].delete_many({"slug": {"$regex": f"^{CATEGORY_PREFIX}"}})
+    return removed
+
+# -------------------------
+# Measurement
+# -------------------------
+def endpoints(category_slug):
+    return [
+        ("/search/:keyword", "get", f"{PRODUCT_API}/search/{SEARCH_KEYWORD}", None),
+        ("/product-filters", "post", f"{PRODUCT_API}/product-filters", {"checked": [], "radio": []}),
+        ("/product-category-count/:slug", "get", f"{PRODUCT_API}/product-category-count/{category_slug}", None),
+        ("/product-category/:slug", "get", f"{PRODUCT_API}/product-category/{category_slug}", None),
+        ("/get-product", "get", f"{PRODUCT_API}/get-product", None),
+    ]
+
+def measure(method, url, body):
+    latencies, sizes, codes = [], [], []
+    for _ in range(SAMPLES):
+        # app.js has one 20 req/s limiter per client for all routers; wait for a shared slot untimed
+        PACER.wait()
+        started = time.perf_counter()
+        try:
+            r = getattr(requests, method)(url, json=body, timeout=TIMEOUT)
+            codes.append(r.status_code)
+            sizes.append(len(r.content))
+        except Exception as e:
+            codes.append(str(e))
+            sizes.append(0)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "latency_ms_median": round(statistics.median(latencies), 2),
+        "latency_ms_max": round(max(latencies), 2),
+        "response_bytes": max(sizes),
+        "status_codes": sorted(set(map(str, codes))),
+    }
+
+def write_chart(rows):
+    csv_path = os.path.join(REPORT_DIR, "scaling.csv")
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib not installed; wrote scaling.csv only")
+        return
+
+    fig, (ax_lat, ax_size) = plt.subplots(1, 2, figsize=(12, 5))
+    for endpoint in dict.fromkeys(r["endpoint"] for r in rows):
+        series = [r for r in rows if r["endpoint"] == endpoint]
+        xs = [r["products"] for r in series]
+        ax_lat.plot(xs, [r["latency_ms_median"] for r in series], marker="o", label=endpoint)
+        ax_size.plot(xs, [max(r["response_bytes"], 1) for r in series], marker="o", label=endpoint)
+    for ax, label in ((ax_lat, "median latency (ms)"), (ax_size, "response size (bytes)")):
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_xlabel("products in catalogue")
+        ax.set_ylabel(label)
+        ax.grid(True, which="both", alpha=0.3)
+    ax_size.legend(fontsize="small")
+    fig.tight_layout()
+    fig.savefig(os.path.join(REPORT_DIR, "scaling.png"))
+
+def assess(rows):
+    """Flag endpoints whose response size grows roughly in step with the catalogue."""
+    for endpoint in dict.fromkeys(r["endpoint"] for r in rows):
+        series = [r for r in rows if r["endpoint"] == endpoint]
+        first, last = series[0], series[-1]
+        volume_ratio = last["products"] / max(first["products"], 1)
+        size_ratio = last["response_bytes"] / max(first["response_bytes"], 1)
+        latency_ratio = last["latency_ms_median"] / max(first["latency_ms_median"], 0.01)
+        unbounded = volume_ratio > 1 and size_ratio >= volume_ratio ** 0.5
+        record(
+            name=f"Data scaling - {endpoint}",
+            ok=not unbounded,
+            summary=(f"Response size grew x{size_ratio:.1f} for x{volume_ratio:.0f} data - unbounded result set"
+                     if unbounded else f"Response size bounded (x{size_ratio:.1f} for x{volume_ratio:.0f} data)"),
+            details={
+                "size_ratio": round(size_ratio, 2),
+                "latency_ratio": round(latency_ratio, 2),
+                "series": [{k: r[k] for k in ("products", "latency_ms_median", "response_bytes")} for r in series],
+            },
+            endpoint=endpoint
+        )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if MongoClient is None:
+        record("Data scaling setup", False, summary="pymongo is not installed (pip install pymongo)")
+    else:
+        try:
+            db = connect_db()
+        except Exception as e:
+            db = None
+            record("Data scaling setup", False, summary="MongoDB not reachable or not local", details=str(e))
+
+        if db is not None:
+            rows = []
+            try:
+                categories = seed_categories(db)
+                current = 0
+                for scale in sorted(SCALES):
+                    seed_started = time.perf_counter()
+                    grow_catalogue(db, current, scale, categories)
+                    current = scale
+                    print(f"Seeded {scale} products in {time.perf_counter() - seed_started:.1f}s")
+                    for endpoint, method, url, body in endpoints(categories[0]["slug"]):
+                        row = {"products": scale, "endpoint": endpoint}
+                        row.update(measure(method, url, body))
+                        row["status_codes"] = ";".join(row["status_codes"])
+                        rows.append(row)
+                        print(f"  {endpoint:<32} {row['latency_ms_median']:>10.1f} ms {row['response_bytes']:>14} B")
+            finally:
+                removed = remove_synthetic_data(db)
+                print(f"Removed {removed} synthetic products")
+            if rows:
+                write_chart(rows)
+                assess(rows)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Data scaling benchmark finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
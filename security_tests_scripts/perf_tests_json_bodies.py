@@ -0,0 +1,222 @@
+"""
+perf_tests_json_bodies.py
+Deeply nested and oversized JSON body probe (MERN App)
+
+/register, /login, /product-filters and /create-category accept any JSON body. Before a
+controller runs, every body goes through express.json() (body-parser, 100kb default limit)
+and then through the xss() sanitizer, which walks the parsed object recursively. This probe
+sends three families of bodies in growing steps:
+ - depth: {"a":{"a":...1...}} nested json_depths levels
+ - keys:  one flat object with json_key_counts keys
+ - size:  one string value of json_sizes_kb kilobytes
+Bodies are generated chunk by chunk and sent with Transfer-Encoding: chunked, so a 10 MB or
+100k-level body is never built as one string in memory.
+
+For each endpoint and family the report lists every step with its body size, status codes and
+median latency, and points out:
+ - limit_at: the first step the server refuses (413, or connection closed while uploading)
+ - cost_at:  the first accepted step whose median latency is json_cost_factor x the smallest step
+A 5xx or a timeout at any step fails the check: a crafted body can then crash or stall the
+request path. None of the bodies has the fields the controllers require, so nothing is created.
+Outputs: reports_json_bodies/results.json
+"""
+
+import os
+import json
+import time
+import requests
+from harness_config import (
+    BASE, AUTH_API, CATEGORY_API, PRODUCT_API, LONG_TIMEOUT, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD,
+    CONFIG, report_dir, make_session,
+)
+from instrumentation import start_instrumentation
+from harness_http import PACER
+from sample_store import SampleStore
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("json_bodies")
+SESSION = make_session(cache=False)
+
+DEPTHS = CONFIG["json_depths"]
+KEY_COUNTS = CONFIG["json_key_counts"]
+SIZES_KB = CONFIG["json_sizes_kb"]
+SAMPLES = CONFIG["json_samples"]
+COST_FACTOR = CONFIG["json_cost_factor"]
+CHUNK = 64 * 1024
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "samples": SAMPLES
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+
+ENDPOINTS = [
+    ("/register", f"{AUTH_API}/register", False),
+    ("/login", f"{AUTH_API}/login", False),
+    ("/product-filters", f"{PRODUCT_API}/product-filters", False),
+    ("/create-category", f"{CATEGORY_API}/create-category", True),
+]
+
+# -------------------------
+# Body generators (yield bytes chunks; nothing bigger than CHUNK is held at once)
+# -------------------------
+def repeat(piece, times):
+    per_chunk = max(1, CHUNK // len(piece))
+    full, rest = divmod(times, per_chunk)
+    block = piece * per_chunk
+    for _ in range(full):
+        yield block
+    if rest:
+        yield piece * rest
+
+def nested_body(depth):
+    yield from repeat(b'{"a":', depth)
+    yield b"1"
+    yield from repeat(b"}", depth)
+
+def keys_body(count):
+    yield b"{"
+    batch = []
+    for i in range(count):
+        batch.append(f'"k{i}":{i}')
+        if len(batch) == 4096:
+            yield (",".join(batch) + ("," if i < count - 1 else "")).encode()
+            batch = []
+    if batch:
+        yield ",".join(batch).encode()
+    yield b"}"
+
+def size_body(kb):
+    yield b'{"pad":"'
+    yield from repeat(b"x", kb * 1024)
+    yield b'"}'
+
+FAMILIES = [
+    ("depth", nested_body, DEPTHS),
+    ("keys", keys_body, KEY_COUNTS),
+    ("size_kb", size_body, SIZES_KB),
+]
+
+class Counted:
+    """Wraps a chunk generator and counts the bytes actually handed to the socket."""
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.sent = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.sent += len(chunk)
+            yield chunk
+
+# -------------------------
+# Probe
+# -------------------------
+def send(samples, key, url, make_body, step, token):
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = token
+    body = Counted(make_body(step))
+    PACER.wait()
+    samples.timed(key, SESSION.post, url, data=body, headers=headers, timeout=LONG_TIMEOUT)
+    return body.sent
+
+def probe(name, url, needs_admin, family, make_body, steps):
+    samples = SampleStore()
+    rows = []
+    for step in steps:
+        key = f"{family}={step}"
+        sent = [send(samples, key, url, make_body, step, ADMIN_TOKEN if needs_admin else None) for _ in range(SAMPLES)]
+        rows.append({
+            "step": step,
+            "body_bytes": max(sent),
+            "status_codes": samples.status_counts(key),
+            "p50_ms": samples.percentiles((50,), key)["p50"],
+        })
+
+    def refused(row):
+        codes = row["status_codes"]
+        return "413" in codes or "ERR" in codes
+
+    # an upload cut off once the server has answered 413 is the limit at work; cut off before any
+    # 413 is a timeout or a crash
+    limit_at, stalled, seen_413 = None, [], False
+    for r in rows:
+        seen_413 = seen_413 or "413" in r["status_codes"]
+        if "ERR" in r["status_codes"] and not seen_413:
+            stalled.append(r["step"])
+        elif refused(r) and limit_at is None:
+            limit_at = r["step"]
+    accepted = [r for r in rows if not refused(r) and r["p50_ms"] is not None]
+    baseline = accepted[0]["p50_ms"] if accepted else None
+    cost_at = next((r["step"] for r in accepted[1:] if r["p50_ms"] >= COST_FACTOR * baseline), None) if baseline else None
+    server_errors = [r["step"] for r in rows if any(c.startswith("5") for c in r["status_codes"])]
+
+    record(
+        name=f"JSON body {family} - {name}",
+        ok=not server_errors and not stalled,
+        summary=(f"refused from {family}={limit_at}" if limit_at is not None else "never refused")
+                + (f", latency x{COST_FACTOR} from {family}={cost_at}" if cost_at is not None else "")
+                + (f", 5xx at {server_errors}" if server_errors else ""),
+        details={"steps": rows, "limit_at": limit_at, "cost_at": cost_at, "server_errors": server_errors,
+                 "stalled": stalled, "errors": dict(samples.errors)},
+        endpoint=name
+    )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    for name, url, needs_admin in ENDPOINTS:
+        if needs_admin and not ADMIN_TOKEN:
+            record(f"JSON body - {name}", False, summary="Missing ADMIN_TOKEN", endpoint=name)
+            continue
+        for family, make_body, steps in FAMILIES:
+            probe(name, url, needs_admin, family, make_body, steps)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ JSON body probe finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+perf_tests_pagination.py
+Pagination and unbounded-response probes for list endpoints (MERN App)
+
+Sends oversized `limit` values, negative / zero / huge `page` values and deliberately broad
+filters to the list endpoints, measuring response bytes, item count and latency for each.
+An endpoint is flagged when it returns more than MAX_ITEMS items in one response, when it
+ignores an explicit small `limit`, or when a malformed page/limit makes it fail with a 5xx.
+A request that fails or is still rate limited (429) is reported as inconclusive, not as a pass.
+Outputs: reports_pagination/results.json
+"""
+
+import os
+import json
+import time
+import requests
+from harness_config import (
+    BASE, AUTH_API, CATEGORY_API, PRODUCT_API, LONG_TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, CONFIG, report_dir,
+)
+from instrumentation import start_instrumentation
+from harness_http import PACER
+
+# -------------------------
+# Configuration
+# -------------------------
+TIMEOUT = LONG_TIMEOUT
+REPORT_DIR = report_dir("pagination")
+
+# Largest page any list endpoint should hand out in one response
+MAX_ITEMS = CONFIG["pagination_max_items"]
+HUGE_LIMITS = [100, 1000, 100000, 10**9]
+ODD_PAGES = [-1, 0, 10**9, "abc"]
+BROAD_KEYWORDS = [".", "a", "e", " "]
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "max_items": MAX_ITEMS
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+def count_items(resp):
+    """Number of records in a list response, whichever envelope the controller uses."""
+    try:
+        body = resp.json()
+    except ValueError:
+        return None
+    if isinstance(body, list):
+        return len(body)
+    if isinstance(body, dict):
+        for key in ("products", "users", "orders", "category"):
+            if isinstance(body.get(key), list):
+                return len(body[key])
+    return None
+
+def fetch(method, url, token=None, **kw):
+    """(response or exception text, measurement); a request that fails is measured, not raised."""
+    headers = {"Authorization": token} if token else {}
+    PACER.wait()
+    started = time.perf_counter()
+    try:
+        r = getattr(requests, method)(url, headers=headers, timeout=TIMEOUT, **kw)
+    except Exception as e:
+        latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        return str(e), {"bytes": 0, "items": None, "latency_ms": latency_ms, "error": str(e)}
+    latency_ms = round((time.perf_counter() - started) * 1000, 2)
+    return r, {"bytes": len(r.content), "items": count_items(r), "latency_ms": latency_ms}
+
+def record_measurement(name, endpoint, r, m, expect_max=MAX_ITEMS, note=None):
+    # a failed or rate-limited request says nothing about paging, so it is not scored as a pass
+    failed = isinstance(r, str)
+    status_code = None if failed else r.status_code
+    too_many = m["items"] is not None and m["items"] > expect_max
+    server_error = not failed and status_code >= 500
+    if failed:
+        summary = f"Inconclusive - request failed: {r}"
+    elif status_code == 429:
+        summary = "Inconclusive - rate limited (429)"
+    elif server_error:
+        summary = "Server error on malformed paging input"
+    elif too_many:
+        summary = f"{m['items']} items in one response (cap {expect_max})"
+    else:
+        summary = f"{m['items']} items, {m['bytes']} bytes"
+    if note:
+        summary = f"{summary} - {note}"
+    ok = not (failed or status_code == 429 or too_many or server_error)
+    record(name, ok=ok, status_code=status_code, summary=summary, details=m, endpoint=endpoint)
+
+# -------------------------
+# Probe families
+# -------------------------
+ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+
+def first_category_slug():
+    try:
+        r = requests.get(f"{CATEGORY_API}/get-category", timeout=TIMEOUT)
+        cats = r.json().get("category", [])
+        return cats[0]["slug"] if cats else None
+    except Exception:
+        return None
+
+def category_limit_probes(slug):
+    """productCategoryController reads req.query.limit with no upper bound."""
+    endpoint = "/product-category/:slug"
+    base_url = f"{PRODUCT_API}/product-category/{slug}"
+
+    r, m = fetch("get", base_url, params={"limit": 1})
+    record_measurement("Pagination - category limit=1 honoured", endpoint, r, m, expect_max=1)
+
+    for limit in HUGE_LIMITS:
+        r, m = fetch("get", base_url, params={"limit": limit})
+        record_measurement(f"Pagination - category limit={limit}", endpoint, r, m)
+
+    for page in ODD_PAGES:
+        r, m = fetch("get", base_url, params={"page": page})
+        record_measurement(f"Pagination - category page={page}", endpoint, r, m)
+
+    r, m = fetch("get", base_url, params={"limit": -1})
+    record_measurement("Pagination - category limit=-1", endpoint, r, m)
+
+def product_list_page_probes():
+    endpoint = "/product-list/:page"
+    for page in ODD_PAGES:
+        r, m = fetch("get", f"{PRODUCT_API}/product-list/{page}")
+        record_measurement(f"Pagination - product-list page={page}", endpoint, r, m)
+
+def search_broad_probes():
+    endpoint = "/search/:keyword"
+    for keyword in BROAD_KEYWORDS:
+        r, m = fetch("get", f"{PRODUCT_API}/search/{requests.utils.quote(keyword, safe='')}")
+        record_measurement(f"Unbounded - search '{keyword}'", endpoint, r, m)
+        r, m = fetch("get", f"{PRODUCT_API}/search/{requests.utils.quote(keyword, safe='')}", params={"limit": 1})
+        record_measurement(f"Unbounded - search '{keyword}' limit=1 honoured", endpoint, r, m, expect_max=1)
+
+def filters_broad_probes():
+    endpoint = "/product-filters"
+    for body in ({"checked": [], "radio": []}, {"checked": [], "radio": [0, 10**12]}):
+        r, m = fetch("post", f"{PRODUCT_API}/product-filters", json=body)
+        record_measurement(f"Unbounded - product-filters {body}", endpoint, r, m)
+    r, m = fetch("post", f"{PRODUCT_API}/product-filters", json={"checked": [], "radio": [], "limit": 1})
+    record_measurement("Unbounded - product-filters limit=1 honoured", endpoint, r, m, expect_max=1)
+
+def admin_list_probes():
+    for endpoint in ("/all-orders", "/users"):
+        r, m = fetch("get", f"{AUTH_API}{endpoint}", ADMIN_TOKEN)
+        record_measurement(f"Unbounded - {endpoint}", endpoint, r, m)
+        r, m = fetch("get", f"{AUTH_API}{endpoint}", ADMIN_TOKEN, params={"limit": 1, "page": 1})
+        record_measurement(f"Unbounded - {endpoint} limit=1 honoured", endpoint, r, m, expect_max=1)
+        for page in (-1, 10**9):
+            r, m = fetch("get", f"{AUTH_API}{endpoint}", ADMIN_TOKEN, params={"page": page})
+            record_measurement(f"Unbounded - {endpoint} page={page}", endpoint, r, m)
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    slug = first_category_slug()
+    if slug:
+        category_limit_probes(slug)
+    else:
+        record("Pagination - category probes", False, summary="No category available to probe /product-category/:slug")
+    product_list_page_probes()
+    search_broad_probes()
+    filters_broad_probes()
+    if ADMIN_TOKEN:
+        admin_list_probes()
+    else:
+        record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN - skipped /all-orders and /users")
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Pagination probes finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+perf_tests_query_plans.py
+Server-side cost probe for Mongo-backed Product routes (MERN App)
+
+Every probe request is tagged with an X-Probe-Id header and sent one at a time while the
+MongoDB profiler is switched on for the app database. Profiler entries written between the
+start and end of a probe are attributed to that probe, so each report entry carries the
+docsExamined / keysExamined / planSummary of the queries the route actually ran.
+If the profiler cannot be enabled (e.g. no privileges), the probe falls back to explain()
+on a mirror of the query the controller builds.
+
+Requires pymongo and a MongoDB reachable from this machine, such as the in-memory instance
+started by tests/mongoTestEnv.js. Point mongo_url / mongo_db in harness_config.py (or the
+MONGO_URL / MONGO_DB environment variables) at the database the server under test is using.
+Outputs: reports_query_plans/results.json
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import requests
+from harness_config import BASE, PRODUCT_API, TIMEOUT, MONGO_URL, MONGO_DB, report_dir
+from instrumentation import start_instrumentation
+
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("query_plans")
+
+PROFILER_APP_NAME = "probe-query-plans"
+SEARCH_KEYWORD = "phone"
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "api": PRODUCT_API,
+        "mongo_db": MONGO_DB
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Mongo helpers
+# -------------------------
+def connect_db():
+    client = MongoClient(MONGO_URL, appname=PROFILER_APP_NAME, serverSelectionTimeoutMS=3000)
+    client.admin.command("ping")
+    return client.get_default_database(default=MONGO_DB)
+
+def enable_profiler(db):
+    """Turn on full profiling; returns the previous level, or None if the server refused."""
+    try:
+        prev = db.command("profile", -1).get("was", 0)
+        db.command("profile", 2)
+        return prev
+    except Exception as e:
+        print(f"Profiler unavailable, falling back to explain(): {e}")
+        return None
+
+def latest_profile_ts(db):
+    last = list(db["system.profile"].find({}, {"ts": 1}).sort("$natural", -1).limit(1))
+    return last[0]["ts"] if last else None
+
+def profile_entries_since(db, marker):
+    query = {
+        "ns": {"$regex": f"^{re.escape(db.name)}\\.(?!system\\.)"},
+        "appName": {"$ne": PROFILER_APP_NAME},
+    }
+    if marker is not None:
+        query["ts"] = {"$gt": marker}
+    return list(db["system.profile"].find(query).sort("ts", 1))
+
+def summarise_profile(entries):
+    ops = []
+    for e in entries:
+        ops.append({
+            "ns": e.get("ns"),
+            "op": e.get("op"),
+            "planSummary": e.get("planSummary"),
+            "docsExamined": e.get("docsExamined", 0),
+            "keysExamined": e.get("keysExamined", 0),
+            "nreturned": e.get("nreturned", 0),
+            "millis": e.get("millis"),
+        })
+    return ops
+
+def summarise_explain(db, collection, query):
+    plan = db.command("explain", {"find": collection, "filter": query}, verbosity="executionStats")
+    stats = plan.get("executionStats", {})
+    stage = plan.get("queryPlanner", {}).get("winningPlan", {})
+    while stage.get("inputStage"):
+        stage = stage["inputStage"]
+    return [{
+        "ns": f"{db.name}.{collection}",
+        "op": "explain",
+        "planSummary": stage.get("stage"),
+        "docsExamined": stats.get("totalDocsExamined", 0),
+        "keysExamined": stats.get("totalKeysExamined", 0),
+        "nreturned": stats.get("nReturned", 0),
+        "millis": stats.get("executionTimeMillis"),
+    }]
+
+# -------------------------
+# Probe definitions
+# -------------------------
+# Each probe mirrors the main query its controller builds so explain() can stand in for the profiler.
+def build_probes(db):
+    category = db["categories"].find_one({}, {"slug": 1}) or {}
+    product = db["products"].find_one({}, {"_id": 1, "category": 1}) or {}
+    slug = category.get("slug", "no-such-category")
+    cid = category.get("_id")
+    pid = product.get("_id")
+
+    probes = [
+        {
+            "name": "Search keyword",
+            "method": "get",
+            "endpoint": "/search/:keyword",
+            "url": f"{PRODUCT_API}/search/{SEARCH_KEYWORD}",
+            "collection": "products",
+            "mirror": {"$or": [
+                {"name": {"$regex": SEARCH_KEYWORD, "$options": "i"}},
+                {"description": {"$regex": SEARCH_KEYWORD, "$options": "i"}},
+            ]},
+        },
+        {
+            "name": "Product filters (no filter)",
+            "method": "post",
+            "endpoint": "/product-filters",
+            "url": f"{PRODUCT_API}/product-filters",
+            "json": {"checked": [], "radio": []},
+            "collection": "products",
+            "mirror": {},
+        },
+        {
+            "name": "Product filters (category + price)",
+            "method": "post",
+            "endpoint": "/product-filters",
+            "url": f"{PRODUCT_API}/product-filters",
+            "json": {"checked": [str(cid)] if cid else [], "radio": [0, 1000]},
+            "collection": "products",
+            "mirror": {"category": {"$in": [cid]}, "price": {"$gte": 0, "$lte": 1000}} if cid else {"price": {"$gte": 0, "$lte": 1000}},
+        },
+        {
+            "name": "Product category",
+            "method": "get",
+            "endpoint": "/product-category/:slug",
+            "url": f"{PRODUCT_API}/product-category/{slug}",
+            "collection": "products",
+            "mirror": {"category": cid},
+        },
+        {
+            "name": "Product category count",
+            "method": "get",
+            "endpoint": "/product-category-count/:slug",
+            "url": f"{PRODUCT_API}/product-category-count/{slug}",
+            "collection": "products",
+            "mirror": {"category": cid},
+        },
+        {
+            "name": "Product list page 1",
+            "method": "get",
+            "endpoint": "/product-list/:page",
+            "url": f"{PRODUCT_API}/product-list/1",
+            "collection": "products",
+            "mirror": {},
+        },
+    ]
+    if pid and product.get("category"):
+        probes.append({
+            "name": "Related products",
+            "method": "get",
+            "endpoint": "/related-product/:pid/:cid",
+            "url": f"{PRODUCT_API}/related-product/{pid}/{product['category']}",
+            "collection": "products",
+            "mirror": {"category": product["category"], "_id": {"$ne": pid}},
+        })
+    return probes
+
+# -------------------------
+# Probe runner
+# -------------------------
+def run_probe(db, probe, profiling):
+    probe_id = f"qp-{uuid.uuid4().hex[:12]}"
+    headers = {"X-Probe-Id": probe_id}
+
+    marker = latest_profile_ts(db) if profiling else None
+    # Keep the probe's first operation out of the millisecond the marker was read in
+    time.sleep(0.002)
+    started = time.perf_counter()
+    try:
+        r = getattr(requests, probe["method"])(probe["url"], headers=headers, json=probe.get("json"), timeout=TIMEOUT)
+    except Exception as e:
+        record(f"Query plan - {probe['name']}", False, summary="Exception", details={"probe_id": probe_id, "error": str(e)}, endpoint=probe["endpoint"])
+        return
+    latency_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    if profiling:
+        ops = summarise_profile(profile_entries_since(db, marker))
+        source = "profiler"
+    else:
+        ops = summarise_explain(db, probe["collection"], probe["mirror"])
+        source = "explain"
+
+    docs_examined = sum(o["docsExamined"] or 0 for o in ops)
+    keys_examined = sum(o["keysExamined"] or 0 for o in ops)
+    collscans = [o for o in ops if "COLLSCAN" in str(o["planSummary"] or "")]
+
+    if not ops:
+        ok, summary = False, "No Mongo operations captured - is the server using this database?"
+    elif collscans:
+        ok, summary = False, f"Collection scan on {', '.join(sorted({o['ns'] for o in collscans}))}"
+    else:
+        ok, summary = True, "All queries index-backed"
+
+    record(
+        name=f"Query plan - {probe['name']}",
+        ok=ok,
+        status_code=r.status_code,
+        summary=summary,
+        details={
+            "probe_id": probe_id,
+            "source": source,
+            "latency_ms": latency_ms,
+            "response_bytes": len(r.content),
+            "docsExamined": docs_examined,
+            "keysExamined": keys_examined,
+            "operations": ops,
+        },
+        endpoint=probe["endpoint"]
+    )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if MongoClient is None:
+        record("Query plan setup", False, summary="pymongo is not installed (pip install pymongo)")
+    else:
+        try:
+            db = connect_db()
+        except Exception as e:
+            db = None
+            record("Query plan setup", False, summary="MongoDB not reachable", details=str(e))
+
+        if db is not None:
+            prev_level = enable_profiler(db)
+            profiling = prev_level is not None
+            try:
+                for probe in build_probes(db):
+                    run_probe(db, probe, profiling)
+            finally:
+                if profiling:
+                    db.command("profile", prev_level)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2, default=str))
+
+    print("\n✅ Query plan probes finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,389 @@
+"""
+perf_tests_soak.py
+Soak test with server resource tracking (MERN App)
+
+The burst tests send 50 requests and stop; a slow leak (a growing heap in the Node process,
+sockets or Mongo connections that are never released by config/db.js) only shows after hours.
+This script sends a mixed workload at a steady soak_rate for soak_duration seconds:
+ - every public GET route (with a real product / category when the database has one) except
+   /braintree/token, which calls out to Braintree
+ - /product-filters, /login with the admin account (bcrypt)
+ - the guarded GETs with the admin token, and /user-auth with a corrupted token
+   (the jsonwebtoken error path)
+Routes that write are left out, so the database does not grow during the run and growth on the
+server cannot come from more data. Requests are scheduled at fixed times; when all CONCURRENCY
+workers are busy at a scheduled time the slot is counted as missed rather than sent late.
+
+Every soak_sample_interval seconds the server process is read from /proc: RSS and threads
+(/proc/<pid>/status), CPU time (/proc/<pid>/stat) and open file descriptors (/proc/<pid>/fd).
+The process is the `node ... server.js` whose working directory is server_dir (the child of
+nodemon under `npm run server`), or soak_pid. A new pid or start time counts as a restart.
+This only works with the server on this machine; against a remote base only latency is tracked.
+
+After soak_warmup seconds (V8 and the Mongo pool warming up), a least-squares line is fitted
+to RSS, CPU, open fds and the median latency of each interval. A series is flagged as an
+upward trend when its fitted value grows by soak_growth_limit or more over the run and the fit
+follows the data (correlation with time >= MIN_R). The latency record also gives the
+correlation of latency with each resource, e.g. latency rising with open fds points at a
+connection pool that is running out. Ctrl-C ends the run early and still writes the report.
+Outputs: reports_soak/results.json, samples.csv
+"""
+
+import os
+import csv
+import json
+import time
+import random
+import threading
+import statistics
+from itertools import count
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from harness_config import (
+    BASE, AUTH_API, CATEGORY_API, PRODUCT_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, CONCURRENCY,
+    CONFIG, report_dir, make_session,
+)
+from instrumentation import start_instrumentation
+from route_catalog import ROUTES, concrete_url, fixture_url, label
+from sample_store import SampleStore
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("soak")
+SESSION = make_session(cache=False)
+SERVER_DIR = os.path.abspath(CONFIG["server_dir"])
+
+DURATION = CONFIG["soak_duration"]
+RATE = CONFIG["soak_rate"]
+SAMPLE_INTERVAL = CONFIG["soak_sample_interval"]
+WARMUP = CONFIG["soak_warmup"]
+GROWTH_LIMIT = CONFIG["soak_growth_limit"]
+MIN_R = 0.5
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+# guarded GETs without side effects, sent with the admin token
+SIGNED_IN_GETS = ("/admin-auth", "/user-auth", "/users", "/all-orders", "/orders")
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "duration_s": DURATION,
+        "rate": RATE,
+        "sample_interval_s": SAMPLE_INTERVAL
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+
+def discover_params():
+    """Real slugs / ids so the workload reads populated documents."""
+    params = {}
+    try:
+        categories = SESSION.get(f"{CATEGORY_API}/get-category", timeout=TIMEOUT).json().get("category", [])
+        products = SESSION.get(f"{PRODUCT_API}/get-product", timeout=TIMEOUT).json().get("products", [])
+    except Exception:
+        return params
+    if categories:
+        params["category_slug"] = categories[0].get("slug")
+    if products:
+        params.update(slug=products[0].get("slug"), pid=products[0].get("_id"),
+                      cid=(products[0].get("category") or {}).get("_id"))
+    return {k: v for k, v in params.items() if v}
+
+# -------------------------
+# Workload
+# -------------------------
+def workload(params):
+    """(label, method, url, kwargs) for every request of the mix."""
+    jobs = []
+    for route in ROUTES:
+        if route["method"] == "GET" and route["auth"] == "public" and route["path"] != "/braintree/token":
+            jobs.append((label(route), "GET", fixture_url(route, params), {}))
+        elif route["path"] == "/product-filters":
+            jobs.append((label(route), "POST", concrete_url(route), {"json": {"checked": [], "radio": []}}))
+        elif route["path"] == "/login":
+            jobs.append((label(route), "POST", concrete_url(route),
+                         {"json": {"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}}))
+        elif route["method"] == "GET" and route["path"] in SIGNED_IN_GETS and ADMIN_TOKEN:
+            jobs.append((label(route), "GET", concrete_url(route), {"headers": {"Authorization": ADMIN_TOKEN}}))
+    user_auth = next(r for r in ROUTES if r["path"] == "/user-auth")
+    jobs.append((f"{label(user_auth)} (corrupted token)", "GET", concrete_url(user_auth),
+                 {"headers": {"Authorization": (ADMIN_TOKEN or "x.y.z")[:-4] + "AAAA"}}))
+    return jobs
+
+def run_workload(store, jobs, stop):
+    """Sends one job per 1/RATE seconds, each round of jobs in a new random order; returns missed slots."""
+    rng = random.Random(0)
+    slots = threading.BoundedSemaphore(CONCURRENCY)
+    missed = 0
+
+    def send(job):
+        name, method, url, kw = job
+        try:
+            store.timed(name, SESSION.request, method, url, timeout=TIMEOUT, **kw)
+        finally:
+            slots.release()
+
+    order = []
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        for i in count():
+            at = store.started + i / RATE
+            if at - store.started >= DURATION or stop.is_set():
+                break
+            if not order:
+                order = rng.sample(jobs, len(jobs))
+            job = order.pop()
+            delay = at - time.perf_counter()
+            if delay > 0 and stop.wait(delay):
+                break
+            if not slots.acquire(blocking=False):
+                missed += 1
+                continue
+            ex.submit(send, job)
+    return missed
+
+# -------------------------
+# Server process (/proc)
+# -------------------------
+def read_cmdline(pid):
+    with open(f"/proc/{pid}/cmdline", "rb") as f:
+        return [a.decode(errors="replace") for a in f.read().split(b"\0") if a]
+
+def find_server_pid():
+    """soak_pid, else the newest `node ... server.js` (not nodemon itself), preferring server_dir as cwd."""
+    if CONFIG["soak_pid"]:
+        return CONFIG["soak_pid"]
+    candidates = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            args = read_cmdline(entry)
+            cwd = os.readlink(f"/proc/{entry}/cwd")
+            started = read_stat(int(entry))["start"]
+        except OSError:
+            continue
+        if (args and os.path.basename(args[0]) in ("node", "nodejs")
+                and any(a.endswith("server.js") for a in args[1:]) and not any("nodemon" in a for a in args)):
+            candidates.append((cwd == SERVER_DIR, started, int(entry)))
+    return max(candidates)[2] if candidates else None
+
+def read_stat(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        # the command name in field 2 may contain spaces; fields 3.. follow the last ")"
+        fields = f.read().rsplit(")", 1)[1].split()
+    return {"cpu_s": (int(fields[11]) + int(fields[12])) / CLOCK_TICKS, "start": int(fields[19])}
+
+def read_process(pid):
+    sample = read_stat(pid)
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key == "VmRSS":
+                sample["rss_mb"] = round(int(value.split()[0]) / 1024, 2)
+            elif key == "Threads":
+                sample["threads"] = int(value)
+    try:
+        sample["fds"] = len(os.listdir(f"/proc/{pid}/fd"))
+    except PermissionError:
+        sample["fds"] = None
+    return sample
+
+def sample_server(store, samples, process, stop):
+    """Reads the server process every SAMPLE_INTERVAL seconds into samples and samples.csv."""
+    columns = ("t_s", "pid", "rss_mb", "cpu_pct", "fds", "threads")
+    previous = None
+    with open(os.path.join(REPORT_DIR, "samples.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, columns, extrasaction="ignore")
+        writer.writeheader()
+        for k in count(1):
+            if stop.wait(max(0.0, store.started + k * SAMPLE_INTERVAL - time.perf_counter())):
+                break
+            t = round(time.perf_counter() - store.started, 1)
+            try:
+                current = read_process(process["pid"]) if process["pid"] else None
+            except OSError:
+                current = None
+            if current is None or (previous and current["start"] != previous["start"]):
+                # gone or restarted by nodemon: look for the new process
+                pid = find_server_pid()
+                if pid and (pid != process["pid"] or current is not None):
+                    if process["pid"]:
+                        process["restarts"].append({"t_s": t, "old": process["pid"], "new": pid})
+                    process["pid"] = pid
+                previous = None
+                continue
+            wall = SAMPLE_INTERVAL if previous else None
+            cpu = round(100 * (current["cpu_s"] - previous["cpu_s"]) / wall, 2) if wall else None
+            row = dict(current, t_s=t, pid=process["pid"], cpu_pct=cpu)
+            samples.append(row)
+            writer.writerow(row)
+            f.flush()
+            previous = current
+
+# -------------------------
+# Analysis
+# -------------------------
+def trend(points):
+    """Least-squares line through (t_s, value) after the warm-up; None with fewer than 3 points."""
+    points = [(t, v) for t, v in points if t >= WARMUP and v is not None]
+    if len(points) < 3:
+        return None
+    xs, ys = zip(*points)
+    if len(set(ys)) == 1:
+        return {"points": len(points), "start": ys[0], "end": ys[0], "slope_per_hour": 0.0, "growth": 0.0,
+                "r": 0.0, "flagged": False}
+    slope, intercept = statistics.linear_regression(xs, ys)
+    r = statistics.correlation(xs, ys)
+    start, end = slope * xs[0] + intercept, slope * xs[-1] + intercept
+    growth = (end - start) / abs(start) if start else None
+    return {
+        "points": len(points),
+        "start": round(start, 2),
+        "end": round(end, 2),
+        "slope_per_hour": round(slope * 3600, 3),
+        "growth": round(growth, 3) if growth is not None else None,
+        "r": round(r, 3),
+        # from a fitted start of 0 any rise is growth
+        "flagged": slope > 0 and r >= MIN_R and (growth is None or growth >= GROWTH_LIMIT),
+    }
+
+def latency_windows(store):
+    """{sample index k: median latency of the requests sent in (k-1, k] * SAMPLE_INTERVAL}."""
+    return {round(b["t"] / SAMPLE_INTERVAL) + 1: b["p50_ms"] for b in store.time_buckets(SAMPLE_INTERVAL)}
+
+def correlation(xs, ys):
+    pairs = [(x, y) for x, y in zip(xs, ys) if x is not None and y is not None]
+    if len(pairs) < 3 or len({x for x, _ in pairs}) < 2 or len({y for _, y in pairs}) < 2:
+        return None
+    return round(statistics.correlation(*zip(*pairs)), 3)
+
+def report_trends(store, samples):
+    latency = latency_windows(store)
+    latency_points = [(k * SAMPLE_INTERVAL, p50) for k, p50 in sorted(latency.items())]
+    series = {
+        "RSS (MB)": [(s["t_s"], s["rss_mb"]) for s in samples],
+        "CPU (%)": [(s["t_s"], s["cpu_pct"]) for s in samples],
+        "open fds": [(s["t_s"], s["fds"]) for s in samples],
+        "threads": [(s["t_s"], s["threads"]) for s in samples],
+    }
+    for name, points in series.items():
+        if not samples:
+            break
+        fit = trend(points)
+        record(
+            name=f"Soak - trend {name}",
+            ok=fit is not None and not fit["flagged"],
+            summary=("not enough samples after the warm-up" if fit is None else
+                     f"{fit['start']} -> {fit['end']} ({fit['slope_per_hour']:+}/h, r={fit['r']})"),
+            details=fit
+        )
+
+    fit = trend(latency_points)
+    # latency of the interval ending at each sample, side by side with the resources
+    windows = [latency.get(round(s["t_s"] / SAMPLE_INTERVAL)) for s in samples]
+    correlations = {
+        "rss_mb": correlation(windows, [s["rss_mb"] for s in samples]),
+        "cpu_pct": correlation(windows, [s["cpu_pct"] for s in samples]),
+        "fds": correlation(windows, [s["fds"] for s in samples]),
+    }
+    record(
+        name="Soak - latency drift (p50 per interval)",
+        ok=fit is not None and not fit["flagged"],
+        summary=("not enough intervals after the warm-up" if fit is None else
+                 f"{fit['start']} -> {fit['end']} ms ({fit['slope_per_hour']:+} ms/h, r={fit['r']}); "
+                 f"correlation with " + ", ".join(f"{k}={v}" for k, v in correlations.items())),
+        details={"trend": fit, "correlation_with_latency": correlations}
+    )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    params = discover_params()
+    jobs = workload(params)
+    process = {"pid": find_server_pid(), "restarts": []}
+    results["meta"].update(endpoints=[name for name, _, _, _ in jobs], params=params, server_pid=process["pid"])
+    print(f"Soaking {len(jobs)} endpoints at {RATE} req/s for {DURATION}s; server pid {process['pid']}")
+
+    store = SampleStore()
+    samples = []
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_server, args=(store, samples, process, stop), daemon=True)
+    sampler.start()
+    try:
+        missed = run_workload(store, jobs, stop)
+    except KeyboardInterrupt:
+        # the executor has already waited for the requests in flight
+        missed = None
+        print("\nInterrupted, writing the report for the run so far")
+    stop.set()
+    sampler.join()
+
+    elapsed = round(time.perf_counter() - store.started, 1)
+    summary = store.summary(bucket_width=SAMPLE_INTERVAL)
+    summary.pop("timeline")
+    record(
+        name="Soak - workload",
+        ok=len(store) and summary["error_rate"] == 0,
+        summary=(f"{len(store)} requests in {elapsed}s, p50={summary['latency_ms']['p50']}ms "
+                 f"p99={summary['latency_ms']['p99']}ms, error rate {summary['error_rate']}, "
+                 f"{summary['status_counts'].get('429', 0)} rate limited, {missed} missed slots"),
+        details=dict(summary, missed_slots=missed, endpoints={
+            name: {"requests": sum(store.status_counts(name).values()), "latency_ms": store.percentiles(endpoint=name),
+                   "error_rate": store.error_rate(name)}
+            for name, _, _, _ in jobs
+        })
+    )
+    record(
+        name="Soak - server process",
+        ok=samples and not process["restarts"],
+        summary=("no local `node server.js` process found (remote base? set soak_pid)" if not samples else
+                 f"{len(samples)} samples (pid {process['pid']}), {len(process['restarts'])} restarts"),
+        details={"restarts": process["restarts"]}
+    )
+    report_trends(store, samples)
+    results["meta"]["timeline"] = store.time_buckets(SAMPLE_INTERVAL)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Soak test finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
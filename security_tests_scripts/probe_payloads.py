@@ -0,0 +1,33 @@
+"""
+probe_payloads.py
+Injection payloads shared by the suites and the combinatorial planner.
+
+The NoSQL lists are the request bodies security_tests_auth_routes.py sends to /login,
+/forgot-password and /register; XSS_PAYLOADS are the markup strings the product suite
+reflects through its GET routes.
+"""
+
+NOSQL_PAYLOADS_BASIC = [
+    {"email": {"$ne": ""}, "password": "doesntmatter"},
+    {"email": {"$gt": ""}, "password": "doesntmatter"},
+    {"email": {"$regex": ".*"}, "password": "doesntmatter"},
+    {"$or": [{"email": {"$ne": ""}}, {"password": {"$ne": ""}}]}
+]
+
+NOSQL_PAYLOADS_FORGOT = [
+    {"email": {"$ne": ""}, "answer": {"$ne": ""}, "newPassword": "NewPass123!"},
+    {"email": {"$regex": ".*"}, "answer": {"$regex": ".*"}, "newPassword": "NewPass123!"},
+    {"$or": [{"email": {"$ne": ""}}, {"answer": {"$ne": ""}}], "newPassword": "NewPass123!"}
+]
+
+NOSQL_PAYLOADS_REGISTER = [
+    {"name":"x","email":{"$ne": ""},"password":"Password123","phone":"98765432","address":"a","answer":"b"},
+    {"name":"x","email":{"$gt": ""},"password":"Password123","phone":"98765432","address":"a","answer":"b"},
+    {"name":"x","email":{"$regex": ".*"},"password":"Password123","phone":"98765432","address":"a","answer":"b"},
+    {"$or":[{"email":{"$ne": ""}},{"name":{"$ne": ""}}],"password":"Password123","phone":"98765432","address":"a","answer":"b"}
+]
+
+XSS_PAYLOADS = [
+    "<script>alert(1)</script>",
+    "<svg/onload=alert(1)>"
+]
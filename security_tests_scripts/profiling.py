@@ -0,0 +1,96 @@
+"""
+profiling.py
+Per-probe CPU and allocation profiling for the security test suites.
+
+With profile_probes set (--profile-probes true), make_profiler() in harness_config hands the
+suite's Checkpoint a Profiler, and Checkpoint.run wraps every probe function in it:
+ - cProfile for the calls made on the probe's own thread; the worker threads of a
+   ThreadPoolExecutor mostly wait on sockets and are not profiled
+ - wall time and process CPU time (all threads), so a slow probe whose CPU share is low was
+   waiting on the server, and a high share points at the harness itself
+ - tracemalloc snapshots before and after, for the lines that allocated the most (all threads)
+   and the peak traced memory above the level the probe started at
+finish() writes the merged profile of all probes to <report_dir>/profile.prof (open it with
+`python -m pstats` or snakeviz) and the top profile_top allocation sites per probe to
+<report_dir>/allocations.txt, and returns a per-probe summary for results["meta"]["profile"].
+With profiling off no Profiler exists and Checkpoint.run calls the probe directly.
+"""
+
+import os
+import time
+import cProfile
+import pstats
+import tracemalloc
+
+# Allocations made by the profiler and the import machinery are not the probe's
+IGNORED = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+def _snapshot():
+    return tracemalloc.take_snapshot().filter_traces(IGNORED)
+
+def _where(frame):
+    return f"{frame.filename}:{frame.lineno}"
+
+class Profiler:
+    def __init__(self, report_dir, top=20):
+        self.report_dir = report_dir
+        self.top = top
+        self.stats = None
+        self.probes = {}
+        self.allocations = {}
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def run(self, probe):
+        name = probe.__name__
+        profile = cProfile.Profile()
+        before = _snapshot()
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        profile.enable()
+        try:
+            return probe()
+        finally:
+            profile.disable()
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            peak = tracemalloc.get_traced_memory()[1] - start
+            diff = _snapshot().compare_to(before, "lineno")
+            self._add(name, profile, wall, cpu, peak, diff)
+
+    def _add(self, name, profile, wall, cpu, peak, diff):
+        stats = pstats.Stats(profile)
+        own = [item for item in stats.stats.items() if item[0][0] != "~" or "_lsprof" not in item[0][2]]
+        hottest = sorted(own, key=lambda item: item[1][2], reverse=True)[:5]
+        self.stats = stats if self.stats is None else self.stats.add(stats)
+        self.probes[name] = {
+            "wall_s": round(wall, 3),
+            "cpu_s": round(cpu, 3),
+            "cpu_share": round(cpu / wall, 3) if wall else None,
+            "peak_kib": round(peak / 1024, 1),
+            "net_alloc_kib": round(sum(d.size_diff for d in diff) / 1024, 1),
+            "hottest": [f"{os.path.basename(f)}:{line} {func} ({tt * 1000:.1f} ms)"
+                        for (f, line, func), (_, _, tt, _, _) in hottest],
+        }
+        self.allocations[name] = [d for d in diff if d.size_diff > 0][:self.top]
+
+    def finish(self):
+        """Writes profile.prof and allocations.txt; returns the per-probe summary."""
+        if self.stats is not None:
+            self.stats.dump_stats(os.path.join(self.report_dir, "profile.prof"))
+        lines = []
+        for name, top in self.allocations.items():
+            p = self.probes[name]
+            lines.append(f"# {name}  wall {p['wall_s']}s  cpu {p['cpu_s']}s  peak {p['peak_kib']} KiB")
+            for d in top:
+                lines.append(f"  {d.size_diff / 1024:+10.1f} KiB {d.count_diff:+8d} blocks  {_where(d.traceback[0])}")
+            lines.append("")
+        with open(os.path.join(self.report_dir, "allocations.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        return self.probes
@@ -0,0 +1,233 @@
+"""
+reap_test_data.py
+Orphaned test-data reaper for the shared dev database (MERN App)
+
+Finds products, categories and users left behind by the security and performance scripts
+by the names / emails those scripts generate (LEFTOVER_PATTERNS) and removes them:
+ - through the API: products and categories are listed once and deleted concurrently with the
+   admin token (users have no delete route, so they are only counted)
+ - through MongoDB directly when reaper_direct_db is set: one delete_many per collection,
+   which also covers users
+Set reaper_dry_run (or pass --reaper-dry-run true) to only report what would be removed.
+Outputs: reports_reaper/results.json
+"""
+
+import os
+import re
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from harness_config import (
+    BASE, AUTH_API, CATEGORY_API, PRODUCT_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD,
+    MONGO_URL, MONGO_DB, CONCURRENCY, CONFIG, report_dir, make_session,
+)
+from instrumentation import start_instrumentation
+from harness_http import request_with_retry
+
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("reaper")
+SESSION = make_session()
+DIRECT_DB = CONFIG["reaper_direct_db"]
+DRY_RUN = CONFIG["reaper_dry_run"]
+
+# Names / emails generated by the scripts in this directory
+LEFTOVER_PATTERNS = {
+    "products": [
+        r"^rbac_prod_\d+$",             # security_test_product_routes.py (RBAC + mass assignment)
+        r"^img_\d+$",                   # product image MIME / size tests
+        r"^alert\('xss'\)\d+$",         # stored XSS product name after stripTags
+        r"^race_prod_\d+$",             # security_tests_inventory_race.py
+        r"^bench_prod_\d+$",            # perf_tests_data_scaling.py
+        r"^mass_\w+_\d+$",              # security_tests_mass_assignment.py
+        r"^sxss\d+m\d+",                # security_tests_stored_xss.py (payload may be stripped)
+    ],
+    "categories": [
+        r"^cat_\d+$",                   # security_tests_category_routes.py RBAC
+        r"^upd_admin_\d+$",
+        r"^user_delete_[\d.]+$",
+        r"^no_token_del_[\d.]+$",
+        r"^ma_\d+$",                    # mass assignment
+        r"^badtoken$",
+        r"^_[\d.]+$",                   # XSS category name after the sanitizer strips the payload
+        r"^bench-cat-\d+$",             # perf_tests_data_scaling.py
+        r"^mass_\w+_\d+$",              # security_tests_mass_assignment.py
+        r"^sxss\d+m\d+",                # security_tests_stored_xss.py
+    ],
+    "users": [
+        r"^xss_\d+@example\.com$",      # reflected_xss_test_register
+        r"^xss_reg_\d+@test\.com$",     # stored_xss_register_test
+        r"^mass_\d+@example\.com$",     # security_tests_mass_assignment.py
+        r"^sxss_\d+@example\.com$",     # security_tests_stored_xss.py
+    ],
+}
+MATCH_FIELD = {"products": "name", "categories": "name", "users": "email"}
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "direct_db": DIRECT_DB,
+        "dry_run": DRY_RUN
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+def combined_pattern(kind):
+    return "|".join(f"(?:{p})" for p in LEFTOVER_PATTERNS[kind])
+
+def is_leftover(kind, doc):
+    return re.match(combined_pattern(kind), str(doc.get(MATCH_FIELD[kind], ""))) is not None
+
+# -------------------------
+# API path
+# -------------------------
+def list_kind(kind, field, method, url, **kw):
+    """Leftovers of one kind, or None (recorded as a failed listing) if the list cannot be read."""
+    r = request_with_retry(SESSION, method, url, timeout=TIMEOUT, **kw)
+    status = None if isinstance(r, str) else r.status_code
+    docs = None
+    if status == 200:
+        try:
+            body = r.json()
+        except ValueError:
+            body = None
+        docs = body.get(field) if isinstance(body, dict) else None
+    if not isinstance(docs, list):
+        record(
+            name=f"Reaper (API) - list {kind}",
+            ok=False,
+            status_code=status,
+            summary=f"could not read the {kind} listing; no {kind} deleted",
+            details=r if isinstance(r, str) else (r.text or "")[:200],
+            endpoint=url.replace(BASE, "", 1)
+        )
+        return None
+    return [d for d in docs if is_leftover(kind, d)]
+
+def list_leftovers(token):
+    return {
+        "products": list_kind("products", "products", "POST", f"{PRODUCT_API}/product-filters",
+                              json={"checked": [], "radio": []}),
+        "categories": list_kind("categories", "category", "GET", f"{CATEGORY_API}/get-category"),
+        "users": list_kind("users", "users", "GET", f"{AUTH_API}/users", headers={"Authorization": token}),
+    }
+
+def delete_all(token, urls):
+    def delete(url):
+        r = request_with_retry(SESSION, "DELETE", url, headers={"Authorization": token}, timeout=TIMEOUT)
+        return not isinstance(r, str) and r.status_code == 200
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        return sum(ex.map(delete, urls))
+
+def reap_via_api(token):
+    leftovers = list_leftovers(token)
+    urls = {
+        "products": lambda p: f"{PRODUCT_API}/delete-product/{p['_id']}",
+        "categories": lambda c: f"{CATEGORY_API}/delete-category/{c['_id']}",
+    }
+    for kind, url_of in urls.items():
+        docs = leftovers[kind]
+        # a failed listing is already recorded
+        if docs is None:
+            continue
+        removed = 0 if DRY_RUN else delete_all(token, [url_of(d) for d in docs])
+        record(
+            name=f"Reaper (API) - {kind}",
+            ok=DRY_RUN or removed == len(docs),
+            summary=f"found {len(docs)}, removed {removed}" + (" (dry run)" if DRY_RUN else ""),
+            details={"names": sorted(str(d.get("name")) for d in docs)[:100]}
+        )
+    if leftovers["users"]:
+        record(
+            name="Reaper (API) - users",
+            ok=DIRECT_DB,
+            summary=f"found {len(leftovers['users'])} test users; no delete route - set reaper_direct_db to remove them",
+            details={"emails": sorted(u.get("email") for u in leftovers["users"])[:100]}
+        )
+
+# -------------------------
+# Direct database path
+# -------------------------
+def reap_via_db():
+    client = MongoClient(MONGO_URL, serverSelectionTimeoutMS=3000)
+    client.admin.command("ping")
+    db = client.get_default_database(default=MONGO_DB)
+    for kind, field in MATCH_FIELD.items():
+        query = {field: {"$regex": combined_pattern(kind)}}
+        if DRY_RUN:
+            found, removed = db[kind].count_documents(query), 0
+        else:
+            found = removed = db[kind].delete_many(query).deleted_count
+        record(
+            name=f"Reaper (DB) - {kind}",
+            ok=True,
+            summary=f"found {found}, removed {removed}" + (" (dry run)" if DRY_RUN else ""),
+        )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    token = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+    if token:
+        reap_via_api(token)
+    else:
+        record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN - API reaping skipped")
+
+    if DIRECT_DB:
+        if MongoClient is None:
+            record("Reaper (DB)", False, summary="pymongo is not installed (pip install pymongo)")
+        else:
+            try:
+                reap_via_db()
+            except Exception as e:
+                record("Reaper (DB)", False, summary="MongoDB not reachable", details=str(e))
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Test-data reaper finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
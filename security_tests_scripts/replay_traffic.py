@@ -0,0 +1,225 @@
+"""
+replay_traffic.py
+Replay engine for archives written by the traffic recorder (traffic.py)
+
+Sends the exchanges of replay_archive again, in their recorded order:
+ - replay_speed 1.0 keeps the original pacing, 2.0 is twice as fast, 0 sends as fast as possible
+ - replay_concurrency N sends with N workers (each still waits for its scheduled time)
+ - replay_base retargets every request to another host (e.g. a staging build)
+ - replay_filter only replays URLs matching a regex (e.g. "/product/")
+Ids and tokens issued by the server change between runs, so responses are compared as the
+replay goes. Wherever a recorded JSON response and the replayed one differ in an _id, token
+or slug field, later URLs, headers and bodies get the new value. A fresh /login therefore
+replaces the recorded token, and a delete-product/<old id> follows the product the replay
+created. With replay_concurrency > 1 a request can overtake the response it depends on; use 1
+to reproduce a run exactly.
+
+The report lists every request whose status differs from the recording (the way to reproduce a
+flaky finding) and the latency / throughput of the replay per endpoint. Recorded streamed
+(chunked) uploads have no stored body and are skipped.
+Outputs: reports_replay/results.json
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor
+from harness_config import TIMEOUT, CONFIG, report_dir, make_session
+from instrumentation import start_instrumentation
+from sample_store import SampleStore
+from traffic import read_archive, decode
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("replay")
+SESSION = make_session(cache=False)
+
+ARCHIVE = CONFIG["replay_archive"]
+SPEED = CONFIG["replay_speed"]
+CONCURRENCY = CONFIG["replay_concurrency"]
+REPLAY_BASE = CONFIG["replay_base"].rstrip("/")
+URL_FILTER = CONFIG["replay_filter"]
+
+# Response fields whose values are issued by the server and differ between runs
+REMAPPED_FIELDS = ("_id", "token", "slug")
+# Recomputed by requests for the (possibly remapped) body
+DROPPED_HEADERS = ("content-length", "host", "transfer-encoding")
+OBJECT_ID = re.compile(r"\b[0-9a-f]{24}\b")
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "archive": ARCHIVE,
+        "speed": SPEED,
+        "concurrency": CONCURRENCY,
+        "base": REPLAY_BASE or "as recorded"
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Id / token remapping
+# -------------------------
+class Remapper:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.mapping = {}
+
+    def learn(self, recorded, replayed):
+        try:
+            old, new = json.loads(recorded), json.loads(replayed)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._walk(old, new)
+
+    def _walk(self, old, new):
+        if isinstance(old, dict) and isinstance(new, dict):
+            for key, value in old.items():
+                if key not in new:
+                    continue
+                if key in REMAPPED_FIELDS and isinstance(value, str) and isinstance(new[key], str) and value != new[key]:
+                    self.mapping[value] = new[key]
+                else:
+                    self._walk(value, new[key])
+        elif isinstance(old, list) and isinstance(new, list):
+            for a, b in zip(old, new):
+                self._walk(a, b)
+
+    def apply_text(self, text):
+        with self._lock:
+            pairs = list(self.mapping.items())
+        for old, new in pairs:
+            text = text.replace(old, new)
+        return text
+
+    def apply_bytes(self, data):
+        with self._lock:
+            pairs = list(self.mapping.items())
+        for old, new in pairs:
+            data = data.replace(old.encode(), new.encode())
+        return data
+
+# -------------------------
+# Replay
+# -------------------------
+def retarget(url):
+    if not REPLAY_BASE:
+        return url
+    parts, base = urlsplit(url), urlsplit(REPLAY_BASE)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+def endpoint_of(entry):
+    return f"{entry['method']} {OBJECT_ID.sub(':id', urlsplit(entry['url']).path)}"
+
+def load():
+    pattern = re.compile(URL_FILTER) if URL_FILTER else None
+    entries, skipped = [], 0
+    for entry in read_archive(ARCHIVE):
+        if pattern and not pattern.search(entry["url"]):
+            continue
+        if entry["streamed"]:
+            skipped += 1
+            continue
+        entries.append(entry)
+    return entries, skipped
+
+def replay(entries):
+    samples = SampleStore()
+    remapper = Remapper()
+    divergent = []
+    t0 = entries[0]["t"]
+    started = time.perf_counter()
+
+    def send(entry):
+        if SPEED > 0:
+            delay = started + (entry["t"] - t0) / SPEED - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        headers = {k: remapper.apply_text(v) for k, v in entry["headers"].items() if k.lower() not in DROPPED_HEADERS}
+        body = decode(entry["body"])
+        r = samples.timed(
+            endpoint_of(entry), SESSION.request, entry["method"], retarget(remapper.apply_text(entry["url"])),
+            headers=headers, data=remapper.apply_bytes(body) if body else None,
+            allow_redirects=False, timeout=TIMEOUT,
+        )
+        replayed = r if isinstance(r, str) else r.status_code
+        if not isinstance(r, str) and entry["response"] and not entry["response_truncated"]:
+            remapper.learn(decode(entry["response"]), r.content)
+        if replayed != (entry["status"] if entry["status"] is not None else entry["error"]):
+            divergent.append({
+                "script": entry["script"],
+                "t": entry["t"],
+                "request": f"{entry['method']} {entry['url']}",
+                "recorded": entry["status"] if entry["status"] is not None else entry["error"],
+                "replayed": replayed,
+            })
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        list(ex.map(send, entries))
+    return samples, divergent, time.perf_counter() - started, remapper
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if not ARCHIVE or not os.path.exists(ARCHIVE):
+        record("Replay setup", False, summary="Set replay_archive (--replay-archive reports_traffic/<file>.jsonl.gz)")
+    else:
+        entries, skipped = load()
+        if not entries:
+            record("Replay setup", False, summary="No replayable requests in the archive", details={"skipped_streamed": skipped})
+        else:
+            samples, divergent, elapsed, remapper = replay(entries)
+            divergent.sort(key=lambda d: d["t"])
+            record(
+                name="Replay - status divergence",
+                ok=not divergent,
+                summary=f"{len(divergent)} of {len(entries)} requests answered differently than recorded",
+                details={"divergent": divergent[:500], "skipped_streamed": skipped, "remapped_values": len(remapper.mapping)}
+            )
+            record(
+                name="Replay - throughput",
+                ok=samples.error_rate() == 0,
+                summary=f"{len(entries)} requests in {elapsed:.2f}s ({len(entries) / elapsed:.1f} req/s)",
+                details=samples.summary()
+            )
+            endpoints = sorted({endpoint_of(e) for e in entries})
+            record(
+                name="Replay - per endpoint",
+                ok=True,
+                summary=f"{len(endpoints)} endpoints",
+                details={ep: {"status_counts": samples.status_counts(ep), "latency_ms": samples.percentiles(endpoint=ep)}
+                         for ep in endpoints}
+            )
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Traffic replay finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
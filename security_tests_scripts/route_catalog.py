@@ -0,0 +1,108 @@
+"""
+route_catalog.py
+Every API route mounted by app.js, as declared in routes/*.js.
+
+Each entry records the HTTP method, the router prefix it is mounted under, the path template
+(with Express-style :params), the guard chain (public / user = requireSignIn / admin =
+requireSignIn + isAdmin) and the routes/*.js file that declares it. Suites use it to sweep
+every route instead of keeping their own partial endpoint lists; keep it in sync when a
+route is added or removed.
+"""
+
+import re
+from urllib.parse import urlsplit
+from harness_config import AUTH_API, CATEGORY_API, PRODUCT_API
+
+# Placeholder values used when a probe needs a concrete URL and no real id is at hand.
+# Valid-looking ObjectIds so the request reaches the controller rather than failing on a cast.
+DUMMY_PARAMS = {
+    "id": "000000000000000000000000",
+    "pid": "000000000000000000000000",
+    "cid": "000000000000000000000000",
+    "orderId": "000000000000000000000000",
+    "slug": "no-such-slug",
+    "keyword": "probe",
+    "page": "1",
+}
+
+ROUTES = [
+    # routes/authRoute.js
+    {"method": "POST", "api": AUTH_API, "path": "/register", "auth": "public", "source": "routes/authRoute.js"},
+    {"method": "POST", "api": AUTH_API, "path": "/login", "auth": "public", "source": "routes/authRoute.js"},
+    {"method": "POST", "api": AUTH_API, "path": "/forgot-password", "auth": "public", "source": "routes/authRoute.js"},
+    {"method": "GET", "api": AUTH_API, "path": "/test", "auth": "admin", "source": "routes/authRoute.js"},
+    {"method": "GET", "api": AUTH_API, "path": "/user-auth", "auth": "user", "source": "routes/authRoute.js"},
+    {"method": "GET", "api": AUTH_API, "path": "/admin-auth", "auth": "admin", "source": "routes/authRoute.js"},
+    {"method": "PUT", "api": AUTH_API, "path": "/profile", "auth": "user", "source": "routes/authRoute.js"},
+    {"method": "GET", "api": AUTH_API, "path": "/orders", "auth": "user", "source": "routes/authRoute.js"},
+    {"method": "GET", "api": AUTH_API, "path": "/all-orders", "auth": "admin", "source": "routes/authRoute.js"},
+    {"method": "PUT", "api": AUTH_API, "path": "/order-status/:orderId", "auth": "admin", "source": "routes/authRoute.js"},
+    {"method": "GET", "api": AUTH_API, "path": "/users", "auth": "admin", "source": "routes/authRoute.js"},
+    # routes/categoryRoutes.js
+    {"method": "POST", "api": CATEGORY_API, "path": "/create-category", "auth": "admin", "source": "routes/categoryRoutes.js"},
+    {"method": "PUT", "api": CATEGORY_API, "path": "/update-category/:id", "auth": "admin", "source": "routes/categoryRoutes.js"},
+    {"method": "GET", "api": CATEGORY_API, "path": "/get-category", "auth": "public", "source": "routes/categoryRoutes.js"},
+    {"method": "GET", "api": CATEGORY_API, "path": "/single-category/:slug", "auth": "public", "source": "routes/categoryRoutes.js"},
+    {"method": "DELETE", "api": CATEGORY_API, "path": "/delete-category/:id", "auth": "admin", "source": "routes/categoryRoutes.js"},
+    # routes/productRoutes.js
+    {"method": "POST", "api": PRODUCT_API, "path": "/create-product", "auth": "admin", "source": "routes/productRoutes.js"},
+    {"method": "PUT", "api": PRODUCT_API, "path": "/update-product/:pid", "auth": "admin", "source": "routes/productRoutes.js"},
+    {"method": "DELETE", "api": PRODUCT_API, "path": "/delete-product/:pid", "auth": "admin", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/get-product", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/get-product/:slug", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/product-photo/:pid", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "POST", "api": PRODUCT_API, "path": "/product-filters", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/product-count", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/product-list/:page", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/search/:keyword", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/related-product/:pid/:cid", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/product-category/:slug", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/product-category-count/:slug", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "GET", "api": PRODUCT_API, "path": "/braintree/token", "auth": "public", "source": "routes/productRoutes.js"},
+    {"method": "POST", "api": PRODUCT_API, "path": "/braintree/payment", "auth": "user", "source": "routes/productRoutes.js"},
+    {"method": "POST", "api": PRODUCT_API, "path": "/check-inventory", "auth": "public", "source": "routes/productRoutes.js"},
+]
+
+# Routes whose :slug is a category slug; every other :slug is a product slug
+CATEGORY_SLUG_PATHS = ("/single-category/:slug", "/product-category/:slug", "/product-category-count/:slug")
+
+def guarded_routes():
+    """Routes behind requireSignIn (user and admin)."""
+    return [r for r in ROUTES if r["auth"] != "public"]
+
+def concrete_url(route, **params):
+    """Fills :params in the route's path, falling back to DUMMY_PARAMS."""
+    values = dict(DUMMY_PARAMS, **params)
+    path = re.sub(r":(\w+)", lambda m: str(values[m.group(1)]), route["path"])
+    return route["api"] + path
+
+def fixture_url(route, fixtures):
+    """concrete_url filled from real fixture values.
+
+    fixtures holds product values under the param names (slug, pid, cid, ...) plus category_slug,
+    which fills :slug on CATEGORY_SLUG_PATHS. A category route without category_slug falls back to
+    DUMMY_PARAMS rather than to the product slug.
+    """
+    params = {k: v for k, v in fixtures.items() if k != "category_slug"}
+    if route["path"] in CATEGORY_SLUG_PATHS:
+        params.pop("slug", None)
+        if fixtures.get("category_slug"):
+            params["slug"] = fixtures["category_slug"]
+    return concrete_url(route, **params)
+
+def label(route):
+    return f"{route['method']} {route['path']}"
+
+# (route, regex over the URL path) with every :param matching one path segment
+_PATTERNS = [
+    (r, re.compile("^" + re.sub(r":\w+", "[^/]+", re.escape(urlsplit(r["api"]).path + r["path"])) + "/?$"))
+    for r in ROUTES
+]
+
+def route_for(method, url):
+    """The catalog route a request URL belongs to, or None."""
+    path = urlsplit(url).path
+    for route, pattern in _PATTERNS:
+        if route["method"] == method and pattern.match(path):
+            return route
+    return None
@@ -0,0 +1,187 @@
+"""
+sample_store.py
+Compact per-request sample store for load and rate-limit runs.
+
+One sample is a status code, a latency, an endpoint id and a timestamp. They are kept in
+four typed arrays (int16, float32, uint16, float64), which is 16 bytes per sample. The
+alternative, a list of ints / error strings or a dict per request, costs hundreds of MB at a
+million samples. Requests that raise are stored with status ERROR (-1), and the first
+MAX_ERROR_MESSAGES distinct exception texts are kept for the report.
+
+Aggregations (status counts, percentiles, error rate, time buckets) are vectorised with
+NumPy when it is installed. Otherwise they fall back to plain Python, which gives the same
+numbers more slowly.
+"""
+
+import time
+import threading
+from array import array
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ERROR = -1
+MAX_ERROR_MESSAGES = 20
+
+def _percentile(sorted_values, q):
+    """Linear interpolation between closest ranks (numpy's default method)."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+class SampleStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status = array("h")
+        self._latency = array("f")
+        self._endpoint = array("H")
+        self._at = array("d")
+        self._endpoints = []
+        self._endpoint_ids = {}
+        self.errors = Counter()
+        self._cached = None
+        self.started = time.perf_counter()
+
+    def __len__(self):
+        return len(self._status)
+
+    def add(self, endpoint, status, latency_ms, at=None, error=None):
+        with self._lock:
+            eid = self._endpoint_ids.get(endpoint)
+            if eid is None:
+                eid = self._endpoint_ids[endpoint] = len(self._endpoints)
+                self._endpoints.append(endpoint)
+            self._status.append(status)
+            self._latency.append(latency_ms)
+            self._endpoint.append(eid)
+            self._at.append((time.perf_counter() if at is None else at) - self.started)
+            if error is not None and (error in self.errors or len(self.errors) < MAX_ERROR_MESSAGES):
+                self.errors[error] += 1
+
+    def timed(self, endpoint, fn, *args, **kw):
+        """Calls fn(*args, **kw) and stores the outcome. Returns the response, or the exception text."""
+        started = time.perf_counter()
+        try:
+            r = fn(*args, **kw)
+        except Exception as e:
+            self.add(endpoint, ERROR, (time.perf_counter() - started) * 1000, at=started, error=str(e))
+            return str(e)
+        self.add(endpoint, r.status_code, (time.perf_counter() - started) * 1000, at=started)
+        return r
+
+    # -------------------------
+    # Aggregation
+    # -------------------------
+    def _columns(self, endpoint=None):
+        """(status, latency_ms, at) for one endpoint or all samples, copied under the lock.
+
+        The copy is reused until the next add(), so summary() copies the arrays once.
+        """
+        with self._lock:
+            key = (len(self._status), endpoint, np is not None)
+            if self._cached is not None and self._cached[0] == key:
+                return self._cached[1]
+            eid = self._endpoint_ids.get(endpoint)
+            if np is not None:
+                cols = (np.array(self._status, dtype=np.int16), np.array(self._latency, dtype=np.float32),
+                        np.array(self._at, dtype=np.float64))
+                if endpoint is not None:
+                    mask = np.array(self._endpoint, dtype=np.uint16) == (eid if eid is not None else -1)
+                    cols = tuple(c[mask] for c in cols)
+            else:
+                rows = range(len(self._status))
+                if endpoint is not None:
+                    rows = [i for i in rows if self._endpoint[i] == eid]
+                cols = ([self._status[i] for i in rows], [self._latency[i] for i in rows], [self._at[i] for i in rows])
+            self._cached = (key, cols)
+            return cols
+
+    def count(self, status, endpoint=None):
+        codes = self._columns(endpoint)[0]
+        return int((codes == status).sum()) if np is not None else codes.count(status)
+
+    def status_counts(self, endpoint=None):
+        codes = self._columns(endpoint)[0]
+        if np is not None:
+            values, counts = np.unique(codes, return_counts=True)
+            pairs = zip(values.tolist(), counts.tolist())
+        else:
+            pairs = Counter(codes).items()
+        return {("ERR" if code == ERROR else str(code)): n for code, n in sorted(pairs)}
+
+    def latencies(self, endpoint=None):
+        """Latencies (ms) of the requests that got an answer other than 429, for custom statistics."""
+        codes, latency, _ = self._columns(endpoint)
+        if np is not None:
+            return latency[(codes != ERROR) & (codes != 429)]
+        return [ms for c, ms in zip(codes, latency) if c not in (ERROR, 429)]
+
+    def percentiles(self, qs=(50, 90, 99), endpoint=None):
+        """Latency percentiles (ms) over the same samples as latencies(): failed requests and 429s
+        return early and would pull the percentiles down."""
+        latency = self.latencies(endpoint)
+        if len(latency) == 0:
+            return {f"p{q}": None for q in qs}
+        if np is not None:
+            values = np.percentile(latency, qs).tolist()
+        else:
+            ordered = sorted(latency)
+            values = [_percentile(ordered, q) for q in qs]
+        return {f"p{q}": round(v, 2) for q, v in zip(qs, values)}
+
+    def error_rate(self, endpoint=None):
+        """Share of requests that raised or got a 5xx (429s are the limiter working, not errors)."""
+        codes = self._columns(endpoint)[0]
+        if len(codes) == 0:
+            return 0.0
+        if np is not None:
+            errors = int(((codes == ERROR) | (codes >= 500)).sum())
+        else:
+            errors = sum(1 for c in codes if c == ERROR or c >= 500)
+        return round(errors / len(codes), 4)
+
+    def time_buckets(self, width=1.0, endpoint=None):
+        """Per-bucket request, 429 and error counts plus median latency, `width` seconds each."""
+        codes, latency, at = self._columns(endpoint)
+        if len(codes) == 0:
+            return []
+        if np is not None:
+            idx = ((at - at.min()) // width).astype(np.int64)
+            order = np.argsort(idx, kind="stable")
+            idx, codes, latency = idx[order], codes[order], latency[order]
+            starts = np.flatnonzero(np.r_[True, idx[1:] != idx[:-1]])
+            bounds = np.r_[starts, len(idx)]
+            return [{
+                "t": round(float(idx[a] * width), 3),
+                "requests": int(b - a),
+                "rate_limited": int((codes[a:b] == 429).sum()),
+                "errors": int(((codes[a:b] == ERROR) | (codes[a:b] >= 500)).sum()),
+                "p50_ms": round(float(np.median(latency[a:b])), 2),
+            } for a, b in zip(bounds[:-1], bounds[1:])]
+        t0 = min(at)
+        buckets = {}
+        for code, ms, t in zip(codes, latency, at):
+            buckets.setdefault(int((t - t0) // width), []).append((code, ms))
+        return [{
+            "t": round(k * width, 3),
+            "requests": len(items),
+            "rate_limited": sum(1 for c, _ in items if c == 429),
+            "errors": sum(1 for c, _ in items if c == ERROR or c >= 500),
+            "p50_ms": round(_percentile(sorted(ms for _, ms in items), 50), 2),
+        } for k, items in sorted(buckets.items())]
+
+    def summary(self, endpoint=None, bucket_width=1.0):
+        return {
+            "requests": len(self._columns(endpoint)[0]),
+            "status_counts": self.status_counts(endpoint),
+            "latency_ms": self.percentiles(endpoint=endpoint),
+            "error_rate": self.error_rate(endpoint),
+            "errors": dict(self.errors),
+            "timeline": self.time_buckets(bucket_width, endpoint),
+        }
@@ -3,29 +3,32 @@
 Security tests for Product routes (MERN App)
 Security-only tests: RBAC, Mass Assignment, File upload, Slug abuse, NoSQL op injection,
 Search ReDoS, Invalid ObjectId handling, Content-Type enforcement, JWT corruption, Stored XSS.
+Pass --resume to continue an interrupted run from reports_product/checkpoint.json.
 """
 
 import os
-import io
 import json
 import time
 from concurrent.futures import ThreadPoolExecutor
 import requests
+from checkpoint import Checkpoint, resume_requested
+from harness_config import (
+    BASE, AUTH_API, PRODUCT_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, USER_EMAIL, USER_PASSWORD,
+    CONCURRENCY, BURST_REQUESTS, report_dir, make_session, make_profiler, resolve_category_id,
+)
+from instrumentation import start_instrumentation
+from probe_payloads import XSS_PAYLOADS
+from sample_store import SampleStore
+from uploads import MultipartBody, Buffer, Repeated
 
 # -------------------------
 # Configuration
 # -------------------------
-BASE = "http://localhost:3000"
-AUTH_API = f"{BASE}/api/v1/auth"
-CATEGORY_API = f"{BASE}/api/v1/category"
-PRODUCT_API = f"{BASE}/api/v1/product"
-TIMEOUT = 10
-REPORT_DIR = "./reports_product"
-
-ADMIN_EMAIL = "brendansoh@gmail.com"
-ADMIN_PASSWORD = "Password"
-USER_EMAIL = "brendansoh1@gmail.com"
-USER_PASSWORD = "Password"
+# Target, credentials and sweep sizes come from harness_config.py (file / env / CLI overrides)
+REPORT_DIR = report_dir("product")
+SESSION = make_session()
+# the rate-limit burst must reach the server even with response_cache on
+BURST_SESSION = make_session(cache=False)
 
 ADMIN_URL = ["/create-product", "/update-product", "/delete-product"]
 USER_URL = ["/braintree/payment"]
@@ -35,14 +38,16 @@ USER_URL = ["/braintree/payment"]
 # -------------------------
 os.makedirs(REPORT_DIR, exist_ok=True)
 
-results = {
+CHECKPOINT = Checkpoint(REPORT_DIR, resume=resume_requested(), profiler=make_profiler(REPORT_DIR))
+
+results = CHECKPOINT.results({
     "meta": {
         "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
         "base": BASE,
         "api": PRODUCT_API
     },
     "tests": []
-}
+})
 
 def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
     entry = {
@@ -75,7 +80,7 @@ def authed(method, url, token, **kw):
     headers = kw.pop("headers", {})
     if token:
         headers["Authorization"] = token
-    return getattr(requests, method)(url, headers=headers, timeout=TIMEOUT, **kw)
+    return getattr(SESSION, method)(url, headers=headers, timeout=TIMEOUT, **kw)
 
 def GET(url, token=None, **kw): return authed("get", url, token, **kw)
 def POST(url, token=None, **kw): return authed("post", url, token, **kw)
@@ -96,8 +101,10 @@ def py_slugify(s: str) -> str:
 # -------------------------
 ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
 USER_TOKEN  = get_token(USER_EMAIL, USER_PASSWORD)
+# Resolved once per run; every product fixture below points at this category
+CATEGORY_ID = CHECKPOINT.fixture("category_id", resolve_category_id)
 
-created_product_ids = []
+created_product_ids = CHECKPOINT.fixture("created_product_ids", list)
 
 def cleanup_created_products():
     # delete products
@@ -116,7 +123,7 @@ def cleanup_created_products():
 # -------------------------
 
 create_url = f"{PRODUCT_API}/create-product"
-name = f"rbac_prod_{int(time.time())}"
+name = CHECKPOINT.fixture("rbac_product_name", lambda: f"rbac_prod_{int(time.time())}")
 
 img_bytes = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01'
 data = {
@@ -124,14 +131,16 @@ data = {
     "description": "products created for security testing",
     "price": 10,
     "shipping": 1,
-    "category": "66db427fdb0119d9234b27ee",
+    "category": CATEGORY_ID,
     "quantity": 100
 }
 
-files = {"photo": ("p.png", io.BytesIO(img_bytes), "image/png")}
+# one body for every RBAC create / update; it restarts from the first byte on each send
+PHOTO = Buffer(img_bytes)
+rbac_body = MultipartBody(data, {"photo": ("p.png", PHOTO, "image/png")})
 
 def rbac_create_product_admin():
-    resp = POST(create_url, ADMIN_TOKEN, files=files, data=data)
+    resp = POST(create_url, ADMIN_TOKEN, data=rbac_body, headers=rbac_body.headers())
     ok = resp.status_code in (200, 201)
     details = resp.text
     try:
@@ -151,7 +160,7 @@ def rbac_create_product_admin():
     )
 
 def rbac_create_product_user():
-    resp = POST(create_url, USER_TOKEN, files=files, data=data)
+    resp = POST(create_url, USER_TOKEN, data=rbac_body, headers=rbac_body.headers())
     ok = resp.status_code == 401
     details = resp.text
     try:
@@ -171,7 +180,7 @@ def rbac_create_product_user():
     )
 
 def rbac_create_product_no_token():
-    resp = requests.post(create_url, files=files, data=data, timeout=TIMEOUT)
+    resp = requests.post(create_url, data=rbac_body, headers=rbac_body.headers(), timeout=TIMEOUT)
     ok = resp.status_code == 401
     details = resp.text
     try:
@@ -199,7 +208,7 @@ def create_update_url():
         return update_url + "/" + created_product_ids[0]
     
 def rbac_update_product_admin():
-    resp = PUT(create_update_url(), ADMIN_TOKEN, data=data, files=files)
+    resp = PUT(create_update_url(), ADMIN_TOKEN, data=rbac_body, headers=rbac_body.headers())
     ok = resp.status_code == 201
     details = resp.text
     record(
@@ -212,7 +221,7 @@ def rbac_update_product_admin():
     )
 
 def rbac_update_product_user():
-    resp = PUT(create_update_url(), USER_TOKEN, data=data, files=files)
+    resp = PUT(create_update_url(), USER_TOKEN, data=rbac_body, headers=rbac_body.headers())
     ok = resp.status_code == 401
     details = resp.text
     record(
@@ -225,7 +234,7 @@ def rbac_update_product_user():
     )
 
 def rbac_update_product_no_token():
-    resp = requests.put(create_update_url(), data=data, files=files, timeout=TIMEOUT)
+    resp = requests.put(create_update_url(), data=rbac_body, headers=rbac_body.headers(), timeout=TIMEOUT)
     ok = resp.status_code == 401
     details = resp.text
     record(
@@ -300,7 +309,7 @@ def product_mass_assignment_create():
         "description": "products created for security testing",
         "price": 10,
         "shipping": 1,
-        "category": "66db427fdb0119d9234b27ee",
+        "category": CATEGORY_ID,
         "quantity": 100,
         # attacker-provided privileged fields
         "isFeatured": "true",
@@ -329,7 +338,7 @@ def product_mass_assignment_update():
         "description": "products created for security testing",
         "price": 10,
         "shipping": 1,
-        "category": "66db427fdb0119d9234b27ee",
+        "category": CATEGORY_ID,
         "quantity": 100,
         # attacker-provided privileged fields
         "isFeatured": "true",
@@ -347,17 +356,16 @@ def product_mass_assignment_update():
     
     
 def product_image_mime_and_size_tests():
-    data = {"name": f"img_{int(time.time())}", "description":"d", "price":"1", "category":"66db427fdb0119d9234b27ee", "quantity":"1", "shipping":"1"}
+    data = {"name": f"img_{int(time.time())}", "description":"d", "price":"1", "category":CATEGORY_ID, "quantity":"1", "shipping":"1"}
 
     # invalid mime
-    files1 = {"photo": ("evil.txt", io.BytesIO(b'notimage'), "text/plain")}
-    r1 = POST(create_url, ADMIN_TOKEN, files=files1, data=data)
+    body1 = MultipartBody(data, {"photo": ("evil.txt", Buffer(b'notimage'), "text/plain")})
+    r1 = POST(create_url, ADMIN_TOKEN, data=body1, headers=body1.headers())
     record("Image MIME rejected", ok=(r1.status_code==403), status_code=r1.status_code, details=r1.text, endpoint="/create-product")
 
-    # oversized image (>1MB)
-    large = b'\xff' * (1024*1024 + 200)
-    files2 = {"photo": ("big.jpg", io.BytesIO(large), "image/jpeg")}
-    r2 = POST(create_url, ADMIN_TOKEN, files=files2, data=data)
+    # oversized image (>1MB), streamed from one reused 64 KiB block
+    body2 = MultipartBody(data, {"photo": ("big.jpg", Repeated(b'\xff', 1024*1024 + 200), "image/jpeg")})
+    r2 = POST(create_url, ADMIN_TOKEN, data=body2, headers=body2.headers())
     record("Image Size limit enforced", ok=(r2.status_code == 413), status_code=r2.status_code, details=r2.text, endpoint="/create-product")
 
 # ------------------------------
@@ -365,10 +373,7 @@ def product_image_mime_and_size_tests():
 #             /related-product/:pid/:cid,/product-category/:slug, /product-category-count/:slug)
 # ------------------------------
 
-payloads = [
-    "<script>alert(1)</script>",
-    "<svg/onload=alert(1)>"
-]
+payloads = XSS_PAYLOADS
 
 endpoints_get = [
     f"{PRODUCT_API}/get-product/",
@@ -380,18 +385,18 @@ endpoints_get = [
 ]
 
 def product_reflected_xss_tests():
-    for p in payloads:
-        for endpoint in endpoints_get:
-            reflected_xss_endpoint = endpoint + p
-            r = requests.get(reflected_xss_endpoint)
-            ok = p not in (r.text or "")
-            record(
-                name=f"Reflected XSS - {endpoint}",
-                ok=ok,
-                status_code=r.status_code,
-                summary= f"Reflected XSS - {p}",
-                endpoint=endpoint
-            )
+    matrix = [(p, endpoint) for p in payloads for endpoint in endpoints_get]
+    for _, (p, endpoint) in CHECKPOINT.iterate("product_reflected_xss_tests", matrix):
+        reflected_xss_endpoint = endpoint + p
+        r = requests.get(reflected_xss_endpoint)
+        ok = p not in (r.text or "")
+        record(
+            name=f"Reflected XSS - {endpoint}",
+            ok=ok,
+            status_code=r.status_code,
+            summary= f"Reflected XSS - {p}",
+            endpoint=endpoint
+        )
 
 def product_filters_nosql_operator_tests():
     """Send operator-like payloads to product-filters to ensure operators are not executed"""
@@ -404,7 +409,7 @@ def product_filters_nosql_operator_tests():
         {"radio": {"$regex": ".*"}},
         {"radio": "$regex : .*"}
     ]
-    for p in payloads:
+    for _, p in CHECKPOINT.iterate("product_filters_nosql_operator_tests", payloads):
         r = requests.post(url, json=p, timeout=TIMEOUT)
         ok = r.status_code == 400
         record(f"Product Filters NoSQL op - {p}", ok=ok, status_code=r.status_code, details=(r.text or "")[:300], endpoint="/product-filters")
@@ -431,20 +436,18 @@ def stored_xss_product_test():
     - delete the created product afterwards (best-effort)
     """
     payload = f"<script>alert('xss'){int(time.time())}</script>"
-    img_bytes = b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01'
-    files = {"photo": ("p.png", io.BytesIO(img_bytes), "image/png")}
-
     data_payload = {
         "name": payload,
         "description": payload,
         "price": "1",
-        "category": "66db427fdb0119d9234b27ee",
+        "category": CATEGORY_ID,
         "quantity": "1",
         "shipping": "1",
     }
 
     try:
-        create_resp = POST(create_url, ADMIN_TOKEN, files=files, data=data_payload)
+        xss_body = MultipartBody(data_payload, {"photo": ("p.png", PHOTO, "image/png")})
+        create_resp = POST(create_url, ADMIN_TOKEN, data=xss_body, headers=xss_body.headers())
     except Exception as e:
         record("Stored XSS - create product", ok=False, status_code=None,
                summary="Create request failed", details=str(e), endpoint="/create-product")
@@ -479,7 +482,7 @@ def stored_xss_update_test():
     - ensure the raw payload is NOT present in the update response or in public read endpoints
     - delete the product afterwards (best-effort cleanup)
     """
-    create_resp = POST(create_url, ADMIN_TOKEN, data=data, files=files)
+    create_resp = POST(create_url, ADMIN_TOKEN, data=rbac_body, headers=rbac_body.headers())
     pid = None
     try:
         pid = create_resp.json().get("products", {}).get("_id")
@@ -496,13 +499,14 @@ def stored_xss_update_test():
         "name": payload,
         "description": payload,
         "price": "1",
-        "category": "66db427fdb0119d9234b27ee",
+        "category": CATEGORY_ID,
         "quantity": "1",
         "shipping": "1",
     }
 
     try:
-        update_resp = PUT(f"{PRODUCT_API}/update-product/{pid}", ADMIN_TOKEN, data=data_payload, files=files)
+        xss_body = MultipartBody(data_payload, {"photo": ("p.png", PHOTO, "image/png")})
+        update_resp = PUT(f"{PRODUCT_API}/update-product/{pid}", ADMIN_TOKEN, data=xss_body, headers=xss_body.headers())
     except Exception as e:
         record("Stored XSS - update request failed", ok=False, status_code=None,
                summary="Update request exception", details=str(e), endpoint=f"/update-product/{pid}")
@@ -554,18 +558,20 @@ def stored_xss_update_test():
 def rate_limit_test():
     url = f"{PRODUCT_API}/get-product"
 
+    samples = SampleStore()
+
     def run(i):
-        try: return requests.get(url).status_code
-        except: return "ERR"
+        samples.timed("/get-product", BURST_SESSION.get, url)
 
-    with ThreadPoolExecutor(max_workers=50) as ex:
-        codes = list(ex.map(run, range(50)))
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        list(ex.map(run, range(BURST_REQUESTS)))
 
-    ok = 429 in codes
+    ok = samples.count(429) > 0
     record(
         name="Rate Limit - Get Product. Expect at least one Status 429",
         ok=ok,
-        summary=str(codes),
+        summary=str(samples.status_counts()),
+        details=samples.summary(),
         endpoint="/get-product"
     )
     
@@ -575,7 +581,7 @@ def rate_limit_test():
 def cors_test():
     evil = "http://evil.com"
     headers = {"Origin": evil, "Authorization": ADMIN_TOKEN}
-    resp = requests.get(f"{PRODUCT_API}/get-product", headers=headers, timeout=TIMEOUT)
+    resp = SESSION.get(f"{PRODUCT_API}/get-product", headers=headers, timeout=TIMEOUT)
     acao = resp.headers.get("Access-Control-Allow-Origin", "")
     ok = (acao != "*" and acao != evil)
 
@@ -592,35 +598,41 @@ def cors_test():
 # Test runner orchestration
 # -------------------------
 def main():
+    start_instrumentation()
     if not ADMIN_TOKEN or not USER_TOKEN:
         record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN or USER_TOKEN - ensure credentials are correct and auth server running")
         # write results and exit
     else:
-        rbac_create_product_admin()
-        rbac_create_product_user()
-        rbac_create_product_no_token()
-        rbac_update_product_admin()
-        rbac_update_product_user()
-        rbac_update_product_no_token()
-        rbac_delete_product_admin()
-        rbac_delete_product_user()
-        rbac_delete_product_no_token()
-        rbac_clean_up_all_test_products()
-        product_mass_assignment_create()
-        product_mass_assignment_update()
-        product_image_mime_and_size_tests()
-        product_reflected_xss_tests()
-        product_filters_nosql_operator_tests()
-        search_redos_test()
-        jwt_corruption_products()
-        stored_xss_product_test()
-        stored_xss_update_test()
-        rate_limit_test()
-        cors_test()
-
+        CHECKPOINT.run(rbac_create_product_admin)
+        CHECKPOINT.run(rbac_create_product_user)
+        CHECKPOINT.run(rbac_create_product_no_token)
+        CHECKPOINT.run(rbac_update_product_admin)
+        CHECKPOINT.run(rbac_update_product_user)
+        CHECKPOINT.run(rbac_update_product_no_token)
+        CHECKPOINT.run(rbac_delete_product_admin)
+        CHECKPOINT.run(rbac_delete_product_user)
+        CHECKPOINT.run(rbac_delete_product_no_token)
+        CHECKPOINT.run(rbac_clean_up_all_test_products)
+        CHECKPOINT.run(product_mass_assignment_create)
+        CHECKPOINT.run(product_mass_assignment_update)
+        CHECKPOINT.run(product_image_mime_and_size_tests)
+        CHECKPOINT.run(product_reflected_xss_tests)
+        CHECKPOINT.run(product_filters_nosql_operator_tests)
+        CHECKPOINT.run(search_redos_test)
+        CHECKPOINT.run(jwt_corruption_products)
+        CHECKPOINT.run(stored_xss_product_test)
+        CHECKPOINT.run(stored_xss_update_test)
+        CHECKPOINT.run(rate_limit_test)
+        CHECKPOINT.run(cors_test)
+
+    if hasattr(SESSION, "stats"):
+        results["meta"]["response_cache"] = SESSION.stats
+    if CHECKPOINT.profiler:
+        results["meta"]["profile"] = CHECKPOINT.profiler.finish()
     # write results
     with open(os.path.join(REPORT_DIR,"results.json"), "w") as f:
         f.write(json.dumps(results, indent=2))
+    CHECKPOINT.finish()
 
     print("\n✅ Product security tests finished. Results saved.")
 
@@ -9,25 +9,28 @@ Tests included:
  - Stored XSS Check
  - Brute-force login simulation (rate-limit check)
  - CORS origin header check
-Outputs: reports/results.json
-Configure endpoints and tokens below before running.
+Outputs: reports_auth/results.json
+Target, credentials and sweep sizes come from harness_config.py (file / env / CLI overrides).
+Pass --resume to continue an interrupted run from reports_auth/checkpoint.json.
 """
 
 import requests, json, os, time
 from concurrent.futures import ThreadPoolExecutor
+from checkpoint import Checkpoint, resume_requested
+from harness_config import (
+    BASE, AUTH_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, USER_EMAIL, USER_PASSWORD,
+    CONCURRENCY, BURST_REQUESTS, report_dir, make_session, make_profiler,
+)
+from instrumentation import start_instrumentation
+from sample_store import SampleStore
+from probe_payloads import NOSQL_PAYLOADS_BASIC, NOSQL_PAYLOADS_FORGOT, NOSQL_PAYLOADS_REGISTER
 
 # -------------------------
 # Test Configurations
 # -------------------------
 
-BASE = "http://localhost:3000"
-API = f"{BASE}/api/v1/auth"       
-TIMEOUT = 10
-REPORT_DIR="./reports_auth"
-ADMIN_EMAIL = "brendansoh@gmail.com"
-ADMIN_PASSWORD = "Password"
-USER_EMAIL = "brendansoh1@gmail.com"
-USER_PASSWORD = "Password"
+API = AUTH_API
+REPORT_DIR = report_dir("auth")
 ADMIN_ENDPOINTS_GET = ['/test', '/admin-auth', '/all-orders', '/users']
 ADMIN_ENDPOINTS_PUT = ['/order-status/12345']
 USER_ENDPOINTS_GET = ['/user-auth', '/orders']
@@ -40,13 +43,15 @@ LOGIN_URL = f"{API}/login"
 
 os.makedirs(REPORT_DIR, exist_ok=True)
 
-results = {
+CHECKPOINT = Checkpoint(REPORT_DIR, resume=resume_requested(), profiler=make_profiler(REPORT_DIR))
+
+results = CHECKPOINT.results({
     "meta": {
         "start_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
         "base": BASE
     },
     "tests": []
-}
+})
 
 def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
     entry = {
@@ -172,21 +177,19 @@ def corrupted_jwt_test_user():
 # -------------------------
 # Brute-force login (no auth)
 # -------------------------
-def brute_force_login(attempts=50, concurrency=50):
+def brute_force_login(attempts=BURST_REQUESTS, concurrency=CONCURRENCY):
     login_url = f"{API}/login"
     test_email = "doesnotexist@example.com"
+    session = make_session()
+    samples = SampleStore()
     def attempt(i):
         body = {"email": test_email, "password": f"wrong{i}"}
-        try:
-            r = requests.post(login_url, json=body, timeout=TIMEOUT)
-            return r.status_code
-        except Exception as e:
-            return str(e)
+        samples.timed("/login", session.post, login_url, json=body, timeout=TIMEOUT)
     with ThreadPoolExecutor(max_workers=concurrency) as ex:
-        codes = list(ex.map(attempt, range(1, attempts+1)))
+        list(ex.map(attempt, range(1, attempts+1)))
     # Status Code 429 to indicate Rate Limit Error
-    ok = any(c == 429 for c in codes)
-    record("Brute-force login simulation", ok, status_code= codes, summary="Pass if 429 or throttling observed; otherwise recommend rate-limiting", endpoint="login")
+    ok = samples.count(429) > 0
+    record("Brute-force login simulation", ok, status_code=samples.status_counts(), summary="Pass if 429 or throttling observed; otherwise recommend rate-limiting", details=samples.summary(), endpoint="login")
 
 # -------------------------
 # CORS probe (Origin header)
@@ -275,36 +278,16 @@ def stored_xss_register_test():
 # NoSQL Injection Attack (Greater Than, Not Equal, Regex, Or)
 # -------------------------
 
-NOSQL_PAYLOADS_BASIC = [
-    {"email": {"$ne": ""}, "password": "doesntmatter"},
-    {"email": {"$gt": ""}, "password": "doesntmatter"},
-    {"email": {"$regex": ".*"}, "password": "doesntmatter"},
-    {"$or": [{"email": {"$ne": ""}}, {"password": {"$ne": ""}}]}
-]
-
-NOSQL_PAYLOADS_FORGOT = [
-    {"email": {"$ne": ""}, "answer": {"$ne": ""}, "newPassword": "NewPass123!"},
-    {"email": {"$regex": ".*"}, "answer": {"$regex": ".*"}, "newPassword": "NewPass123!"},
-    {"$or": [{"email": {"$ne": ""}}, {"answer": {"$ne": ""}}], "newPassword": "NewPass123!"}
-]
-
-NOSQL_PAYLOADS_REGISTER = [
-    {"name":"x","email":{"$ne": ""},"password":"Password123","phone":"98765432","address":"a","answer":"b"},
-    {"name":"x","email":{"$gt": ""},"password":"Password123","phone":"98765432","address":"a","answer":"b"},
-    {"name":"x","email":{"$regex": ".*"},"password":"Password123","phone":"98765432","address":"a","answer":"b"},
-    {"$or":[{"email":{"$ne": ""}},{"name":{"$ne": ""}}],"password":"Password123","phone":"98765432","address":"a","answer":"b"}
-]
-
 def _run_nosql_tests(endpoint, payloads, expected_success_codes=(200,201)):
     url = f"{API}{endpoint}"
-    for i, p in enumerate(payloads, start=1):
+    for i, p in CHECKPOINT.iterate(f"nosql{endpoint}", payloads):
         try:
             r = requests.post(url, json=p, timeout=TIMEOUT)
             got_success = r.status_code in expected_success_codes
             ok = not got_success
-            record(f"Nosql {endpoint} try{i}", ok, r.status_code, summary=f"Payload: {str(p)[:80]}", endpoint=endpoint)
+            record(f"Nosql {endpoint} try{i + 1}", ok, r.status_code, summary=f"Payload: {str(p)[:80]}", endpoint=endpoint)
         except Exception as e:
-            record(f"Nosql {endpoint} try{i}", False, summary="Exception", details=str(e))
+            record(f"Nosql {endpoint} try{i + 1}", False, summary="Exception", details=str(e))
 
 def test_nosql_login():
     _run_nosql_tests("/login", NOSQL_PAYLOADS_BASIC, expected_success_codes=(200, 201))
@@ -317,25 +300,29 @@ def test_nosql_register():
 
 
 def main():
-    test_admin_routes_no_token()
-    test_admin_auth_admin_token()
-    test_admin_routes_user_token()
-    test_user_route_no_token()
-    test_user_auth_with_token()
-    corrupted_jwt_test_admin()
-    corrupted_jwt_test_user()
-    brute_force_login()
-    cors_probe()
-    reflected_xss_test_register()
-    stored_xss_register_test()
-    test_nosql_forgot_password()
-    test_nosql_login()
-    test_nosql_register()
+    start_instrumentation()
+    CHECKPOINT.run(test_admin_routes_no_token)
+    CHECKPOINT.run(test_admin_auth_admin_token)
+    CHECKPOINT.run(test_admin_routes_user_token)
+    CHECKPOINT.run(test_user_route_no_token)
+    CHECKPOINT.run(test_user_auth_with_token)
+    CHECKPOINT.run(corrupted_jwt_test_admin)
+    CHECKPOINT.run(corrupted_jwt_test_user)
+    CHECKPOINT.run(brute_force_login)
+    CHECKPOINT.run(cors_probe)
+    CHECKPOINT.run(reflected_xss_test_register)
+    CHECKPOINT.run(stored_xss_register_test)
+    CHECKPOINT.run(test_nosql_forgot_password)
+    CHECKPOINT.run(test_nosql_login)
+    CHECKPOINT.run(test_nosql_register)
     
+    if CHECKPOINT.profiler:
+        results["meta"]["profile"] = CHECKPOINT.profiler.finish()
     # Save results.json
     results_path = os.path.join(REPORT_DIR, "results.json")
     with open(results_path, "w", encoding="utf-8") as f:
         f.write(json.dumps(results, indent=2))
+    CHECKPOINT.finish()
 
     
 if __name__ == "__main__":
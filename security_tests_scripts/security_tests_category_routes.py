@@ -9,39 +9,45 @@ NoSQL Injection Tests
 Cross Origin Resource Sharing Test
 DDOS Protection with Rate Limit Test
 Mass Assignment Vulnerability Test for ORM Layer
+
+Pass --resume to continue an interrupted run from reports_category/checkpoint.json.
 """
 
 import os, json, time
 from concurrent.futures import ThreadPoolExecutor
 import requests
+from checkpoint import Checkpoint, resume_requested
+from harness_config import (
+    BASE, AUTH_API, CATEGORY_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, USER_EMAIL, USER_PASSWORD,
+    CONCURRENCY, BURST_REQUESTS, report_dir, make_session, make_profiler,
+)
+from instrumentation import start_instrumentation
+from sample_store import SampleStore
 
 # -------------------------
 # Configuration
 # -------------------------
-BASE = "http://localhost:3000"
-AUTH_API = f"{BASE}/api/v1/auth"
-CATEGORY_API  = f"{BASE}/api/v1/category"
-TIMEOUT = 10
-REPORT_DIR = "./reports_category"
-
-ADMIN_EMAIL = "brendansoh@gmail.com"
-ADMIN_PASSWORD = "Password"
-USER_EMAIL = "brendansoh1@gmail.com"
-USER_PASSWORD = "Password"
+# Target, credentials and sweep sizes come from harness_config.py (file / env / CLI overrides)
+REPORT_DIR = report_dir("category")
+SESSION = make_session()
+# the rate-limit burst must reach the server even with response_cache on
+BURST_SESSION = make_session(cache=False)
 
 # -------------------------
 # Setup Reporting
 # -------------------------
 os.makedirs(REPORT_DIR, exist_ok=True)
 
-results = {
+CHECKPOINT = Checkpoint(REPORT_DIR, resume=resume_requested(), profiler=make_profiler(REPORT_DIR))
+
+results = CHECKPOINT.results({
     "meta": {
         "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
         "base": BASE,
         "api": CATEGORY_API
     },
     "tests": []
-}
+})
 
 def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
     entry = {
@@ -68,7 +74,7 @@ def get_token(email, password):
 def authed(method, url, token, **kw):
     headers = kw.pop("headers", {})
     if token: headers["Authorization"] = token
-    return getattr(requests, method)(url, headers=headers, timeout=TIMEOUT, **kw)
+    return getattr(SESSION, method)(url, headers=headers, timeout=TIMEOUT, **kw)
 
 def GET(url, token=None, **kw): return authed("get", url, token, **kw)
 def POST(url, token=None, **kw): return authed("post", url, token, **kw)
@@ -88,9 +94,9 @@ USER_TOKEN  = get_token(USER_EMAIL, USER_PASSWORD)
 # Rules Based Access Control Tests (/create-category, /update-category/:id, /delete-category/:id)
 # -------------------------
 
-created_category_id = []
+created_category_id = CHECKPOINT.fixture("created_category_id", list)
 create_url = f"{CATEGORY_API}/create-category"
-test_category_name = f"cat_{int(time.time())}"
+test_category_name = CHECKPOINT.fixture("test_category_name", lambda: f"cat_{int(time.time())}")
 
 def rbac_test_admin_create_category():
     # Unique Category Name for Tests Only
@@ -250,18 +256,18 @@ def clean_up_test_category():
                 print("Warning Failure to delete test created categories, please reset data in MongoDB")
                 
 def rbac_tests():
-    rbac_test_admin_create_category()
-    rbac_test_user_create_category()
-    rbac_test_no_token_create_category()
+    CHECKPOINT.run(rbac_test_admin_create_category)
+    CHECKPOINT.run(rbac_test_user_create_category)
+    CHECKPOINT.run(rbac_test_no_token_create_category)
 
-    rbac_admin_update_category()
-    rbac_user_update_category()
-    rbac_no_token_update_category()
+    CHECKPOINT.run(rbac_admin_update_category)
+    CHECKPOINT.run(rbac_user_update_category)
+    CHECKPOINT.run(rbac_no_token_update_category)
 
-    rbac_admin_delete_category()
-    rbac_user_delete_category()
-    rbac_no_token_delete_category()
-    clean_up_test_category()
+    CHECKPOINT.run(rbac_admin_delete_category)
+    CHECKPOINT.run(rbac_user_delete_category)
+    CHECKPOINT.run(rbac_no_token_delete_category)
+    CHECKPOINT.run(clean_up_test_category)
 
 # -------------------------
 # JWT Corruption
@@ -286,7 +292,7 @@ def xss_tests():
 
     payloads = ['<script>alert(1)</script>', '<svg/onload=alert(1337)>']
 
-    for payload in payloads:
+    for _, payload in CHECKPOINT.iterate("xss_tests", payloads):
         name = f"{payload}_{time.time()}"
 
         # reflected
@@ -305,7 +311,7 @@ def xss_tests():
         )
 
         # stored
-        r2 = requests.get(list_url, timeout=TIMEOUT)
+        r2 = SESSION.get(list_url, timeout=TIMEOUT)
         stored = payload in (r2.text or "")
 
         record(
@@ -335,7 +341,7 @@ def nosql_tests():
         {"name": {"$regex": ".*"}},
         {"$or": [{"name": {"$ne": ""}}]}
     ]
-    for p in payloads:
+    for _, p in CHECKPOINT.iterate("nosql_tests", payloads):
         resp = POST(url, ADMIN_TOKEN, json=p)
         record(
             name=f"NoSQL Injection {p}",
@@ -352,7 +358,7 @@ def nosql_tests():
 def cors_test():
     evil = "http://evil.com"
     headers = {"Origin": evil, "Authorization": ADMIN_TOKEN}
-    resp = requests.get(f"{CATEGORY_API}/get-category", headers=headers, timeout=TIMEOUT)
+    resp = SESSION.get(f"{CATEGORY_API}/get-category", headers=headers, timeout=TIMEOUT)
     acao = resp.headers.get("Access-Control-Allow-Origin", "")
     ok = (acao != "*" and acao != evil)
 
@@ -370,19 +376,20 @@ def cors_test():
 def rate_limit_test():
     url = f"{CATEGORY_API}/get-category"
 
+    samples = SampleStore()
+
     def run(i):
-        try: return requests.get(url, timeout=TIMEOUT).status_code
-        except: return "ERR"
+        samples.timed("/get-category", BURST_SESSION.get, url, timeout=TIMEOUT)
 
-    with ThreadPoolExecutor(max_workers=50) as ex:
-        codes = list(ex.map(run, range(50)))
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        list(ex.map(run, range(BURST_REQUESTS)))
 
-    ok = 429 in codes
+    ok = samples.count(429) > 0
     record(
         name="Rate Limit - create-category",
         ok=ok,
         summary="Expect at least one Status 429",
-        details=str(codes),
+        details=samples.summary(),
         endpoint="/create-category"
     )
 
@@ -425,6 +432,7 @@ def mass_assignment_test():
 # MAIN
 # -------------------------
 def main():
+    start_instrumentation()
     if not ADMIN_TOKEN or not USER_TOKEN:
         record(
             name="Auth Failure",
@@ -433,15 +441,20 @@ def main():
         )
     else:
         rbac_tests()
-        jwt_corruption()
-        xss_tests()
-        nosql_tests()
-        cors_test()
-        rate_limit_test()
-        mass_assignment_test()
-
+        CHECKPOINT.run(jwt_corruption)
+        CHECKPOINT.run(xss_tests)
+        CHECKPOINT.run(nosql_tests)
+        CHECKPOINT.run(cors_test)
+        CHECKPOINT.run(rate_limit_test)
+        CHECKPOINT.run(mass_assignment_test)
+
+    if hasattr(SESSION, "stats"):
+        results["meta"]["response_cache"] = SESSION.stats
+    if CHECKPOINT.profiler:
+        results["meta"]["profile"] = CHECKPOINT.profiler.finish()
     with open(os.path.join(REPORT_DIR,"results.json"),"w") as f:
         f.write(json.dumps(results, indent=2))
+    CHECKPOINT.finish()
 
     print("\n✅ Security tests finished. Results saved.")
 
@@ -0,0 +1,344 @@
+"""
+security_tests_combinatorial.py
+Pairwise / t-wise probe matrix over every route (MERN App)
+
+The suites probe routes x auth states x payloads one slice at a time. Crossing all of them
+is far too many requests at 20 req/s. This script plans a covering array over:
+ - route:    every route in route_catalog.py
+ - auth:     admin, user, no token, and one mutated admin token per jwt_mutations.py class
+ - payload:  NOSQL_PAYLOADS_* and XSS_PAYLOADS from probe_payloads.py
+ - encoding: JSON body, or qs bracket notation in the query string (email[$ne]=)
+With combinatorial_strength = t, every t-way combination of those values is sent at least
+once. Set combinatorial_full (--combinatorial-full true) to send the full product instead.
+The report starts with the coverage achieved.
+
+A row fails when the server answers with a 5xx, reflects an XSS payload raw, lets a missing,
+mutated or under-privileged token past requireSignIn/isAdmin, or accepts a NoSQL operator
+on /login, /forgot-password or /register. Path ids are dummy ObjectIds. Valid tokens are
+never combined with the routes that create or change real records (EXCLUDED_WRITES).
+
+Distributed mode (work_queue.py): with queue_path set, the planned rows go on a SQLite queue
+instead of the local thread pool, and this process becomes the coordinator. It starts
+queue_workers local worker processes (0 = only wait for workers started by hand) and merges
+their results into the usual report. A worker is this script run with --worker:
+  python security_tests_combinatorial.py --worker --queue-path /shared/queue.sqlite [--queue-run <id>]
+It sends with the tokens the coordinator put in the run context, so every worker probes as the
+same users and does not log in itself. Workers get the coordinator's flags but do not start
+live metrics (the coordinator holds metrics_port); with record_traffic each worker writes its own
+archive. Each worker has its own interpreter and connection pool. The server's 20 req/s
+limiter counts per client IP, so every request goes through harness_http.PACER and local
+workers each get request_rate / queue_workers; give workers started by hand from the same IP
+a --request-rate that keeps the sum under the limit. The "workers" record shows the units per
+worker and the overall rate.
+Outputs: reports_combinatorial/results.json
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import subprocess
+from urllib.parse import quote
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import requests
+from harness_config import (
+    BASE, AUTH_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, USER_EMAIL, USER_PASSWORD,
+    CONCURRENCY, CONFIG, report_dir, make_session,
+)
+from instrumentation import start_instrumentation
+from harness_http import request_with_retry
+from combinatorial import plan
+from jwt_mutations import mutate
+from probe_payloads import NOSQL_PAYLOADS_BASIC, NOSQL_PAYLOADS_FORGOT, NOSQL_PAYLOADS_REGISTER, XSS_PAYLOADS
+from route_catalog import ROUTES, DUMMY_PARAMS, concrete_url, label
+from work_queue import WorkQueue
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("combinatorial")
+SESSION = make_session(cache=False)
+STRENGTH = CONFIG["combinatorial_strength"]
+FULL = CONFIG["combinatorial_full"]
+QUEUE_PATH = CONFIG["queue_path"]
+QUEUE_WORKERS = CONFIG["queue_workers"]
+QUEUE_BATCH = CONFIG["queue_batch"]
+
+ENCODINGS = ["json", "query"]
+# Routes that create or change real records when the token is valid
+EXCLUDED_WRITES = {"PUT /profile", "POST /create-category", "POST /create-product", "POST /braintree/payment"}
+NOSQL_LOGIN_PATHS = ("/login", "/forgot-password", "/register")
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "strength": STRENGTH,
+        "full": FULL,
+        "queue": QUEUE_PATH or None
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+def worker_requested(argv=None):
+    return "--worker" in (sys.argv if argv is None else argv)
+
+# workers take the tokens from the run context
+ADMIN_TOKEN = None if worker_requested() else get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+USER_TOKEN = None if worker_requested() else get_token(USER_EMAIL, USER_PASSWORD)
+
+ROUTE_BY_LABEL = {label(r): r for r in ROUTES}
+
+def auth_states():
+    """State name -> Authorization header value (None = header omitted)."""
+    states = {"admin": ADMIN_TOKEN, "user": USER_TOKEN, "none": None}
+    for cls, _, token in mutate(ADMIN_TOKEN, USER_TOKEN):
+        states.setdefault(f"admin:{cls}", token)
+    return states
+
+def flatten_qs(value, prefix=""):
+    """{"email": {"$ne": ""}} -> [("email[$ne]", "")], the notation Express's qs parser expands."""
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return [(prefix, value)]
+    pairs = []
+    for k, v in items:
+        pairs.extend(flatten_qs(v, f"{prefix}[{k}]" if prefix else str(k)))
+    return pairs
+
+def build_request(row, states):
+    route = ROUTE_BY_LABEL[row["route"]]
+    payload = row["payload"]
+    if isinstance(payload, str):
+        url = concrete_url(route, **{k: quote(payload, safe="") for k in DUMMY_PARAMS})
+        body = {"name": payload}
+    else:
+        url = concrete_url(route)
+        body = payload
+    token = states[row["auth"]]
+    kw = {"headers": {"Authorization": token} if token else {}, "timeout": TIMEOUT}
+    if row["encoding"] == "json":
+        kw["json"] = body
+    else:
+        kw["params"] = flatten_qs(body)
+    return route, url, kw
+
+def excluded(row):
+    return row.get("route") in EXCLUDED_WRITES and row.get("auth") in ("admin", "user")
+
+# -------------------------
+# Oracle
+# -------------------------
+def findings(row, route, r):
+    """List of finding kinds for one response; None when the row is inconclusive."""
+    if isinstance(r, str) or r.status_code == 429:
+        return None
+    out = []
+    payload, state = row["payload"], row["auth"]
+    if r.status_code >= 500:
+        out.append("server_error")
+    if isinstance(payload, str) and payload in (r.text or ""):
+        out.append("reflected_xss")
+    if route["auth"] != "public" and r.status_code < 400:
+        valid = state == "admin" or (state == "user" and route["auth"] == "user")
+        if not valid:
+            out.append("guard_bypass")
+    if (route["api"] == AUTH_API and route["path"] in NOSQL_LOGIN_PATHS
+            and isinstance(payload, dict) and r.status_code in (200, 201)):
+        out.append("nosql_operator_accepted")
+    return out
+
+def execute(row, states):
+    """Sends one row; the outcome is JSON-serialisable so queue workers can return it."""
+    route, url, kw = build_request(row, states)
+    r = request_with_retry(SESSION, route["method"], url, **kw)
+    return {"status": r if isinstance(r, str) else r.status_code, "findings": findings(row, route, r)}
+
+# -------------------------
+# Distributed mode
+# -------------------------
+def run_on_queue(rows, states):
+    """Coordinator: queues the rows, starts local workers and waits; returns outcomes in row order."""
+    queue = WorkQueue(QUEUE_PATH, CONFIG["queue_lease"])
+    run = queue.create_run(rows, context={"states": states})
+    print(f"Queued {len(rows)} units as run {run} on {QUEUE_PATH}")
+    script = os.path.abspath(sys.argv[0])
+    # later flags win over earlier ones and over harness.json / environment values;
+    # the workers split this process's request budget, since they share its client IP
+    worker_rate = CONFIG["request_rate"] / max(QUEUE_WORKERS, 1)
+    worker_args = sys.argv[1:] + ["--request-rate", str(worker_rate), "--worker", "--queue-run", run]
+    procs = [subprocess.Popen([sys.executable, script] + worker_args) for _ in range(QUEUE_WORKERS)]
+
+    started = time.perf_counter()
+    last_report = 0.0
+    while True:
+        progress = queue.progress(run)
+        if progress["done"] == len(rows):
+            break
+        if procs and all(p.poll() is not None for p in procs):
+            print("All local workers exited before the run was done")
+            break
+        if time.perf_counter() - last_report >= 5:
+            print(f"Run {run}: {progress}")
+            last_report = time.perf_counter()
+        time.sleep(0.5)
+    elapsed = time.perf_counter() - started
+    for p in procs:
+        p.wait()
+
+    merged = queue.results(run)
+    queue.close()
+    per_worker = Counter(w for _, outcome, w in merged if outcome is not None)
+    done = sum(per_worker.values())
+    record(
+        name="Combinatorial - workers",
+        ok=done == len(rows),
+        summary=f"{done} of {len(rows)} units by {len(per_worker)} workers in {elapsed:.1f}s ({done / elapsed:.1f} units/s)",
+        details={"run": run, "queue": QUEUE_PATH, "local_workers": QUEUE_WORKERS, "units_per_worker": dict(per_worker)}
+    )
+    return [outcome for _, outcome, _ in merged]
+
+def worker():
+    """Leases units of a queued run until none are left; results go back on the queue."""
+    queue = WorkQueue(QUEUE_PATH, CONFIG["queue_lease"])
+    run = CONFIG["queue_run"] or queue.latest_run()
+    context = queue.context(run) if run else None
+    if context is None:
+        print(f"No run {run or ''} on {QUEUE_PATH}")
+        return
+    states = context["states"]
+    name = f"{socket.gethostname()}:{os.getpid()}"
+    executed = 0
+    running = {}
+    # lease as slots free up instead of batch by batch, so the pool never idles on a slow unit
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        while True:
+            free = QUEUE_BATCH - len(running)
+            if free > 0:
+                for seq, unit in queue.lease(run, name, free):
+                    running[ex.submit(execute, unit, states)] = seq
+            if not running:
+                progress = queue.progress(run)
+                if not progress["pending"] and not progress["leased"]:
+                    break
+                # the rest is leased by other workers; their leases may still expire
+                time.sleep(1.0)
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            queue.complete(run, name, [(running.pop(f), f.result()) for f in finished])
+            executed += len(finished)
+    queue.close()
+    print(f"Worker {name} executed {executed} units of run {run}")
+
+# -------------------------
+# Sweep
+# -------------------------
+def combinatorial_sweep():
+    states = auth_states()
+    dimensions = {
+        "route": list(ROUTE_BY_LABEL),
+        "auth": list(states),
+        "payload": NOSQL_PAYLOADS_BASIC + NOSQL_PAYLOADS_FORGOT + NOSQL_PAYLOADS_REGISTER + XSS_PAYLOADS,
+        "encoding": ENCODINGS,
+    }
+    rows, coverage = plan(dimensions, strength=STRENGTH, full=FULL, excluded=excluded)
+    # interactions are only unreachable through EXCLUDED_WRITES; anything else is a planner gap
+    mode = "full product" if FULL else f"{coverage['strength']}-wise"
+    record(
+        name=f"Combinatorial - coverage ({mode})",
+        ok=all(excluded(e) for e in coverage["unreachable_examples"]),
+        summary=(f"{coverage['rows']} of {coverage['full_product']} combinations, "
+                 f"{coverage['covered']}/{coverage['interactions']} {coverage['strength']}-way interactions covered"),
+        details=coverage
+    )
+
+    if QUEUE_PATH:
+        outcomes = run_on_queue(rows, states)
+    else:
+        with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+            outcomes = list(ex.map(lambda row: execute(row, states), rows))
+
+    by_kind = defaultdict(list)
+    inconclusive = []
+    for row, outcome in zip(rows, outcomes):
+        outcome = outcome or {"status": "not executed", "findings": None}
+        where = (f"{row['auth']} {row['route']} [{row['encoding']}] "
+                 f"{str(row['payload'])[:60]} = {outcome['status']}")
+        kinds = outcome["findings"]
+        if kinds is None:
+            inconclusive.append(where)
+        for kind in kinds or []:
+            by_kind[kind].append(where)
+
+    for kind in ("server_error", "reflected_xss", "guard_bypass", "nosql_operator_accepted"):
+        record(
+            name=f"Combinatorial - {kind}",
+            ok=not by_kind[kind],
+            summary=f"{len(by_kind[kind])} of {len(rows)} requests",
+            details=by_kind[kind][:200]
+        )
+    record(
+        name="Combinatorial - inconclusive (rate limited / unreachable)",
+        ok=not inconclusive,
+        summary=f"{len(inconclusive)} of {len(rows)} requests",
+        details=inconclusive[:200]
+    )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    # workers leave live metrics to the coordinator, which holds metrics_port / metrics_file
+    start_instrumentation(live_metrics=not worker_requested())
+    if worker_requested():
+        worker()
+        return
+    if not ADMIN_TOKEN or not USER_TOKEN:
+        record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN or USER_TOKEN")
+    else:
+        combinatorial_sweep()
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Combinatorial probe matrix finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+security_tests_cors_sweep.py
+CORS / preflight sweep over every route (MERN App)
+
+cors_probe and the cors_test functions check one GET route with one evil origin. This sweep
+covers every route in route_catalog.py against a set of origin variants built from the allowed
+frontend origin (cors_allowed_origin): null, other hosts, subdomain / suffix / prefix tricks,
+scheme, port, case and trailing-slash changes. Each route x origin cell gets four requests:
+  1. OPTIONS preflight for the route's method
+  2. OPTIONS preflight that also asks for the Authorization / Content-Type headers
+  3. the real request without credentials
+  4. the real request with the admin token
+app.js runs cors() before the rate limiter, so preflights never count against the limiter, and
+a 429 still carries the CORS headers. No retries are needed; the real requests are started on
+harness_http.PACER slots so the sweep stays within the limiter budget shared with other scripts.
+Bodies are empty and path ids are dummy ObjectIds, so the real requests change nothing.
+
+Every cell is four characters, one per request above:
+  .  no Access-Control-Allow-Origin for a foreign origin, or the expected one for the allowed origin
+  E  the foreign origin is echoed back
+  *  wildcard Access-Control-Allow-Origin
+  C  origin echoed (or wildcard) together with Access-Control-Allow-Credentials: true
+  -  the allowed origin did not get its Access-Control-Allow-Origin
+  x  no response
+Outputs: reports_cors_sweep/results.json, cors_grid.txt
+"""
+
+import os
+import json
+import time
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from harness_config import (
+    BASE, AUTH_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, CONCURRENCY, CONFIG, report_dir, make_session,
+)
+from instrumentation import start_instrumentation
+from harness_http import PACER
+from route_catalog import ROUTES, concrete_url, label
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("cors_sweep")
+SESSION = make_session(cache=False)
+ALLOWED_ORIGIN = CONFIG["cors_allowed_origin"].rstrip("/")
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "allowed_origin": ALLOWED_ORIGIN
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+
+def origin_variants():
+    """Column label -> Origin header value; "allowed" is the control column."""
+    parts = urlsplit(ALLOWED_ORIGIN)
+    host, port = parts.hostname, f":{parts.port}" if parts.port else ""
+    other_scheme = "https" if parts.scheme == "http" else "http"
+    return {
+        "allowed": ALLOWED_ORIGIN,
+        "null": "null",
+        "evil": "http://evil.example.com",
+        "subdomain": f"{parts.scheme}://evil.{host}{port}",
+        "suffix": f"{parts.scheme}://{host}{port}.evil.example.com",
+        "prefix": f"{parts.scheme}://evil{host}{port}",
+        "scheme": f"{other_scheme}://{host}{port}",
+        "port": f"{parts.scheme}://{host}:{(parts.port or 80) + 1}",
+        "ip": f"{parts.scheme}://127.0.0.1{port}" if host != "127.0.0.1" else f"{parts.scheme}://localhost{port}",
+        "case": ALLOWED_ORIGIN.upper(),
+        "slash": ALLOWED_ORIGIN + "/",
+    }
+
+MODES = (
+    ("preflight", False),
+    ("preflight", True),
+    ("simple", False),
+    ("simple", True),
+)
+
+def send(route, origin, mode, credentials):
+    url = concrete_url(route)
+    headers = {"Origin": origin}
+    try:
+        if mode == "preflight":
+            headers["Access-Control-Request-Method"] = route["method"]
+            if credentials:
+                headers["Access-Control-Request-Headers"] = "authorization,content-type"
+            return SESSION.options(url, headers=headers, timeout=TIMEOUT)
+        if credentials and ADMIN_TOKEN:
+            headers["Authorization"] = ADMIN_TOKEN
+        PACER.wait()
+        return SESSION.request(route["method"], url, headers=headers, timeout=TIMEOUT)
+    except Exception:
+        return None
+
+def verdict(r, origin, control):
+    if r is None:
+        return "x"
+    acao = r.headers.get("Access-Control-Allow-Origin")
+    credentials = r.headers.get("Access-Control-Allow-Credentials", "").lower() == "true"
+    if control:
+        return "." if acao in (origin, "*") else "-"
+    if acao == "*":
+        return "C" if credentials else "*"
+    if acao == origin:
+        return "C" if credentials else "E"
+    return "."
+
+# -------------------------
+# Sweep
+# -------------------------
+def cors_sweep():
+    origins = origin_variants()
+    jobs = [(route, column, origin, mode, cred)
+            for route in ROUTES for column, origin in origins.items() for mode, cred in MODES]
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        responses = list(ex.map(lambda j: send(j[0], j[2], j[3], j[4]), jobs))
+
+    grid = {label(route): {column: "" for column in origins} for route in ROUTES}
+    for (route, column, origin, _, _), r in zip(jobs, responses):
+        grid[label(route)][column] += verdict(r, origin, control=(column == "allowed"))
+
+    for column, origin in origins.items():
+        cells = {route: row[column] for route, row in grid.items()}
+        bad = {route: cell for route, cell in cells.items() if set(cell) - {"."}}
+        record(
+            name=f"CORS sweep - origin {column}",
+            ok=not bad,
+            summary=(f"{len(bad)} of {len(cells)} routes "
+                     + ("missing the allowed origin" if column == "allowed" else "accept the origin")),
+            details={"origin": origin, "routes": bad}
+        )
+
+    width = max(len(route) for route in grid)
+    lines = [" " * width + "  " + " ".join(f"{c:<9}" for c in origins)]
+    for route, row in grid.items():
+        lines.append(f"{route:<{width}}  " + " ".join(f"{row[c]:<9}" for c in origins))
+    with open(os.path.join(REPORT_DIR, "cors_grid.txt"), "w") as f:
+        f.write("\n".join(lines) + "\n")
+    record(
+        name="CORS sweep - grid",
+        ok=all(not (set(cell) - {"."}) for row in grid.values() for cell in row.values()),
+        summary=f"{len(grid)} routes x {len(origins)} origins x {len(MODES)} requests (see cors_grid.txt)",
+        details={"columns": origins, "grid": grid}
+    )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if not ADMIN_TOKEN:
+        record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN - credentialed requests sent without a token")
+    cors_sweep()
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ CORS sweep finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+security_tests_inventory_race.py
+Concurrency race detector for the inventory and payment flows (MERN App)
+
+Creates a low-stock test product, then for each concurrency level releases N buyers at once
+(threading.Barrier) against /check-inventory followed by the authenticated /braintree/payment
+route, using the Braintree sandbox test nonce. After every round the final stock and the number
+of orders referencing the product are compared with the number of successful payments:
+ - oversell: more successful payments than stock, or stock driven below zero
+ - lost update: stock decrement does not match successful payments / created orders
+ - stale check: more buyers passed /check-inventory than there was stock (TOCTOU window)
+Each level is repeated race_rounds times and the report gives the rate of each anomaly.
+Every buyer sends two requests into one window of the shared 20 req/s limiter, so levels above
+10 buyers mostly measure the limiter. A round in which any buyer got a 429 can still show an
+anomaly, but cannot show its absence: without one it is counted as inconclusive and left out
+of the rates.
+
+Requires the server to be configured with Braintree sandbox keys (or a stubbed gateway).
+Orders created by the runs stay in the database; the test product is deleted at the end.
+Outputs: reports_inventory_race/results.json
+"""
+
+import io
+import os
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from harness_config import (
+    BASE, AUTH_API, PRODUCT_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, USER_EMAIL, USER_PASSWORD,
+    CONFIG, report_dir, make_session, resolve_category_id,
+)
+from instrumentation import start_instrumentation
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("inventory_race")
+SESSION = make_session(cache=False)
+
+STOCK = CONFIG["race_stock"]
+LEVELS = CONFIG["race_concurrency_levels"]
+ROUNDS = CONFIG["race_rounds"]
+NONCE = CONFIG["payment_nonce"]
+PRICE = 1
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "api": PRODUCT_API,
+        "stock": STOCK,
+        "levels": LEVELS,
+        "rounds": ROUNDS
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+USER_TOKEN = get_token(USER_EMAIL, USER_PASSWORD)
+
+def product_fields(name, quantity):
+    return {
+        "name": name,
+        "description": "low-stock product for inventory race tests",
+        "price": str(PRICE),
+        "category": resolve_category_id(),
+        "quantity": str(quantity),
+        "shipping": "1",
+    }
+
+def create_race_product():
+    name = f"race_prod_{int(time.time())}"
+    photo = {"photo": ("p.png", io.BytesIO(b'\x89PNG\r\n\x1a\n'), "image/png")}
+    r = SESSION.post(f"{PRODUCT_API}/create-product", headers={"Authorization": ADMIN_TOKEN},
+                     data=product_fields(name, STOCK), files=photo, timeout=TIMEOUT)
+    if r.status_code not in (200, 201):
+        return None, r
+    return r.json().get("products"), r
+
+def reset_stock(product):
+    r = SESSION.put(f"{PRODUCT_API}/update-product/{product['_id']}", headers={"Authorization": ADMIN_TOKEN},
+                    data=product_fields(product["name"], STOCK), timeout=TIMEOUT)
+    return r.status_code in (200, 201)
+
+def current_stock(product):
+    r = SESSION.get(f"{PRODUCT_API}/get-product/{product['slug']}", timeout=TIMEOUT)
+    return r.json().get("product", {}).get("quantity")
+
+def orders_for(product):
+    r = SESSION.get(f"{AUTH_API}/orders", headers={"Authorization": USER_TOKEN}, timeout=TIMEOUT)
+    orders = r.json() if r.status_code == 200 else []
+    return sum(1 for o in orders if any((p or {}).get("_id") == product["_id"] for p in o.get("products", [])))
+
+def wait_for_rate_window():
+    # app.js shares one 20 req/s limiter per client across all routers; start each race in a fresh window
+    time.sleep(1.1)
+
+# -------------------------
+# Race round
+# -------------------------
+def buyer(product, barrier):
+    cart = [{"_id": product["_id"], "price": PRICE, "quantity": 1}]
+    headers = {"Authorization": USER_TOKEN}
+    barrier.wait()
+    try:
+        check = SESSION.post(f"{PRODUCT_API}/check-inventory", json={"cart": cart}, timeout=TIMEOUT)
+        if check.status_code != 200:
+            return check.status_code, None
+        pay = SESSION.post(f"{PRODUCT_API}/braintree/payment", headers=headers,
+                           json={"nonce": NONCE, "cart": cart}, timeout=TIMEOUT)
+        return check.status_code, pay.status_code
+    except Exception as e:
+        return str(e), None
+
+def race_round(product, n):
+    barrier = threading.Barrier(n)
+    orders_before = orders_for(product)
+    wait_for_rate_window()
+    with ThreadPoolExecutor(max_workers=n) as ex:
+        outcomes = list(ex.map(lambda _: buyer(product, barrier), range(n)))
+    wait_for_rate_window()
+    final_stock = current_stock(product)
+    orders_created = orders_for(product) - orders_before
+
+    checks_passed = sum(1 for c, _ in outcomes if c == 200)
+    paid = sum(1 for _, p in outcomes if p == 201)
+    rate_limited = sum(1 for c, p in outcomes if 429 in (c, p))
+    decremented = STOCK - final_stock if final_stock is not None else None
+    oversell = paid > STOCK or (final_stock is not None and final_stock < 0)
+    lost_update = decremented is not None and (decremented != paid or orders_created != paid)
+    return {
+        "buyers": n,
+        "checks_passed": checks_passed,
+        "payments_ok": paid,
+        "payment_statuses": sorted({str(p) for _, p in outcomes if p is not None}),
+        "rate_limited": rate_limited,
+        "final_stock": final_stock,
+        "orders_created": orders_created,
+        "oversell": oversell,
+        "lost_update": lost_update,
+        "stale_check": checks_passed > STOCK,
+        "inconclusive": rate_limited > 0 and not (oversell or lost_update),
+    }
+
+def race_level(product, n):
+    rounds = []
+    for _ in range(ROUNDS):
+        if not reset_stock(product):
+            record(f"Inventory race - reset stock (N={n})", False, summary="Could not reset stock", endpoint="/update-product")
+            return
+        rounds.append(race_round(product, n))
+
+    conclusive = [r for r in rounds if not r["inconclusive"]]
+    inconclusive = len(rounds) - len(conclusive)
+    if not conclusive:
+        record(
+            name=f"Inventory race - {n} concurrent buyers",
+            ok=False,
+            summary=f"Inconclusive - rate limited in all {len(rounds)} rounds",
+            details={"rounds": rounds},
+            endpoint="/check-inventory + /braintree/payment"
+        )
+        return
+
+    def rate(key):
+        return sum(1 for r in conclusive if r[key]) / len(conclusive)
+    oversell_rate, lost_rate, stale_rate = rate("oversell"), rate("lost_update"), rate("stale_check")
+    record(
+        name=f"Inventory race - {n} concurrent buyers",
+        ok=oversell_rate == 0 and lost_rate == 0,
+        summary=(f"oversell {oversell_rate:.0%}, lost update {lost_rate:.0%}, "
+                 f"stale inventory check {stale_rate:.0%} over {len(conclusive)} rounds"
+                 + (f" ({inconclusive} rate-limited rounds inconclusive)" if inconclusive else "")),
+        details={"oversell_rate": oversell_rate, "lost_update_rate": lost_rate,
+                 "stale_check_rate": stale_rate, "inconclusive_rounds": inconclusive, "rounds": rounds},
+        endpoint="/check-inventory + /braintree/payment"
+    )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if not ADMIN_TOKEN or not USER_TOKEN:
+        record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN or USER_TOKEN")
+    else:
+        product, resp = create_race_product()
+        if not product:
+            record("Inventory race - setup", False, status_code=resp.status_code,
+                   summary="Could not create low-stock test product", details=resp.text[:300], endpoint="/create-product")
+        else:
+            try:
+                for n in LEVELS:
+                    race_level(product, n)
+            finally:
+                SESSION.delete(f"{PRODUCT_API}/delete-product/{product['_id']}",
+                               headers={"Authorization": ADMIN_TOKEN}, timeout=TIMEOUT)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Inventory race tests finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+security_tests_jwt_mutations.py
+JWT mutation sweep across every requireSignIn route (MERN App)
+
+Builds the jwt_mutations.py variants of the admin and user tokens once per run and sends every
+variant to every guarded route in route_catalog.py concurrently over the shared session pool.
+Every mutated token must be rejected by requireSignIn; a control request with the untouched
+token confirms each route is reachable. Results are grouped by variant class.
+
+Only a 401 carrying requireSignIn's message ("Error in sign in verification") counts as a
+rejection. Controllers answer 401 as well (createCategoryController for a missing name), and
+isAdmin answers 401 only after the token passed verification, so those count as accepted.
+
+Request bodies are empty and path ids are dummy ObjectIds, so a token that slips through
+cannot change real data. app.js mounts one limiter instance (20 req/s per client) on all three
+routers, so request_with_retry starts every request on a harness_http.PACER slot. 429 responses
+are retried after the limiter window; if a request is still rate limited it is reported as
+inconclusive rather than as a pass.
+Outputs: reports_jwt_mutations/results.json
+"""
+
+import os
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from harness_config import (
+    BASE, AUTH_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, USER_EMAIL, USER_PASSWORD,
+    CONCURRENCY, report_dir, make_session,
+)
+from instrumentation import start_instrumentation
+from harness_http import request_with_retry
+from jwt_mutations import mutate
+from route_catalog import guarded_routes, concrete_url, label
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("jwt_mutations")
+SESSION = make_session()
+SIGNIN_REJECTION = "Error in sign in verification"
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+USER_TOKEN = get_token(USER_EMAIL, USER_PASSWORD)
+
+def send(route, token):
+    """(status code or exception text, response message)"""
+    r = request_with_retry(SESSION, route["method"], concrete_url(route), headers={"Authorization": token}, timeout=TIMEOUT)
+    if isinstance(r, str):
+        return r, None
+    try:
+        body = r.json()
+    except ValueError:
+        body = None
+    return r.status_code, body.get("message") if isinstance(body, dict) else None
+
+def outcome(status, message):
+    """rejected (by requireSignIn), inconclusive (rate limited / unreachable) or accepted."""
+    if status == 429 or not isinstance(status, int):
+        return "inconclusive"
+    if status == 401 and message == SIGNIN_REJECTION:
+        return "rejected"
+    return "accepted"
+
+# -------------------------
+# Sweep
+# -------------------------
+def build_variants():
+    """(owner, class, label, token) for every mutation of both tokens, computed once."""
+    variants = []
+    for owner, token, other in (("admin", ADMIN_TOKEN, USER_TOKEN), ("user", USER_TOKEN, ADMIN_TOKEN)):
+        for cls, variant_label, mutated in mutate(token, other):
+            variants.append((owner, cls, variant_label, mutated))
+    return variants
+
+def control_check(routes):
+    """Untouched tokens must get past requireSignIn, otherwise a 401 below proves nothing."""
+    reachable, blocked = {}, {}
+    for route in routes:
+        token = ADMIN_TOKEN if route["auth"] == "admin" else USER_TOKEN
+        status, message = send(route, token)
+        reachable[label(route)] = f"{status} {message}" if message else status
+        if outcome(status, message) != "accepted":
+            blocked[label(route)] = reachable[label(route)]
+    record(
+        name="JWT mutations - control (valid tokens)",
+        ok=not blocked,
+        summary="Valid tokens should pass requireSignIn on every guarded route",
+        details={"statuses": reachable, "blocked": blocked}
+    )
+
+def jwt_mutation_sweep():
+    routes = guarded_routes()
+    control_check(routes)
+
+    variants = build_variants()
+    jobs = [(v, route) for v in variants for route in routes]
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        statuses = list(ex.map(lambda job: send(job[1], job[0][3]), jobs))
+
+    by_class = defaultdict(lambda: {"accepted": [], "inconclusive": [], "sent": 0})
+    for ((owner, cls, variant_label, _), route), (status, message) in zip(jobs, statuses):
+        group = by_class[cls]
+        group["sent"] += 1
+        where = f"{owner}: {variant_label} -> {label(route)} = {status} {message or ''}".rstrip()
+        result = outcome(status, message)
+        if result != "rejected":
+            group[result].append(where)
+
+    for cls, group in by_class.items():
+        record(
+            name=f"JWT mutations - {cls}",
+            ok=not group["accepted"] and not group["inconclusive"],
+            summary=(f"{len(group['accepted'])} accepted, {len(group['inconclusive'])} inconclusive "
+                     f"of {group['sent']} requests (expect requireSignIn's 401 for all)"),
+            details={"accepted": group["accepted"], "inconclusive": group["inconclusive"]}
+        )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if not ADMIN_TOKEN or not USER_TOKEN:
+        record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN or USER_TOKEN")
+    else:
+        jwt_mutation_sweep()
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ JWT mutation sweep finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
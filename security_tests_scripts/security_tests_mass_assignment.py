@@ -0,0 +1,355 @@
+"""
+security_tests_mass_assignment.py
+Schema-driven mass-assignment fuzzer (MERN App)
+
+The suites' mass-assignment checks send invented fields (isFeatured, adminApproved, ...). This
+fuzzer reads the real top-level fields of every Mongoose schema in models/*.js, plus _id, __v
+and createdAt / updatedAt when the schema has timestamps. For each create / update / profile
+endpoint it takes the fields of that endpoint's own model that the controller is not supposed
+to take from the client, such as user role, order buyer / products / payment and product
+slug, and sends them with forged values:
+ - one request per field, so a persisted value points to the exact field (register sends all
+   fields in one request, because users cannot be deleted through the API)
+ - all requests run in parallel after the fixtures exist
+ - persistence is checked with one batched read-back per model: /users, /get-category,
+   /product-filters and /all-orders, fetched concurrently before and after the fuzzing
+A field fails when the value read back equals the forged value and did not before. Only a 4xx
+rejection (other than 429) counts as not persisted without looking. A request that was still
+rate limited, answered 5xx or got no answer is unverifiable unless the forged value shows up
+anyway, and keeps the endpoint from passing. user.answer is not returned by any read route, so
+it is always reported as unverifiable.
+
+PUT /profile runs as the test user and PUT /order-status on that user's first order. If role
+or answer is assignable, the test account keeps the forged value: check the report.
+Created categories and products are deleted at the end; the registered user (mass_<ts>@example.com)
+is left for reap_test_data.py.
+Outputs: reports_mass_assignment/results.json
+"""
+
+import os
+import re
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from harness_config import (
+    BASE, AUTH_API, CATEGORY_API, PRODUCT_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, USER_EMAIL, USER_PASSWORD,
+    CONCURRENCY, CONFIG, report_dir, make_session, resolve_category_id,
+)
+from instrumentation import start_instrumentation
+from harness_http import request_with_retry
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("mass_assignment")
+MODELS_DIR = os.path.join(os.path.abspath(CONFIG["server_dir"]), "models")
+SESSION = make_session(cache=False)
+STAMP = int(time.time())
+
+# Forged values; anything persisted equal to these was taken from the request
+FORGED = {
+    "_id": "0000000000000000000000ab",
+    "__v": 99,
+    "createdAt": "2000-01-01T00:00:00.000Z",
+    "updatedAt": "2000-01-01T00:00:00.000Z",
+    "role": 1,
+    "answer": "mass-answer",
+    "slug": "mass-assignment-slug",
+    "buyer": "0000000000000000000000ac",
+    "products": ["0000000000000000000000ad"],
+    "payment": {"success": True},
+    "status": "Delivered",
+}
+# Schema fields that cannot be sent as a form / JSON value
+UNSENDABLE = {"photo"}
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "models": MODELS_DIR
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+USER_TOKEN = get_token(USER_EMAIL, USER_PASSWORD)
+
+def call(method, url, token=None, **kw):
+    headers = {"Authorization": token} if token else {}
+    return request_with_retry(SESSION, method, url, headers=headers, timeout=TIMEOUT, **kw)
+
+def json_of(r):
+    try:
+        return r.json()
+    except Exception:
+        return {}
+
+# -------------------------
+# Schema parsing
+# -------------------------
+def schema_fields(path):
+    """Top-level field names of the first `new mongoose.Schema({...}, {...})` in a model file."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    start = source.index("{", source.index("mongoose.Schema("))
+    depth, top, quote, i = 0, [], None, start
+    while i < len(source):
+        ch = source[i]
+        if quote:
+            if ch == "\\":
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in "\"'`":
+            quote = ch
+        elif ch in "{[(":
+            depth += 1
+        elif ch in "}])":
+            depth -= 1
+            if depth == 0:
+                break
+        if depth == 1 and ch not in "{[(":
+            top.append(ch)
+        elif depth > 1:
+            top.append(" ")
+        i += 1
+    fields = set(re.findall(r"(\w+)\s*:", "".join(top)))
+    fields.update({"_id", "__v"})
+    if re.search(r"timestamps\s*:\s*true", source[i:]):
+        fields.update({"createdAt", "updatedAt"})
+    return fields
+
+def load_models():
+    return {model: schema_fields(os.path.join(MODELS_DIR, f"{model}Model.js"))
+            for model in ("user", "product", "category", "order")}
+
+# -------------------------
+# Read-back (one request per model)
+# -------------------------
+def read_back():
+    jobs = {
+        "user": lambda: json_of(call("GET", f"{AUTH_API}/users", ADMIN_TOKEN)).get("users", []),
+        "category": lambda: json_of(call("GET", f"{CATEGORY_API}/get-category")).get("category", []),
+        "product": lambda: json_of(call("POST", f"{PRODUCT_API}/product-filters", json={"checked": [], "radio": []})).get("products", []),
+        "order": lambda: json_of(call("GET", f"{AUTH_API}/all-orders", ADMIN_TOKEN)) or [],
+    }
+    with ThreadPoolExecutor(max_workers=len(jobs)) as ex:
+        futures = {model: ex.submit(fn) for model, fn in jobs.items()}
+    return {model: f.result() if isinstance(f.result(), list) else [] for model, f in futures.items()}
+
+def find(docs, **match):
+    for doc in docs:
+        if all(str(doc.get(k)) == str(v) for k, v in match.items()):
+            return doc
+    return None
+
+def normalize(value):
+    if isinstance(value, dict) and "_id" in value:
+        return str(value["_id"])
+    if isinstance(value, list):
+        return [normalize(v) for v in value]
+    return str(value)
+
+def persisted(field, before, after):
+    """True / False, or None when the read-back does not expose the field (or the record)."""
+    if after is None or field not in after:
+        return None
+    forged = normalize(FORGED[field])
+    was = normalize(before.get(field)) if before else None
+    return normalize(after[field]) == forged and was != forged
+
+# -------------------------
+# Fixtures
+# -------------------------
+def create_fixtures(category_id, baseline):
+    """Category, product and order that the update endpoints are fuzzed against."""
+    fixtures = {}
+    r = call("POST", f"{CATEGORY_API}/create-category", ADMIN_TOKEN, json={"name": f"mass_upd_{STAMP}"})
+    fixtures["category"] = json_of(r).get("category", {}).get("_id") if not isinstance(r, str) else None
+    r = call("POST", f"{PRODUCT_API}/create-product", ADMIN_TOKEN, data={
+        "name": f"mass_upd_prod_{STAMP}", "description": "mass assignment fixture", "price": "1",
+        "category": category_id, "quantity": "1", "shipping": "0",
+    })
+    fixtures["product"] = json_of(r).get("products", {}).get("_id") if not isinstance(r, str) else None
+    user = find(baseline["user"], email=USER_EMAIL)
+    orders = [o for o in baseline["order"] if user and normalize(o.get("buyer")) == str(user.get("_id"))]
+    fixtures["order"] = orders[0] if orders else None
+    fixtures["user"] = user
+    return fixtures
+
+def product_form(name, category_id):
+    return {"name": name, "description": "mass assignment probe", "price": "1",
+            "category": category_id, "quantity": "1", "shipping": "0"}
+
+def form_value(value):
+    return json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+
+# -------------------------
+# Fuzz jobs
+# -------------------------
+def build_jobs(models, fixtures, category_id):
+    """(endpoint, model, fields, method, url, token, request kwargs, locator) per request."""
+    accepted = {
+        "register": {"name", "email", "password", "phone", "address", "answer"},
+        "profile": {"name", "email", "password", "address", "phone"},
+        "category": {"name"},
+        "product": {"name", "description", "price", "category", "quantity", "shipping"},
+        "order": {"status"},
+    }
+    def candidates(model, endpoint):
+        return sorted(f for f in models[model] - accepted[endpoint] - UNSENDABLE if f in FORGED)
+
+    jobs = []
+    email = f"mass_{STAMP}@example.com"
+    fields = candidates("user", "register")
+    body = {"name": "mass", "email": email, "password": "Password123!", "phone": "91234567",
+            "address": "a", "answer": "b", **{f: FORGED[f] for f in fields}}
+    jobs.append(("/register", "user", fields, "POST", f"{AUTH_API}/register", None, {"json": body}, {"email": email}))
+
+    if fixtures["user"]:
+        for f in candidates("user", "profile"):
+            body = {"name": fixtures["user"]["name"], f: FORGED[f]}
+            jobs.append(("/profile", "user", [f], "PUT", f"{AUTH_API}/profile", USER_TOKEN, {"json": body},
+                         {"email": USER_EMAIL}))
+
+    for f in candidates("category", "category"):
+        name = f"mass_{f}_{STAMP}"
+        jobs.append(("/create-category", "category", [f], "POST", f"{CATEGORY_API}/create-category", ADMIN_TOKEN,
+                     {"json": {"name": name, f: FORGED[f]}}, {"name": name}))
+        if fixtures["category"]:
+            jobs.append(("/update-category", "category", [f], "PUT", f"{CATEGORY_API}/update-category/{fixtures['category']}",
+                         ADMIN_TOKEN, {"json": {"name": f"mass_upd_{STAMP}", f: FORGED[f]}}, {"_id": fixtures["category"]}))
+
+    for f in candidates("product", "product"):
+        name = f"mass_{f}_{STAMP}"
+        jobs.append(("/create-product", "product", [f], "POST", f"{PRODUCT_API}/create-product", ADMIN_TOKEN,
+                     {"data": {**product_form(name, category_id), f: form_value(FORGED[f])}}, {"name": name}))
+        if fixtures["product"]:
+            form = {**product_form(f"mass_upd_prod_{STAMP}", category_id), f: form_value(FORGED[f])}
+            jobs.append(("/update-product", "product", [f], "PUT", f"{PRODUCT_API}/update-product/{fixtures['product']}",
+                         ADMIN_TOKEN, {"data": form}, {"_id": fixtures["product"]}))
+
+    if fixtures["order"]:
+        order = fixtures["order"]
+        for f in candidates("order", "order"):
+            jobs.append(("/order-status", "order", [f], "PUT", f"{AUTH_API}/order-status/{order['_id']}", ADMIN_TOKEN,
+                         {"json": {"status": order.get("status"), f: FORGED[f]}}, {"_id": order["_id"]}))
+    return jobs
+
+def cleanup(after):
+    ids = [("product", d["_id"]) for d in after["product"] if str(d.get("name", "")).startswith("mass_")]
+    ids += [("category", d["_id"]) for d in after["category"] if str(d.get("name", "")).startswith("mass_")]
+    urls = {"product": f"{PRODUCT_API}/delete-product/", "category": f"{CATEGORY_API}/delete-category/"}
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        list(ex.map(lambda item: call("DELETE", urls[item[0]] + item[1], ADMIN_TOKEN), ids))
+
+# -------------------------
+# Fuzzer
+# -------------------------
+def mass_assignment_fuzz():
+    models = load_models()
+    category_id = resolve_category_id()
+    baseline = read_back()
+    fixtures = create_fixtures(category_id, baseline)
+    before = read_back()
+    jobs = build_jobs(models, fixtures, category_id)
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        responses = list(ex.map(lambda j: call(j[3], j[4], j[5], **j[6]), jobs))
+    after = read_back()
+
+    by_endpoint = {}
+    for (endpoint, model, fields, _, _, _, _, locator), r in zip(jobs, responses):
+        status = r if isinstance(r, str) else r.status_code
+        doc_before, doc_after = find(before[model], **locator), find(after[model], **locator)
+        if "_id" in fields and doc_after is None and "name" in locator:
+            # a forged _id on create is only visible as a record under that id
+            doc_after = find(after[model], _id=FORGED["_id"])
+        group = by_endpoint.setdefault(endpoint, {"persisted": [], "unverifiable": [], "server_errors": [], "fields": {}})
+        rejected = isinstance(status, int) and 400 <= status < 500 and status != 429
+        for field in fields:
+            result = False if rejected else persisted(field, doc_before, doc_after)
+            if result is False and not (isinstance(status, int) and status < 400) and not rejected:
+                # the controller never ran or failed part-way; an unchanged record proves nothing
+                result = None
+            group["fields"][field] = {"status": status, "persisted": result}
+            if result:
+                group["persisted"].append(field)
+            elif result is None:
+                group["unverifiable"].append(field)
+        if isinstance(r, str) or r.status_code >= 500:
+            group["server_errors"].append({"fields": fields, "status": status})
+
+    for endpoint, group in by_endpoint.items():
+        # unverifiable because the request failed, not because no route reads the field back
+        failed = [f for f in group["unverifiable"]
+                  if not isinstance(group["fields"][f]["status"], int) or group["fields"][f]["status"] >= 400]
+        record(
+            name=f"Mass assignment (schema) - {endpoint}",
+            ok=not group["persisted"] and not group["server_errors"] and not failed,
+            summary=(f"{len(group['persisted'])} of {len(group['fields'])} schema fields persisted"
+                     + (f": {', '.join(group['persisted'])}" if group["persisted"] else "")
+                     + (f"; {len(failed)} unverifiable (rate limited / failed request)" if failed else "")),
+            details=group,
+            endpoint=endpoint
+        )
+    for name, present in (("/update-category", fixtures["category"]), ("/update-product", fixtures["product"]),
+                          ("/order-status", fixtures["order"]), ("/profile", fixtures["user"])):
+        if not present:
+            record(f"Mass assignment (schema) - {name}", False, summary="Fixture missing, endpoint not fuzzed", endpoint=name)
+
+    cleanup(after)
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if not ADMIN_TOKEN or not USER_TOKEN:
+        record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN or USER_TOKEN")
+    elif not os.path.isdir(MODELS_DIR):
+        record("Mass assignment setup", False, summary=f"models/ not found under server_dir ({MODELS_DIR})")
+    else:
+        mass_assignment_fuzz()
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Schema mass-assignment fuzzer finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+security_tests_stored_xss.py
+Stored XSS fan-out verifier over every read path (MERN App)
+
+The suites check stored XSS on the response they happen to read next: stored_xss_product_test
+the create response, stored_xss_update_test /get-product, stored_xss_register_test /login and
+xss_tests /get-category. A payload that survives storage can surface anywhere the record is
+read, so this script plants markers first and then reads every route that can return them.
+
+Each marker is a unique alphanumeric token followed by an XSS payload (sxss<run>m<n><svg/...>).
+The token survives the sanitizers (express-xss-sanitizer on JSON bodies, stripTags on product
+fields), so the marker can still be found after its markup is stripped. Planted:
+ - one category (name), then two products in it (name, description each)
+ - one user (name, address) through /register
+ - one order of that user for the first product through /braintree/payment (needs Braintree
+   sandbox keys; without an order /all-orders and /orders have nothing to surface)
+Then every read path is requested concurrently:
+   /get-product, /get-product/:slug, /search/:keyword, /product-list/:page, /product-category/:slug,
+   /related-product/:pid/:cid, /product-filters, /get-category, /single-category/:slug,
+   /users, /all-orders, /orders, /login
+and each response is scanned once for all tokens. A marker whose token is found with its payload
+intact (raw, or as escaped in JSON) is stored XSS on that path. A read path where no marker
+surfaces fails as inconclusive.
+
+The category and products are deleted at the end. The user and the order cannot be deleted
+through the API (see reap_test_data.py).
+Outputs: reports_stored_xss/results.json
+"""
+
+import os
+import re
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from harness_config import (
+    BASE, AUTH_API, CATEGORY_API, PRODUCT_API, TIMEOUT, ADMIN_EMAIL, ADMIN_PASSWORD, CONCURRENCY,
+    CONFIG, report_dir, make_session,
+)
+from instrumentation import start_instrumentation
+from harness_http import request_with_retry
+from probe_payloads import XSS_PAYLOADS
+from uploads import MultipartBody, Buffer
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("stored_xss")
+SESSION = make_session(cache=False)
+NONCE = CONFIG["payment_nonce"]
+RUN = int(time.time())
+TOKEN = re.compile(rf"sxss{RUN}m\d+")
+PASSWORD = "Password123"
+PRODUCT_LIST_PAGES = 2
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "run": RUN
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Helpers
+# -------------------------
+def get_token(email, password):
+    url = f"{AUTH_API}/login"
+    try:
+        r = requests.post(url, json={"email": email, "password": password}, timeout=TIMEOUT)
+    except Exception as e:
+        print("Auth endpoint not reachable:", e)
+        return None
+    if r.status_code != 200:
+        return None
+    return r.json().get("token")
+
+ADMIN_TOKEN = get_token(ADMIN_EMAIL, ADMIN_PASSWORD)
+
+markers = {}
+
+def marker(field):
+    """New token + payload for a planted field; the payloads rotate through XSS_PAYLOADS."""
+    n = len(markers)
+    token = f"sxss{RUN}m{n}"
+    markers[token] = {"field": field, "payload": token + XSS_PAYLOADS[n % len(XSS_PAYLOADS)]}
+    return markers[token]["payload"]
+
+def is_raw(payload, text):
+    return payload in text or json.dumps(payload)[1:-1] in text
+
+# -------------------------
+# Plant
+# -------------------------
+def plant():
+    """Creates the marked records; returns what the read paths need (None where planting failed)."""
+    admin = {"Authorization": ADMIN_TOKEN}
+    planted = {"category": None, "products": [], "user_email": f"sxss_{RUN}@example.com", "user_token": None, "order": False}
+    statuses = {}
+
+    r = request_with_retry(SESSION, "POST", f"{CATEGORY_API}/create-category", json={"name": marker("category.name")},
+                           headers=admin, timeout=TIMEOUT)
+    statuses["create-category"] = r if isinstance(r, str) else r.status_code
+    if not isinstance(r, str) and r.status_code in (200, 201):
+        planted["category"] = r.json().get("category")
+
+    if planted["category"]:
+        for i in range(2):
+            body = MultipartBody({
+                "name": marker(f"product{i}.name"),
+                "description": marker(f"product{i}.description"),
+                "price": "1",
+                "category": planted["category"]["_id"],
+                "quantity": "5",
+                "shipping": "1",
+            }, {"photo": ("p.png", Buffer(b'\x89PNG\r\n\x1a\n'), "image/png")})
+            r = request_with_retry(SESSION, "POST", f"{PRODUCT_API}/create-product", data=body,
+                                   headers=dict(admin, **body.headers()), timeout=TIMEOUT)
+            statuses[f"create-product {i}"] = r if isinstance(r, str) else r.status_code
+            if not isinstance(r, str) and r.status_code in (200, 201):
+                planted["products"].append(r.json().get("products"))
+
+    r = request_with_retry(SESSION, "POST", f"{AUTH_API}/register", json={
+        "name": marker("user.name"),
+        "email": planted["user_email"],
+        "password": PASSWORD,
+        "phone": "98765432",
+        "address": marker("user.address"),
+        "answer": "sxss",
+    }, timeout=TIMEOUT)
+    statuses["register"] = r if isinstance(r, str) else r.status_code
+    planted["user_token"] = get_token(planted["user_email"], PASSWORD)
+
+    if planted["user_token"] and planted["products"]:
+        product = planted["products"][0]
+        r = request_with_retry(SESSION, "POST", f"{PRODUCT_API}/braintree/payment",
+                               json={"nonce": NONCE, "cart": [{"_id": product["_id"], "price": 1, "quantity": 1}]},
+                               headers={"Authorization": planted["user_token"]}, timeout=TIMEOUT)
+        statuses["braintree/payment"] = r if isinstance(r, str) else r.status_code
+        planted["order"] = not isinstance(r, str) and r.status_code in (200, 201)
+
+    record(
+        name="Stored XSS fan-out - plant",
+        ok=planted["category"] and len(planted["products"]) == 2 and planted["user_token"],
+        summary=(f"{len(markers)} markers; category={'yes' if planted['category'] else 'no'}, "
+                 f"products={len(planted['products'])}, user={'yes' if planted['user_token'] else 'no'}, "
+                 f"order={'yes' if planted['order'] else 'no'}"),
+        details={"statuses": statuses, "markers": markers}
+    )
+    return planted
+
+# -------------------------
+# Read paths
+# -------------------------
+def read_paths(planted):
+    """(label, method, url, kwargs) for every route that can return a planted record."""
+    admin = {"Authorization": ADMIN_TOKEN}
+    paths = [
+        ("GET /get-product", "GET", f"{PRODUCT_API}/get-product", {}),
+        ("GET /search/:keyword", "GET", f"{PRODUCT_API}/search/sxss{RUN}", {}),
+        ("GET /get-category", "GET", f"{CATEGORY_API}/get-category", {}),
+        ("GET /users", "GET", f"{AUTH_API}/users", {"headers": admin}),
+        ("GET /all-orders", "GET", f"{AUTH_API}/all-orders", {"headers": admin}),
+    ]
+    for page in range(1, PRODUCT_LIST_PAGES + 1):
+        paths.append((f"GET /product-list/{page}", "GET", f"{PRODUCT_API}/product-list/{page}", {}))
+    category = planted["category"]
+    if category:
+        paths += [
+            ("GET /single-category/:slug", "GET", f"{CATEGORY_API}/single-category/{category['slug']}", {}),
+            ("GET /product-category/:slug", "GET", f"{PRODUCT_API}/product-category/{category['slug']}", {}),
+            ("POST /product-filters", "POST", f"{PRODUCT_API}/product-filters",
+             {"json": {"checked": [category["_id"]], "radio": []}}),
+        ]
+    for i, product in enumerate(planted["products"]):
+        paths.append((f"GET /get-product/:slug ({i})", "GET", f"{PRODUCT_API}/get-product/{product['slug']}", {}))
+        # related-product leaves out :pid itself, so each product surfaces through the other one
+        paths.append((f"GET /related-product/:pid/:cid ({i})", "GET",
+                      f"{PRODUCT_API}/related-product/{product['_id']}/{category['_id']}", {}))
+    if planted["user_token"]:
+        paths += [
+            ("GET /orders", "GET", f"{AUTH_API}/orders", {"headers": {"Authorization": planted["user_token"]}}),
+            ("POST /login", "POST", f"{AUTH_API}/login",
+             {"json": {"email": planted["user_email"], "password": PASSWORD}}),
+        ]
+    return paths
+
+def fan_out(planted):
+    paths = read_paths(planted)
+
+    def read(path):
+        _, method, url, kw = path
+        return request_with_retry(SESSION, method, url, timeout=TIMEOUT, **kw)
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        responses = list(ex.map(read, paths))
+
+    # one scan per response: find the tokens, then check each found token's payload
+    grid = {}
+    for (label, _, _, _), r in zip(paths, responses):
+        if isinstance(r, str) or r.status_code != 200:
+            grid[label] = {"status": r if isinstance(r, str) else r.status_code, "surfaced": [], "raw": []}
+            continue
+        text = r.text or ""
+        found = sorted(set(TOKEN.findall(text)) & markers.keys())
+        grid[label] = {
+            "status": r.status_code,
+            "surfaced": found,
+            "raw": [t for t in found if is_raw(markers[t]["payload"], text)],
+        }
+
+    for label, cell in grid.items():
+        raw = [f"{t} ({markers[t]['field']})" for t in cell["raw"]]
+        record(
+            name=f"Stored XSS fan-out - {label}",
+            ok=cell["surfaced"] and not raw,
+            status_code=cell["status"],
+            summary=(f"raw payload of {len(raw)} markers" if raw else
+                     f"{len(cell['surfaced'])} markers surfaced, all sanitized" if cell["surfaced"] else
+                     "no marker surfaced (inconclusive)"),
+            details={"raw": raw, "sanitized": [t for t in cell["surfaced"] if t not in cell["raw"]]},
+            endpoint=label
+        )
+
+    by_marker = {
+        token: {
+            "field": info["field"],
+            "raw_on": [label for label, cell in grid.items() if token in cell["raw"]],
+            "sanitized_on": [label for label, cell in grid.items() if token in cell["surfaced"] and token not in cell["raw"]],
+        }
+        for token, info in markers.items()
+    }
+    unseen = [token for token, m in by_marker.items() if not m["raw_on"] and not m["sanitized_on"]]
+    raw_markers = [token for token, m in by_marker.items() if m["raw_on"]]
+    record(
+        name="Stored XSS fan-out - markers",
+        ok=not raw_markers,
+        summary=(f"{len(raw_markers)} of {len(markers)} markers raw on at least one path, "
+                 f"{len(unseen)} never surfaced, {len(paths)} read paths"),
+        details=by_marker
+    )
+
+def cleanup(planted):
+    admin = {"Authorization": ADMIN_TOKEN}
+    for product in planted["products"]:
+        request_with_retry(SESSION, "DELETE", f"{PRODUCT_API}/delete-product/{product['_id']}", headers=admin, timeout=TIMEOUT)
+    if planted["category"]:
+        request_with_retry(SESSION, "DELETE", f"{CATEGORY_API}/delete-category/{planted['category']['_id']}",
+                           headers=admin, timeout=TIMEOUT)
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if not ADMIN_TOKEN:
+        record("Auth Failure", ok=False, summary="Missing ADMIN_TOKEN - ensure credentials are correct and auth server running")
+    else:
+        planted = plant()
+        try:
+            fan_out(planted)
+        finally:
+            cleanup(planted)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Stored XSS fan-out finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+security_tests_timing_oracle.py
+Statistical timing-oracle probe for account enumeration on /login and /forgot-password (MERN App)
+
+loginController only runs bcrypt.compare when the email exists, so a wrong password for a real
+account should take measurably longer than any password for a missing account. This probe
+collects interleaved timing samples for both classes at a fixed concurrency (random order
+within each existing/missing pair so server drift hits both equally), drops rate-limited
+responses, and compares the two distributions with NumPy:
+ - bootstrap 95% confidence interval for the difference in medians
+ - accuracy of a single-threshold classifier (0.5 = indistinguishable)
+The classes are reported as distinguishable when the CI excludes zero.
+Differing status codes / messages between the classes are reported as a direct enumeration leak.
+
+Sampling stops after timing_samples pairs per endpoint or once the endpoint's share of
+timing_budget seconds is spent, whichever comes first (default: both endpoints in under a minute); the
+auth router's rate limiter (20 req/s) caps what a run can collect unless it is relaxed in the
+environment under test.
+Outputs: reports_timing_oracle/results.json
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+from concurrent.futures import ThreadPoolExecutor
+from harness_config import AUTH_API, BASE, USER_EMAIL, TIMEOUT, CONFIG, report_dir, make_session
+from instrumentation import start_instrumentation
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("timing_oracle")
+SESSION = make_session(cache=False)
+
+SAMPLES = CONFIG["timing_samples"]
+CONCURRENCY = CONFIG["timing_concurrency"]
+BUDGET = CONFIG["timing_budget"]
+BOOTSTRAP = CONFIG["timing_bootstrap"]
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {
+    "meta": {
+        "start_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "base": BASE,
+        "api": AUTH_API,
+        "samples": SAMPLES,
+        "concurrency": CONCURRENCY
+    },
+    "tests": []
+}
+
+def record(name, ok, status_code=None, summary=None, details=None, endpoint=None):
+    entry = {
+        "name": name,
+        "ok": bool(ok),
+        "status_code": status_code,
+        "summary": summary,
+        "details": details,
+        "endpoint": endpoint,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+    }
+    results["tests"].append(entry)
+    print(f"[{entry['timestamp']}] {name} => ok={entry['ok']} status={status_code} summary={summary} endpoint={endpoint}")
+
+# -------------------------
+# Sampling
+# -------------------------
+def body_for(endpoint, email):
+    if endpoint == "/login":
+        return {"email": email, "password": f"wrong-{uuid.uuid4().hex[:8]}"}
+    return {"email": email, "answer": f"wrong-{uuid.uuid4().hex[:8]}", "newPassword": "NotApplied123!"}
+
+def collect(endpoint, existing_email, missing_email, budget):
+    """Returns (class, latency_ns, status, message) tuples; class 1 = existing, 0 = missing."""
+    url = f"{AUTH_API}{endpoint}"
+    deadline = time.monotonic() + budget
+
+    schedule = []
+    for _ in range(SAMPLES):
+        pair = [1, 0]
+        random.shuffle(pair)
+        schedule.extend(pair)
+
+    def attempt(cls):
+        if time.monotonic() > deadline:
+            return None
+        body = body_for(endpoint, existing_email if cls else missing_email)
+        started = time.perf_counter_ns()
+        try:
+            r = SESSION.post(url, json=body, timeout=TIMEOUT)
+        except Exception:
+            return None
+        elapsed = time.perf_counter_ns() - started
+        try:
+            message = r.json().get("message")
+        except ValueError:
+            message = None
+        return cls, elapsed, r.status_code, message
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as ex:
+        return [s for s in ex.map(attempt, schedule) if s is not None]
+
+# -------------------------
+# Analysis (vectorised)
+# -------------------------
+def analyse(samples):
+    cls = np.fromiter((s[0] for s in samples), dtype=np.int8, count=len(samples))
+    lat = np.fromiter((s[1] for s in samples), dtype=np.float64, count=len(samples)) / 1e6
+    status = np.fromiter((s[2] for s in samples), dtype=np.int32, count=len(samples))
+
+    usable = status != 429
+    existing = lat[usable & (cls == 1)]
+    missing = lat[usable & (cls == 0)]
+    if len(existing) < 10 or len(missing) < 10:
+        return None
+
+    rng = np.random.default_rng()
+    boot_existing = np.median(existing[rng.integers(0, len(existing), (BOOTSTRAP, len(existing)))], axis=1)
+    boot_missing = np.median(missing[rng.integers(0, len(missing), (BOOTSTRAP, len(missing)))], axis=1)
+    low, high = np.percentile(boot_existing - boot_missing, [2.5, 97.5])
+
+    # best single threshold between the two medians, scored on all usable samples
+    threshold = (np.median(existing) + np.median(missing)) / 2
+    predicted_existing = lat[usable] > threshold
+    accuracy = float(np.mean(predicted_existing == (cls[usable] == 1)))
+
+    return {
+        "n_existing": int(len(existing)),
+        "n_missing": int(len(missing)),
+        "rate_limited": int(np.sum(~usable)),
+        "median_existing_ms": round(float(np.median(existing)), 3),
+        "median_missing_ms": round(float(np.median(missing)), 3),
+        "median_diff_ci95_ms": [round(float(low), 3), round(float(high), 3)],
+        "threshold_accuracy": round(max(accuracy, 1 - accuracy), 3),
+        "distinguishable": bool(low > 0 or high < 0),
+    }
+
+def response_leak(samples):
+    """Status code / message pairs that only ever occur for one class."""
+    by_class = {0: set(), 1: set()}
+    for cls, _, status, message in samples:
+        if status != 429:
+            by_class[cls].add((status, message))
+    return sorted(map(str, by_class[1] ^ by_class[0]))
+
+def timing_probe(endpoint, budget):
+    missing_email = f"nobody_{uuid.uuid4().hex[:12]}@example.com"
+    started = time.monotonic()
+    samples = collect(endpoint, USER_EMAIL, missing_email, budget)
+    elapsed = round(time.monotonic() - started, 1)
+
+    leak = response_leak(samples)
+    record(
+        name=f"Account enumeration - {endpoint} response differs",
+        ok=not leak,
+        summary="Existing and missing accounts must get identical status/message",
+        details={"class_only_responses": leak},
+        endpoint=endpoint
+    )
+
+    stats = analyse(samples)
+    if stats is None:
+        record(f"Timing oracle - {endpoint}", False, summary="Too few usable samples (rate limited?)",
+               details={"collected": len(samples), "seconds": elapsed}, endpoint=endpoint)
+        return
+    stats["seconds"] = elapsed
+    record(
+        name=f"Timing oracle - {endpoint}",
+        ok=not stats["distinguishable"],
+        summary=(f"median existing {stats['median_existing_ms']}ms vs missing {stats['median_missing_ms']}ms, "
+                 f"diff CI95 {stats['median_diff_ci95_ms']}, threshold accuracy {stats['threshold_accuracy']}"),
+        details=stats,
+        endpoint=endpoint
+    )
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    if np is None:
+        record("Timing oracle setup", False, summary="numpy is not installed (pip install numpy)")
+    else:
+        timing_probe("/login", BUDGET / 2)
+        timing_probe("/forgot-password", BUDGET / 2)
+
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+
+    print("\n✅ Timing oracle probes finished. Results saved.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+traffic.py
+Traffic recorder and replay archive format.
+
+With record_traffic set (--record-traffic true), instrumentation.start_instrumentation() installs
+the recorder when a script's main() starts. Every request/response pair that goes through
+requests from then on is appended to reports_traffic/<script>_<timestamp>_<pid>.jsonl.gz,
+including plain requests.get/post calls, since they end up in Session.send as well. The
+module-level logins run at import, before main(), and are not recorded. One gzip-compressed
+JSON line is written per exchange:
+  t, script, method, url, headers, body (base64), streamed,
+  status, elapsed_ms, response_headers, response (base64, first record_body_limit bytes),
+  response_truncated, error
+Re-iterable bodies with a length (uploads.MultipartBody) are joined and kept like bytes, so
+product uploads can be replayed; one-shot generator bodies (chunked uploads) are marked streamed
+and their bytes are not kept. Responses
+read with stream=True are stored without a body. Responses served from CachingSession never
+reach Session.send and are not recorded.
+
+The archive holds live tokens and the exact generated names (rbac_prod_<time>, ...), which is
+what makes a run reproducible with replay_traffic.py. Keep it out of version control.
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import atexit
+import base64
+import threading
+import requests
+
+FLUSH_EVERY = 100
+
+_original_send = requests.Session.send
+
+def _b64(data):
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode()
+    return base64.b64encode(data).decode()
+
+class Recorder:
+    def __init__(self, path, body_limit):
+        self.path = path
+        self.body_limit = body_limit
+        self.script = os.path.basename(sys.argv[0])
+        self.started = time.time()
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def write(self, request, response, started, error=None, stream=False):
+        body = request.body
+        if isinstance(body, (bytearray, memoryview)):
+            body = bytes(body)
+        elif body is not None and not isinstance(body, (str, bytes)) and hasattr(body, "__len__") and iter(body) is not body:
+            # every iteration of a MultipartBody yields the same bytes from the start
+            body = b"".join(body)
+        streamed = body is not None and not isinstance(body, (str, bytes))
+        entry = {
+            "t": round(started - self.started, 6),
+            "script": self.script,
+            "method": request.method,
+            "url": request.url,
+            "headers": dict(request.headers),
+            "body": None if streamed else _b64(body),
+            "streamed": streamed,
+            "status": None,
+            "elapsed_ms": round((time.time() - started) * 1000, 3),
+            "response_headers": None,
+            "response": None,
+            "response_truncated": False,
+            "error": error,
+        }
+        if response is not None:
+            entry["status"] = response.status_code
+            entry["response_headers"] = dict(response.headers)
+            if not stream:
+                content = response.content or b""
+                entry["response"] = _b64(content[:self.body_limit])
+                entry["response_truncated"] = len(content) > self.body_limit
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self.count += 1
+            if self.count % FLUSH_EVERY == 0:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        print(f"Recorded {self.count} requests to {self.path}")
+
+def install(path, body_limit):
+    """Routes every requests.Session.send through a Recorder writing to path."""
+    recorder = Recorder(path, body_limit)
+
+    def send(session, request, **kw):
+        started = time.time()
+        try:
+            response = _original_send(session, request, **kw)
+        except Exception as e:
+            recorder.write(request, None, started, error=str(e))
+            raise
+        recorder.write(request, response, started, stream=kw.get("stream", False))
+        return response
+
+    requests.Session.send = send
+    atexit.register(recorder.close)
+    return recorder
+
+def read_archive(path):
+    """Yields the recorded exchanges in order; a run killed mid-write ends at the last full line."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, json.JSONDecodeError):
+            return
+
+def decode(value):
+    return base64.b64decode(value) if value else None
@@ -0,0 +1,105 @@
+"""
+uploads.py
+Streaming multipart/form-data bodies for the product upload probes.
+
+requests' files= reads every part into one bytes body per request, and an io.BytesIO part is
+exhausted after the first upload: a module-level files dict sends an empty photo from the second
+request on. MultipartBody avoids both:
+ - it is an iterable with a length, so requests sends it with a Content-Length and hands the
+   chunks straight to the socket; the parts are never joined into one buffer
+ - file parts are memoryview slices of a source, never copies:
+     Buffer(data)          bytes / bytearray already in memory
+     Mapped(path)          a file through a read-only mmap (the OS pages it in on demand)
+     Repeated(byte, size)  `size` bytes of one value, served from a single CHUNK-sized block,
+                           for oversized-upload probes of any size
+ - every iteration starts from the first byte, so one body can be sent again (retries, RBAC
+   create then update) and from several threads at once
+Client memory therefore stays at one CHUNK per request in flight, however large or however
+many the uploads are.
+
+    body = MultipartBody(fields, {"photo": ("p.png", Buffer(png), "image/png")})
+    SESSION.post(url, data=body, headers=body.headers())
+"""
+
+import mmap
+import uuid
+
+CHUNK = 64 * 1024
+
+class Buffer:
+    def __init__(self, data):
+        self.view = memoryview(data)
+
+    def __len__(self):
+        return len(self.view)
+
+    def chunks(self):
+        for i in range(0, len(self.view), CHUNK):
+            yield self.view[i:i + CHUNK]
+
+class Mapped(Buffer):
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            try:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty files cannot be mapped
+                self.map = b""
+        super().__init__(self.map)
+
+    def close(self):
+        self.view.release()
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+
+class Repeated:
+    def __init__(self, byte, size):
+        self.block = memoryview(bytes(byte) * CHUNK)
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def chunks(self):
+        full, rest = divmod(self.size, CHUNK)
+        for _ in range(full):
+            yield self.block
+        if rest:
+            yield self.block[:rest]
+
+def _quote(value):
+    return str(value).replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+class MultipartBody:
+    def __init__(self, fields=None, files=None, boundary=None):
+        """fields: name -> value (None is left out); files: name -> (filename, source, content_type)."""
+        self.boundary = boundary or uuid.uuid4().hex
+        delimiter = f"--{self.boundary}\r\n"
+        self.parts = []
+        for name, value in (fields or {}).items():
+            # requests leaves out None fields as well
+            if value is None:
+                continue
+            self.parts.append(Buffer((
+                f'{delimiter}Content-Disposition: form-data; name="{_quote(name)}"\r\n\r\n{value}\r\n'
+            ).encode()))
+        for name, (filename, source, content_type) in (files or {}).items():
+            self.parts.append(Buffer((
+                f'{delimiter}Content-Disposition: form-data; name="{_quote(name)}"; filename="{_quote(filename)}"\r\n'
+                f"Content-Type: {content_type}\r\n\r\n"
+            ).encode()))
+            self.parts.append(source if hasattr(source, "chunks") else Buffer(source))
+            self.parts.append(Buffer(b"\r\n"))
+        self.parts.append(Buffer(f"--{self.boundary}--\r\n".encode()))
+        self.length = sum(len(p) for p in self.parts)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        for part in self.parts:
+            yield from part.chunks()
+
+    def headers(self):
+        """A new dict per call; the suites' request wrappers add Authorization to it."""
+        return {"Content-Type": f"multipart/form-data; boundary={self.boundary}"}
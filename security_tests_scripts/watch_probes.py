@@ -0,0 +1,302 @@
+"""
+watch_probes.py
+Watch mode: re-runs only the probes affected by a backend change (MERN App)
+
+Run the dev server with `npm run server` (nodemon), then:
+  python watch_probes.py --server-dir ..
+The .js files of the backend (server_dir: routes/, controllers/, middlewares/, helpers/, models/,
+config/, app.js, server.js; *.test.js excluded) are polled every watch_interval seconds. On a
+change:
+ 1. changed file -> routes: the routes/*.js files are parsed for their router.<method>(...)
+    lines and every file's relative imports are followed, so a route depends on its route file
+    and on everything its middlewares and controller import. controllers/productController.js
+    maps to every product route, middlewares/authMiddleware.js to every guarded route, and
+    models/categoryModel.js to the category routes and the product routes whose controller
+    imports it. app.js, server.js and files no route depends on (config/db.js) map to all routes.
+ 2. routes -> probes: the probe functions of the auth, category and product suites, in the
+    order their main() runs them, filtered to those that sent a request to an affected route.
+    Which routes a probe touches is recorded whenever it runs (every request is attributed to
+    the running probe through route_catalog.route_for) and kept in
+    reports_watch/probe_routes.json. Probes without an entry run once at start-up to learn it.
+ 3. the server is given watch_restart_grace seconds to go down (nodemon restarting it) and
+    then polled until it answers again; use --watch-restart-grace 0 when it does not restart.
+ 4. the probes are called in-process through the suite's CHECKPOINT.rerun: the suites are
+    imported once, so tokens and fixtures are not fetched again, payload loops start from the
+    first item every time, and their record() output is printed as usual. A probe that records
+    nothing counts as a failed check.
+Every cycle writes its checks to reports_watch/results.json and prints how long after the save
+the results were complete. Stop with Ctrl-C.
+Outputs: reports_watch/results.json, probe_routes.json
+"""
+
+import os
+import re
+import ast
+import json
+import time
+import importlib
+import requests
+from harness_config import BASE, CATEGORY_API, CONFIG, report_dir
+from instrumentation import start_instrumentation
+from route_catalog import ROUTES, route_for, label
+
+# -------------------------
+# Configuration
+# -------------------------
+REPORT_DIR = report_dir("watch")
+SERVER_DIR = os.path.abspath(CONFIG["server_dir"])
+INTERVAL = CONFIG["watch_interval"]
+RESTART_GRACE = CONFIG["watch_restart_grace"]
+READY_TIMEOUT = CONFIG["watch_ready_timeout"]
+PROBE_ROUTES_PATH = os.path.join(REPORT_DIR, "probe_routes.json")
+
+WATCHED_DIRS = ("routes", "controllers", "middlewares", "helpers", "models", "config")
+WATCHED_FILES = ("app.js", "server.js")
+# suite name -> module, in the order a full run would go
+SUITES = {
+    "auth": "security_tests_auth_routes",
+    "category": "security_tests_category_routes",
+    "product": "security_test_product_routes",
+}
+
+IMPORT = re.compile(r"""import\s+([\w\s{},*]+?)\s+from\s+["'](\.[^"']+)["']""")
+ROUTE_LINE = re.compile(r"""router\.(get|post|put|delete|patch)\(\s*["'`]([^"'`]+)["'`]\s*,(.*?)\)\s*;""", re.S)
+IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+
+# -------------------------
+# Setup Reporting
+# -------------------------
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+results = {"meta": {}, "tests": []}
+
+# -------------------------
+# Backend files -> routes
+# -------------------------
+def scan():
+    """{backend-relative path: (mtime_ns, size)} of every watched .js file."""
+    found = {}
+    paths = [os.path.join(SERVER_DIR, f) for f in WATCHED_FILES]
+    for d in WATCHED_DIRS:
+        try:
+            paths += [e.path for e in os.scandir(os.path.join(SERVER_DIR, d)) if e.is_file()]
+        except FileNotFoundError:
+            continue
+    for path in paths:
+        if not path.endswith(".js") or path.endswith(".test.js"):
+            continue
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        found[os.path.relpath(path, SERVER_DIR).replace(os.sep, "/")] = (st.st_mtime_ns, st.st_size)
+    return found
+
+def read(rel):
+    try:
+        with open(os.path.join(SERVER_DIR, rel), encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+def imports(rel):
+    """{imported name: backend-relative file} for the relative imports of one file."""
+    names = {}
+    for clause, target in IMPORT.findall(read(rel)):
+        path = os.path.normpath(os.path.join(os.path.dirname(rel), target)).replace(os.sep, "/")
+        for name in IDENTIFIER.findall(clause.replace(" as ", " ")):
+            names[name] = path
+    return names
+
+def closure(rel, graph):
+    """rel and every file it imports, transitively."""
+    seen, todo = set(), [rel]
+    while todo:
+        f = todo.pop()
+        if f in seen:
+            continue
+        seen.add(f)
+        todo.extend(graph.get(f, ()))
+    return seen
+
+def route_dependencies(files):
+    """Catalog label -> set of backend files the route depends on."""
+    graph = {rel: set(imports(rel).values()) for rel in files}
+    deps = {}
+    for source in {r["source"] for r in ROUTES}:
+        names = imports(source)
+        for method, path, args in ROUTE_LINE.findall(read(source)):
+            # the route file itself, but of its imports only those this line uses
+            used = {names[i] for i in IDENTIFIER.findall(args) if i in names}
+            deps[f"{method.upper()} {path}"] = {source}.union(*(closure(f, graph) for f in used))
+    return {label(r): deps.get(label(r), {r["source"]}) for r in ROUTES}
+
+def affected_routes(changed, files):
+    deps = route_dependencies(files)
+    affected = {route for route, needed in deps.items() if needed & changed}
+    # app.js / server.js / config/db.js are not below any route but every route runs through them
+    if changed - set().union(*deps.values()):
+        affected = set(deps)
+    return affected
+
+# -------------------------
+# Probes
+# -------------------------
+def suite_probes(module_name):
+    """Probe function names in the order the suite's main() passes them to CHECKPOINT.run."""
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{module_name}.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    main = next(n for n in tree.body if isinstance(n, ast.FunctionDef) and n.name == "main")
+    return [call.args[0].id for call in ast.walk(main)
+            if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and call.func.attr == "run"
+            and isinstance(call.func.value, ast.Name) and call.func.value.id == "CHECKPOINT"
+            and call.args and isinstance(call.args[0], ast.Name)]
+
+PROBES = [(suite, name) for suite, module in SUITES.items() for name in suite_probes(module)]
+
+def load_probe_routes():
+    if os.path.exists(PROBE_ROUTES_PATH):
+        with open(PROBE_ROUTES_PATH, encoding="utf-8") as f:
+            return {k: set(v) for k, v in json.load(f).items()}
+    return {}
+
+def save_probe_routes(probe_routes):
+    with open(PROBE_ROUTES_PATH, "w", encoding="utf-8") as f:
+        json.dump({k: sorted(v) for k, v in probe_routes.items()}, f, indent=2)
+
+current = {"probe": None, "routes": set()}
+_original_send = requests.Session.send
+
+def _tracking_send(session, request, **kw):
+    if current["probe"]:
+        route = route_for(request.method, request.url)
+        if route:
+            current["routes"].add(label(route))
+    return _original_send(session, request, **kw)
+
+requests.Session.send = _tracking_send
+
+modules = {}
+
+def run_probes(selected, probe_routes):
+    """Calls the selected probes in suite order; returns the checks they recorded."""
+    checks = []
+    for suite, name in PROBES:
+        if (suite, name) not in selected:
+            continue
+        if suite not in modules:
+            modules[suite] = importlib.import_module(SUITES[suite])
+            # the suite's own checkpoint.json belongs to its full runs; never write or remove it here
+            modules[suite].CHECKPOINT.in_memory()
+        module = modules[suite]
+        key = f"{suite}.{name}"
+        current.update(probe=key, routes=set())
+        start = len(module.results["tests"])
+        try:
+            # through the checkpoint so the probe's payload loops start from the first item again
+            module.CHECKPOINT.rerun(getattr(module, name))
+        except Exception as e:
+            module.results["tests"].append({"name": f"{key} crashed", "ok": False, "summary": repr(e), "endpoint": None})
+        finally:
+            current["probe"] = None
+        if current["routes"]:
+            probe_routes[key] = set(current["routes"])
+        for entry in module.results["tests"][start:]:
+            checks.append(dict(entry, probe=key))
+        if len(module.results["tests"]) == start:
+            checks.append({"name": f"{key} recorded no checks", "ok": False, "status_code": None,
+                           "summary": "probe ran but recorded nothing", "endpoint": None, "probe": key})
+        # the checks are copied; don't let the suite's results grow with every cycle
+        del module.results["tests"][start:]
+    save_probe_routes(probe_routes)
+    return checks
+
+# -------------------------
+# Server restarts
+# -------------------------
+def server_up():
+    try:
+        requests.get(f"{CATEGORY_API}/get-category", timeout=0.5)
+        return True
+    except requests.RequestException:
+        return False
+
+def wait_for_server():
+    """Waits out a nodemon restart; False if the server is not back within watch_ready_timeout."""
+    grace_until = time.perf_counter() + RESTART_GRACE
+    while time.perf_counter() < grace_until and server_up():
+        time.sleep(0.1)
+    ready_until = time.perf_counter() + READY_TIMEOUT
+    while time.perf_counter() < ready_until:
+        if server_up():
+            return True
+        time.sleep(0.1)
+    return False
+
+# -------------------------
+# Watch loop
+# -------------------------
+def report(cycle, checks):
+    failed = [c for c in checks if not c["ok"]]
+    results["meta"] = dict(cycle, base=BASE, checks=len(checks), failed=len(failed))
+    results["tests"] = checks
+    with open(os.path.join(REPORT_DIR, "results.json"), "w") as f:
+        f.write(json.dumps(results, indent=2))
+    after = f", {cycle['seconds_after_save']}s after save" if cycle.get("seconds_after_save") is not None else ""
+    print(f"\n{'✅' if not failed else '❌'} {len(checks)} checks from {len(cycle['probes'])} probes, "
+          f"{len(failed)} failed{after}")
+    for c in failed:
+        print(f"   ✘ {c['probe']}: {c['name']} ({c.get('status_code')})")
+
+def watch():
+    probe_routes = load_probe_routes()
+    unknown = {p for p in PROBES if f"{p[0]}.{p[1]}" not in probe_routes}
+    if unknown:
+        print(f"Learning the routes of {len(unknown)} probes (one run each)...")
+        checks = run_probes(unknown, probe_routes)
+        report({"changed": [], "affected_routes": [], "probes": [f"{s}.{n}" for s, n in PROBES if (s, n) in unknown]}, checks)
+
+    files = scan()
+    print(f"\nWatching {len(files)} backend files under {SERVER_DIR} (Ctrl-C to stop)")
+    while True:
+        time.sleep(INTERVAL)
+        now = scan()
+        if now == files:
+            continue
+        # let an editor finish writing (save + rename) before reading the tree
+        time.sleep(INTERVAL)
+        now = scan()
+        changed = {f for f in set(files) | set(now) if files.get(f) != now.get(f)}
+        saved_at = max((now[f][0] for f in changed if f in now), default=time.time_ns()) / 1e9
+        files = now
+
+        routes = affected_routes(changed, files)
+        selected = {(s, n) for s, n in PROBES if probe_routes.get(f"{s}.{n}", set()) & routes}
+        names = [f"{s}.{n}" for s, n in PROBES if (s, n) in selected]
+        print(f"\n{', '.join(sorted(changed))} -> {len(routes)} routes -> {len(names)} probes")
+        if not selected:
+            continue
+        if not wait_for_server():
+            print(f"Server at {BASE} did not come back within {READY_TIMEOUT}s")
+            continue
+        checks = run_probes(selected, probe_routes)
+        report({
+            "changed": sorted(changed),
+            "affected_routes": sorted(routes),
+            "probes": names,
+            "seconds_after_save": round(time.time() - saved_at, 2),
+        }, checks)
+
+# -------------------------
+# MAIN
+# -------------------------
+def main():
+    start_instrumentation()
+    try:
+        watch()
+    except KeyboardInterrupt:
+        pass
+    print("\n✅ Watch mode stopped. Results saved.")
+
+if __name__ == "__main__":
+    main()
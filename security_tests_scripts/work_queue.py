@@ -0,0 +1,130 @@
+"""
+work_queue.py
+SQLite work queue for spreading a probe sweep over several worker processes.
+
+A coordinator plans the work units (JSON-serialisable dicts, e.g. one covering-array row of
+route x auth state x payload x encoding) and puts them on the queue as one run, together with
+a context every worker needs (the tokens to send). Workers lease units in batches, execute
+them and write each result back; the coordinator reads the results in unit order once every
+unit is done.
+
+A lease that is not completed within lease_timeout seconds (worker killed, machine gone) is
+handed to the next worker that asks, so a run always finishes while any worker is alive. A
+unit finished twice keeps its first result.
+
+The queue is one SQLite file in WAL mode. Every process opens its own connection and leases
+under BEGIN IMMEDIATE, so any number of local processes can share it. Workers on other machines
+can use it only through a filesystem with working POSIX locks; SQLite over NFS/SMB is not safe.
+The file holds the run context (live tokens), so keep it out of version control.
+"""
+
+import json
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    context TEXT NOT NULL,
+    total INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS units (
+    run TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    leased_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    finished_at REAL,
+    PRIMARY KEY (run, seq)
+);
+CREATE INDEX IF NOT EXISTS units_by_state ON units (run, state);
+"""
+
+class WorkQueue:
+    def __init__(self, path, lease_timeout=60.0):
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        self.db.execute("COMMIT")
+
+    # -------------------------
+    # Coordinator side
+    # -------------------------
+    def create_run(self, units, context=None):
+        """Queues the units as a new run; returns the run id."""
+        run = time.strftime("%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:6]
+        with self._transaction():
+            self.db.execute("INSERT INTO runs VALUES (?, ?, ?, ?)",
+                            (run, time.time(), json.dumps(context or {}), len(units)))
+            self.db.executemany("INSERT INTO units (run, seq, payload) VALUES (?, ?, ?)",
+                                ((run, seq, json.dumps(unit)) for seq, unit in enumerate(units)))
+        return run
+
+    def progress(self, run):
+        """{"pending": n, "leased": n, "done": n}"""
+        counts = {"pending": 0, "leased": 0, "done": 0}
+        for state, n in self.db.execute("SELECT state, COUNT(*) FROM units WHERE run = ? GROUP BY state", (run,)):
+            counts[state] = n
+        return counts
+
+    def results(self, run):
+        """[(unit, result, worker)] in the order the units were queued."""
+        rows = self.db.execute("SELECT payload, result, worker FROM units WHERE run = ? ORDER BY seq", (run,))
+        return [(json.loads(p), json.loads(r) if r is not None else None, w) for p, r, w in rows]
+
+    # -------------------------
+    # Worker side
+    # -------------------------
+    def latest_run(self):
+        row = self.db.execute("SELECT id FROM runs ORDER BY created DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def context(self, run):
+        row = self.db.execute("SELECT context FROM runs WHERE id = ?", (run,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def lease(self, run, worker, batch):
+        """Up to `batch` (seq, unit) pairs that are pending or whose lease has expired."""
+        now = time.time()
+        with self._transaction():
+            rows = self.db.execute(
+                "SELECT seq, payload FROM units WHERE run = ? AND (state = 'pending' OR "
+                "(state = 'leased' AND leased_at < ?)) ORDER BY seq LIMIT ?",
+                (run, now - self.lease_timeout, batch),
+            ).fetchall()
+            self.db.executemany(
+                "UPDATE units SET state = 'leased', worker = ?, leased_at = ?, attempts = attempts + 1 "
+                "WHERE run = ? AND seq = ?",
+                ((worker, now, run, seq) for seq, _ in rows),
+            )
+        return [(seq, json.loads(payload)) for seq, payload in rows]
+
+    def complete(self, run, worker, done):
+        """Stores [(seq, result)] for units this worker executed."""
+        now = time.time()
+        with self._transaction():
+            self.db.executemany(
+                "UPDATE units SET state = 'done', worker = ?, result = ?, finished_at = ? "
+                "WHERE run = ? AND seq = ? AND state != 'done'",
+                ((worker, json.dumps(result), now, run, seq) for seq, result in done),
+            )
+
+    def close(self):
+        self.db.close()